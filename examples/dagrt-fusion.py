@@ -727,9 +727,11 @@ class ExecutionMapperWithMemOpCounting(ExecutionMapperWrapper):
             # particular, we assume the elementwise matrices are negligible in
             # size and thus ignorable.
 
-            field = self.inner_mapper.rec(insn.field)
-            profile_data["bytes_read"] = (
-                    profile_data.get("bytes_read", 0) + dof_array_nbytes(field))
+            for ifield in insn.fields:
+                field = self.inner_mapper.rec(ifield)
+                profile_data["bytes_read"] = (
+                        profile_data.get("bytes_read", 0)
+                        + dof_array_nbytes(field))
 
             for _, value in assignments:
                 profile_data["bytes_written"] = (
@@ -193,6 +193,9 @@ def main():
         t += dt
         istep += 1
 
+    print("cross-rank exchange per RHS:",
+            discr.cross_rank_counters.get_per_exchange())
+
 
 if __name__ == "__main__":
     main()
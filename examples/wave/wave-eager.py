@@ -114,9 +114,11 @@ def bump(actx, discr, t=0):
 
 def main():
     cl_ctx = cl.create_some_context()
-    queue = cl.CommandQueue(cl_ctx, properties=cl.command_queue_properties.PROFILING_ENABLE)
+    queue = cl.CommandQueue(cl_ctx,
+            properties=cl.command_queue_properties.PROFILING_ENABLE)
     from pyopencl.tools import ImmediateAllocator
-    actx = GrudgeArrayContext(queue, allocator=ImmediateAllocator(queue))
+    actx = GrudgeArrayContext(queue, allocator=ImmediateAllocator(queue),
+            profile_kernels=True)
 
     dim = 3
     nel_1d = 2**5
@@ -170,6 +172,8 @@ def main():
         t += dt
         istep += 1
 
+    print(actx.tabulate_profiling_data())
+
 
 if __name__ == "__main__":
     main()
@@ -35,6 +35,7 @@ class DGDiscretizationWithBoundaries:
     """
     .. automethod :: discr_from_dd
     .. automethod :: connection_from_dds
+    .. automethod :: get_rank_boundary_exchange
 
     .. autoattribute :: dim
     .. autoattribute :: ambient_dim
@@ -110,7 +111,7 @@ class DGDiscretizationWithBoundaries:
             return True
         else:
             return self.mpi_communicator.Get_rank() \
-                    == self._get_management_rank_index()
+                    == self.get_management_rank_index()
 
     def _set_up_distributed_communication(self, mpi_communicator, array_context):
         from_dd = sym.DOFDesc("vol", sym.QTAG_NONE)
@@ -142,15 +143,40 @@ class DGDiscretizationWithBoundaries:
 
         return boundary_connections
 
+    @memoize_method
     def get_distributed_boundary_swap_connection(self, dd):
-        if dd.quadrature_tag != sym.QTAG_NONE:
-            # FIXME
-            raise NotImplementedError("Distributed communication with quadrature")
+        """Return a connection from the base-order data received from the
+        remote part of the partition boundary *dd* to the local boundary
+        discretization. If *dd* has a quadrature tag, the swapped data is
+        further interpolated to the quadrature grid, so that only base-order
+        data needs to be communicated.
+        """
+        dd = sym.as_dofdesc(dd)
 
         assert isinstance(dd.domain_tag, sym.DTAG_BOUNDARY)
         assert isinstance(dd.domain_tag.tag, sym.BTAG_PARTITION)
 
-        return self._dist_boundary_connections[dd.domain_tag.tag.part_nr]
+        swap_conn = self._dist_boundary_connections[dd.domain_tag.tag.part_nr]
+        if dd.quadrature_tag == sym.QTAG_NONE:
+            return swap_conn
+
+        from meshmode.discretization.connection import \
+                ChainedDiscretizationConnection
+        return ChainedDiscretizationConnection([
+            swap_conn,
+            self.connection_from_dds(dd.with_qtag(sym.QTAG_NONE), dd)])
+
+    @memoize_method
+    def get_rank_boundary_exchange(self, array_context, remote_rank,
+            send_tag, recv_tag, shape, dtype):
+        """Return a :class:`~grudge.execution.RankBoundaryExchange` for
+        flat arrays of *shape* and *dtype*. The same exchange, along with
+        its buffers and persistent requests, is returned for repeated calls
+        with the same arguments.
+        """
+        from grudge.execution import RankBoundaryExchange
+        return RankBoundaryExchange(self.mpi_communicator, array_context,
+                remote_rank, send_tag, recv_tag, shape, dtype)
 
     @memoize_method
     def discr_from_dd(self, dd):
@@ -22,13 +22,15 @@ THE SOFTWARE.
 
 
 import numpy as np  # noqa
-from pytools import memoize_method
+import loopy as lp
+from pytools import memoize_in, memoize_method
 from pytools.obj_array import obj_array_vectorize, make_obj_array
 import pyopencl.array as cla  # noqa
 from grudge import sym, bind
 
 from meshmode.mesh import BTAG_ALL, BTAG_NONE, BTAG_PARTITION  # noqa
-from meshmode.dof_array import freeze, flatten, unflatten
+from meshmode.dof_array import DOFArray, freeze, thaw, flatten, unflatten
+from meshmode.array_context import make_loopy_program, IsDOFArray
 
 from grudge.discretization import DGDiscretizationWithBoundaries
 from grudge.symbolic.primitives import TracePair
@@ -38,15 +40,53 @@ __doc__ = """
 .. autoclass:: EagerDGDiscretization
 .. autofunction:: interior_trace_pair
 .. autofunction:: cross_rank_trace_pairs
+.. autoclass:: CrossRankCommunicationCounters
 """
 
 
+def _is_dof_array_vector(vec):
+    r"""Return *True* if *vec* is an object array of several
+    :class:`~meshmode.dof_array.DOFArray`\ s, to which operators can be
+    applied in a batch.
+    """
+    return (isinstance(vec, np.ndarray)
+            and vec.dtype.char == "O"
+            and vec.ndim == 1
+            and len(vec) > 1
+            and all(isinstance(el, DOFArray) for el in vec))
+
+
+# maps the kinds of reductions supported by
+# :meth:`EagerDGDiscretization.fused_reductions` to the operation that
+# combines their per-element values
+_REDUCTION_KIND_TO_OP_NAME = {
+        "norm": "sum",
+        "max_abs": "max",
+        "integral": "sum",
+        "sum": "sum",
+        "min": "min",
+        "max": "max",
+        }
+
+
+def _make_sym_field(name, dd, nfields):
+    if nfields is None:
+        return sym.Variable(name, dd)
+    else:
+        return sym.make_sym_array(name, nfields, dd)
+
+
 class EagerDGDiscretization(DGDiscretizationWithBoundaries):
     """
     Inherits from :class:`~grudge.discretization.DGDiscretizationWithBoundaries`.
 
     .. automethod:: __init__
     .. automethod:: project
+
+    .. attribute:: cross_rank_counters
+
+        A :class:`CrossRankCommunicationCounters` updated by
+        :func:`cross_rank_trace_pairs`.
     .. automethod:: nodes
 
     .. automethod:: grad
@@ -66,8 +106,14 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
     .. automethod:: nodal_sum
     .. automethod:: nodal_min
     .. automethod:: nodal_max
+    .. automethod:: device_nodal_reduction
+    .. automethod:: fused_reductions
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cross_rank_counters = CrossRankCommunicationCounters()
+
     def interp(self, src, tgt, vec):
         from warnings import warn
         warn("using 'interp' is deprecated, use 'project' instead.",
@@ -269,8 +315,9 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
                 (array_context=actx))
 
     @memoize_method
-    def _bound_mass(self, dd):
-        return bind(self, sym.MassOperator(dd_in=dd)(sym.Variable("u", dd)),
+    def _bound_mass(self, dd, nfields=None):
+        return bind(self,
+                sym.MassOperator(dd_in=dd)(_make_sym_field("u", dd, nfields)),
                 local_only=True)
 
     def mass(self, *args):
@@ -282,28 +329,37 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         else:
             raise TypeError("invalid number of arguments")
 
-        if isinstance(vec, np.ndarray):
+        if _is_dof_array_vector(vec):
+            # apply the mass matrix to all components at once
+            return self._bound_mass(dd, len(vec))(u=vec)
+        elif isinstance(vec, np.ndarray):
             return obj_array_vectorize(
                     lambda el: self.mass(dd, el), vec)
 
         return self._bound_mass(dd)(u=vec)
 
     @memoize_method
-    def _bound_inverse_mass(self):
-        return bind(self, sym.InverseMassOperator()(sym.Variable("u")),
+    def _bound_inverse_mass(self, nfields=None):
+        return bind(self,
+                sym.InverseMassOperator()(
+                    _make_sym_field("u", sym.DD_VOLUME, nfields)),
                 local_only=True)
 
     def inverse_mass(self, vec):
-        if isinstance(vec, np.ndarray):
+        if _is_dof_array_vector(vec):
+            # apply the inverse mass matrix to all components at once
+            return self._bound_inverse_mass(len(vec))(u=vec)
+        elif isinstance(vec, np.ndarray):
             return obj_array_vectorize(
                     lambda el: self.inverse_mass(el), vec)
 
         return self._bound_inverse_mass()(u=vec)
 
     @memoize_method
-    def _bound_face_mass(self, dd):
-        u = sym.Variable("u", dd=dd)
-        return bind(self, sym.FaceMassOperator(dd_in=dd)(u), local_only=True)
+    def _bound_face_mass(self, dd, nfields=None):
+        return bind(self,
+                sym.FaceMassOperator(dd_in=dd)(_make_sym_field("u", dd, nfields)),
+                local_only=True)
 
     def face_mass(self, *args):
         if len(args) == 1:
@@ -314,7 +370,10 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         else:
             raise TypeError("invalid number of arguments")
 
-        if isinstance(vec, np.ndarray):
+        if _is_dof_array_vector(vec):
+            # apply the face mass matrix to all components at once
+            return self._bound_face_mass(dd, len(vec))(u=vec)
+        elif isinstance(vec, np.ndarray):
             return obj_array_vectorize(
                     lambda el: self.face_mass(dd, el), vec)
 
@@ -346,18 +405,224 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
 
         return self._norm(p, dd)(arg=vec)
 
-    @memoize_method
-    def _nodal_reduction(self, operator, dd):
-        return bind(self, operator(dd)(sym.var("arg")), local_only=True)
+    def device_nodal_reduction(self, op_name, vec, global_reduction=False):
+        """Reduce all nodal values of *vec* on the device.
+
+        :arg op_name: one of ``"sum"``, ``"min"``, or ``"max"``.
+        :arg vec: a :class:`~meshmode.dof_array.DOFArray` or an object array
+            of them, all of which are included in the reduction.
+        :arg global_reduction: if *True*, start combining the values of all
+            ranks of :attr:`mpi_communicator`.
+        :returns: a :class:`grudge.execution.DeviceScalar`, whose value is
+            only transferred to the host once it is requested.
+        """
+        if isinstance(vec, DOFArray):
+            actx = vec.array_context
+        else:
+            actx = vec[0].array_context
+
+        from grudge.execution import nodal_reduction
+        result = nodal_reduction(actx, op_name, vec)
+
+        if global_reduction and self.mpi_communicator is not None:
+            result.start_allreduce(self.mpi_communicator)
+
+        return result
 
     def nodal_sum(self, dd, vec):
-        return self._nodal_reduction(sym.NodalSum, dd)(arg=vec)
+        return self.device_nodal_reduction("sum", vec).get()
 
     def nodal_min(self, dd, vec):
-        return self._nodal_reduction(sym.NodalMin, dd)(arg=vec)
+        return self.device_nodal_reduction("min", vec).get()
 
     def nodal_max(self, dd, vec):
-        return self._nodal_reduction(sym.NodalMax, dd)(arg=vec)
+        return self.device_nodal_reduction("max", vec).get()
+
+    @memoize_method
+    def _reduction_data(self, dd):
+        """Return the frozen area elements on *dd* and, for each group, the
+        reference quadrature weights and mass matrix.
+        """
+        actx = self._setup_actx
+        dim = self.dim if dd.is_volume() else self.dim - 1
+
+        area_element = freeze(bind(self,
+            sym.area_element(self.ambient_dim, dim, dd=dd),
+            local_only=True)(actx))
+
+        discr = self.discr_from_dd(dd)
+        return area_element, [
+                (actx.freeze(actx.from_numpy(grp.weights)),
+                    actx.freeze(actx.from_numpy(grp.mass_matrix())))
+                for grp in discr.groups]
+
+    def fused_reductions(self, reductions, dd=None, global_reduction=False):
+        r"""Evaluate several reductions in a single pass over the data, with a
+        single transfer of the results to the host.
+
+        :arg reductions: a sequence of tuples ``(kind, vec)``, where *vec* is
+            a :class:`~meshmode.dof_array.DOFArray` or an object array of
+            them on *dd*, all entries of which are included. *kind* is one
+            of ``"norm"`` (the :math:`L^2` norm), ``"max_abs"`` (the
+            :math:`L^\infty` norm), ``"integral"``, ``"sum"``, ``"min"``,
+            or ``"max"``.
+        :arg global_reduction: if *True*, combine the values of all ranks of
+            :attr:`mpi_communicator`.
+        :returns: a :class:`list` of the values of *reductions*.
+        """
+        if dd is None:
+            dd = sym.DD_VOLUME
+
+        dd = sym.as_dofdesc(dd)
+
+        # {{{ gather the DOF arrays to be reduced
+
+        fields = []
+        field_ids = {}
+        components = []
+        for ireduction, (kind, vec) in enumerate(reductions):
+            if kind not in _REDUCTION_KIND_TO_OP_NAME:
+                raise ValueError("unknown reduction: '%s'" % kind)
+
+            if isinstance(vec, DOFArray):
+                vec = [vec]
+
+            for field in vec:
+                try:
+                    ifield = field_ids[id(field)]
+                except KeyError:
+                    ifield = field_ids[id(field)] = len(fields)
+                    fields.append(field)
+
+                components.append((ireduction, kind, ifield))
+
+        # }}}
+
+        actx = fields[0].array_context
+
+        @memoize_in(actx, (EagerDGDiscretization, "fused_reductions_prg"))
+        def prg(kinds_and_fields, nfields):
+            kinds = {kind for kind, _ in kinds_and_fields}
+            if "norm" in kinds:
+                domain = """{[iel, jdof, kdof]:
+                    0<=iel<nelements and 0<=jdof, kdof<nunit_dofs}"""
+            else:
+                domain = "{[iel, jdof]: 0<=iel<nelements and 0<=jdof<nunit_dofs}"
+
+            reduction_exprs = {
+                    "norm": (
+                        "sum((jdof, kdof), f{i}[iel, jdof] * mass[jdof, kdof]"
+                        " * jac[iel, kdof] * f{i}[iel, kdof])"),
+                    "max_abs": "max(jdof, abs(f{i}[iel, jdof]))",
+                    "integral": (
+                        "sum(jdof, weights[jdof] * jac[iel, jdof]"
+                        " * f{i}[iel, jdof])"),
+                    "sum": "sum(jdof, f{i}[iel, jdof])",
+                    "min": "min(jdof, f{i}[iel, jdof])",
+                    "max": "max(jdof, f{i}[iel, jdof])",
+                    }
+
+            kernel_data = [
+                    lp.GlobalArg("f%d" % ifield, None,
+                        shape="nelements, nunit_dofs", tags=IsDOFArray())
+                    for ifield in range(nfields)]
+            kernel_data.extend(
+                    lp.GlobalArg("partials%d" % k, None,
+                        shape="nelements", offset=lp.auto)
+                    for k in range(len(kinds_and_fields)))
+            if kinds & {"norm", "integral"}:
+                kernel_data.append(lp.GlobalArg("jac", None,
+                        shape="nelements, nunit_dofs", tags=IsDOFArray()))
+            kernel_data.append(...)
+
+            return make_loopy_program(domain,
+                    [
+                        "partials{k}[iel] = {expr}".format(
+                            k=k, expr=reduction_exprs[kind].format(i=ifield))
+                        for k, (kind, ifield) in enumerate(kinds_and_fields)
+                        ],
+                    kernel_data=kernel_data,
+                    name="grudge_fused_reductions")
+
+        program = prg(
+                tuple((kind, ifield) for _, kind, ifield in components),
+                len(fields))
+        kinds = {kind for _, kind, _ in components}
+
+        # {{{ per-element values
+
+        discr = self.discr_from_dd(dd)
+        area_element, group_data = self._reduction_data(dd)
+        area_element = thaw(actx, area_element)
+
+        dtype = np.result_type(discr.real_dtype,
+                *[field.entry_dtype for field in fields])
+        partials = [actx.empty(sum(grp.nelements for grp in discr.groups), dtype)
+                for _ in components]
+
+        offset = 0
+        for grp, (weights, mass) in zip(discr.groups, group_data):
+            nelements = grp.nelements
+            if not nelements:
+                continue
+
+            kwargs = {
+                    "f%d" % ifield: field[grp.index]
+                    for ifield, field in enumerate(fields)}
+            kwargs.update(
+                    ("partials%d" % k, partials_k[offset:offset + nelements])
+                    for k, partials_k in enumerate(partials))
+            if "norm" in kinds or "integral" in kinds:
+                kwargs["jac"] = area_element[grp.index]
+            if "norm" in kinds:
+                kwargs["mass"] = mass
+            if "integral" in kinds:
+                kwargs["weights"] = weights
+
+            actx.call_loopy(program, **kwargs)
+            offset += nelements
+
+        # }}}
+
+        from grudge.execution import _reduce_flat_array, _to_host_at_once
+        values = _to_host_at_once(actx, [
+            _reduce_flat_array(actx, _REDUCTION_KIND_TO_OP_NAME[kind], partials_k)
+            for (_, kind, _), partials_k in zip(components, partials)])
+
+        # {{{ combine the values of the entries of object arrays
+
+        import operator
+        combine = {"sum": operator.add, "min": min, "max": max}
+
+        results = [None] * len(reductions)
+        for (ireduction, kind, _), value in zip(components, values):
+            if results[ireduction] is None:
+                results[ireduction] = value
+            else:
+                results[ireduction] = combine[_REDUCTION_KIND_TO_OP_NAME[kind]](
+                        results[ireduction], value)
+
+        # }}}
+
+        if global_reduction and self.mpi_communicator is not None:
+            from mpi4py import MPI
+            for op_name, mpi_op in [
+                    ("sum", MPI.SUM), ("min", MPI.MIN), ("max", MPI.MAX)]:
+                indices = [i for i, (kind, _) in enumerate(reductions)
+                        if _REDUCTION_KIND_TO_OP_NAME[kind] == op_name]
+                if not indices:
+                    continue
+
+                local_values = np.array([results[i] for i in indices])
+                global_values = np.empty_like(local_values)
+                self.mpi_communicator.Allreduce(
+                        local_values, global_values, op=mpi_op)
+                for i, value in zip(indices, global_values):
+                    results[i] = value
+
+        return [
+                np.sqrt(value) if kind == "norm" else value
+                for (kind, _), value in zip(reductions, results)]
 
     @memoize_method
     def connected_ranks(self):
@@ -376,7 +641,58 @@ def interior_trace_pair(discrwb, vec):
 
 # {{{ distributed-memory functionality
 
+class CrossRankCommunicationCounters:
+    """Cumulative counters for the boundary data exchanged by
+    :func:`cross_rank_trace_pairs`.
+
+    .. attribute:: nexchanges
+
+        The number of calls to :func:`cross_rank_trace_pairs`.
+
+    .. attribute:: nmessages_sent
+    .. attribute:: nmessages_received
+    .. attribute:: nbytes_sent
+    .. attribute:: nbytes_received
+
+    .. automethod:: get_per_exchange
+    .. automethod:: reset
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nexchanges = 0
+        self.nmessages_sent = 0
+        self.nmessages_received = 0
+        self.nbytes_sent = 0
+        self.nbytes_received = 0
+
+    def get_per_exchange(self):
+        """Return a :class:`dict` of the message count and bytes sent
+        and received, averaged over :attr:`nexchanges`.
+        """
+        nexchanges = max(self.nexchanges, 1)
+        return {
+                "nmessages_sent": self.nmessages_sent / nexchanges,
+                "nmessages_received": self.nmessages_received / nexchanges,
+                "nbytes_sent": self.nbytes_sent / nexchanges,
+                "nbytes_received": self.nbytes_received / nexchanges,
+                }
+
+
+def _concatenate(actx, arys):
+    if all(isinstance(ary, cla.Array) for ary in arys):
+        return cla.concatenate(arys, queue=actx.queue)
+    else:
+        return np.concatenate(arys)
+
+
 class _RankBoundaryCommunication:
+    """Exchanges the restriction of all components of a volume field to the
+    boundary shared with *remote_rank* in a single message each way.
+    """
+
     base_tag = 1273
 
     def __init__(self, discrwb, remote_rank, vol_field, tag=None):
@@ -384,70 +700,82 @@ class _RankBoundaryCommunication:
         if tag is not None:
             self.tag += tag
 
+        self.is_scalar = not isinstance(vol_field, np.ndarray)
+        if self.is_scalar:
+            vol_field = make_obj_array([vol_field])
+
         self.discrwb = discrwb
-        self.array_context = vol_field.array_context
+        self.array_context = vol_field[0].array_context
         self.remote_btag = BTAG_PARTITION(remote_rank)
 
         self.bdry_discr = discrwb.discr_from_dd(self.remote_btag)
         self.local_dof_array = discrwb.project("vol", self.remote_btag, vol_field)
 
-        local_data = self.array_context.to_numpy(flatten(self.local_dof_array))
+        local_data = _concatenate(self.array_context,
+                list(flatten(self.local_dof_array)))
 
-        comm = self.discrwb.mpi_communicator
+        self.exchange = discrwb.get_rank_boundary_exchange(
+                self.array_context, remote_rank, self.tag, self.tag,
+                local_data.shape, local_data.dtype)
+        self.exchange.start_receive()
 
-        self.send_req = comm.Isend(
-                local_data, remote_rank, tag=self.tag)
+        copy_evt = self.exchange.copy_to_send_buffer(local_data)
+        if copy_evt is not None:
+            copy_evt.wait()
+        self.exchange.start_send()
 
-        self.remote_data_host = np.empty_like(local_data)
-        self.recv_req = comm.Irecv(self.remote_data_host, remote_rank, self.tag)
+        self.nbytes = self.exchange.send_buffer.nbytes
 
     def finish(self):
-        self.recv_req.Wait()
+        self.exchange.recv_request.Wait()
 
         actx = self.array_context
-        remote_dof_array = unflatten(self.array_context, self.bdry_discr,
-                actx.from_numpy(self.remote_data_host))
+        remote_data = self.exchange.get_received()
+
+        ndofs = self.bdry_discr.ndofs
+        remote_dof_array = make_obj_array([
+                unflatten(actx, self.bdry_discr,
+                    remote_data[i*ndofs:(i+1)*ndofs])
+                for i in range(len(self.local_dof_array))])
 
         bdry_conn = self.discrwb.get_distributed_boundary_swap_connection(
                 sym.as_dofdesc(sym.DTAG_BOUNDARY(self.remote_btag)))
-        swapped_remote_dof_array = bdry_conn(remote_dof_array)
+        swapped_remote_dof_array = obj_array_vectorize(bdry_conn, remote_dof_array)
 
-        self.send_req.Wait()
+        self.exchange.send_request.Wait()
+
+        local_dof_array = self.local_dof_array
+        if self.is_scalar:
+            local_dof_array, = local_dof_array
+            swapped_remote_dof_array, = swapped_remote_dof_array
 
         return TracePair(self.remote_btag,
-                interior=self.local_dof_array,
+                interior=local_dof_array,
                 exterior=swapped_remote_dof_array)
 
 
-def _cross_rank_trace_pairs_scalar_field(discrwb, vec, tag=None):
-    rbcomms = [_RankBoundaryCommunication(discrwb, remote_rank, vec, tag=tag)
-            for remote_rank in discrwb.connected_ranks()]
-    return [rbcomm.finish() for rbcomm in rbcomms]
-
-
 def cross_rank_trace_pairs(discrwb, vec, tag=None):
-    if isinstance(vec, np.ndarray):
-
-        n, = vec.shape
-        result = {}
-        for ivec in range(n):
-            for rank_tpair in _cross_rank_trace_pairs_scalar_field(
-                    discrwb, vec[ivec]):
-                assert isinstance(rank_tpair.dd.domain_tag, sym.DTAG_BOUNDARY)
-                assert isinstance(rank_tpair.dd.domain_tag.tag, BTAG_PARTITION)
-                result[rank_tpair.dd.domain_tag.tag.part_nr, ivec] = rank_tpair
+    """Return a :class:`list` of :class:`grudge.sym.TracePair` objects, one
+    for each rank connected to this one by a partition boundary.
 
-        return [
-            TracePair(
-                dd=sym.as_dofdesc(sym.DTAG_BOUNDARY(BTAG_PARTITION(remote_rank))),
-                interior=make_obj_array([
-                    result[remote_rank, i].int for i in range(n)]),
-                exterior=make_obj_array([
-                    result[remote_rank, i].ext for i in range(n)])
-                )
+    All components of an object array *vec* are packed into one message
+    per neighboring rank. If *discrwb* has ``cross_rank_counters``
+    (a :class:`CrossRankCommunicationCounters`), they are updated.
+    """
+    rbcomms = [_RankBoundaryCommunication(discrwb, remote_rank, vec, tag=tag)
             for remote_rank in discrwb.connected_ranks()]
-    else:
-        return _cross_rank_trace_pairs_scalar_field(discrwb, vec, tag=tag)
+    result = [rbcomm.finish() for rbcomm in rbcomms]
+
+    counters = getattr(discrwb, "cross_rank_counters", None)
+    if counters is not None:
+        counters.nexchanges += 1
+        counters.nmessages_sent += len(rbcomms)
+        counters.nmessages_received += len(rbcomms)
+        counters.nbytes_sent += sum(rbcomm.nbytes for rbcomm in rbcomms)
+        counters.nbytes_received += sum(
+                rbcomm.exchange.recv_buffer.nbytes for rbcomm in rbcomms)
+
+    return result
 
 # }}}
 
@@ -25,7 +25,7 @@ from numbers import Number
 import numpy as np
 
 from pytools import memoize_in
-from pytools.obj_array import make_obj_array
+from pytools.obj_array import make_obj_array, obj_array_vectorize
 
 import loopy as lp
 import pyopencl as cl
@@ -36,13 +36,13 @@ from meshmode.array_context import ArrayContext, make_loopy_program, IsDOFArray
 
 import grudge.symbolic.mappers as mappers
 from grudge.symbolic.compiler import DiffBatchAssign
-from grudge.symbolic.operators import RefMassOperator, RefInverseMassOperator
+from grudge.symbolic.operators import RefDiffOperatorBase, RefFaceMassOperator
 from grudge import sym
 from grudge.function_registry import base_function_registry
 
 import grudge.loopy_dg_kernels as dgk
 from grudge.grudge_array_context import (GrudgeArrayContext, VecIsDOFArray,
-    FaceIsDOFArray, VecOpIsDOFArray, IsOpArray)
+    FaceIsDOFArray, VecFaceIsDOFArray, VecOpIsDOFArray, IsOpArray)
 
 import logging
 logger = logging.getLogger(__name__)
@@ -54,6 +54,326 @@ from loopy.version import LOOPY_USE_LANGUAGE_VERSION_2018_2  # noqa: F401
 ResultType = Union[DOFArray, Number]
 
 
+# {{{ elementwise-constant DOF arrays
+
+class ElementwiseConstantDOFArray:
+    """Stores a :class:`~meshmode.dof_array.DOFArray` that is constant on
+    each element with only one value per element. This is used for the
+    geometric factors of affine elements and for the results of elementwise
+    reductions.
+
+    .. attribute:: element_values
+
+        A :class:`~meshmode.dof_array.DOFArray` whose per-group arrays have
+        shape ``(nelements, 1)``.
+
+    .. attribute:: nunit_dofs
+
+        A :class:`tuple` of the number of DOFs per element in each group of
+        the represented array.
+
+    .. automethod:: from_dof_array
+    .. automethod:: expand
+    """
+
+    def __init__(self, element_values, nunit_dofs):
+        self.element_values = element_values
+        self.nunit_dofs = nunit_dofs
+
+        self._expanded = None
+
+    @property
+    def array_context(self):
+        return self.element_values.array_context
+
+    @property
+    def entry_dtype(self):
+        return self.element_values.entry_dtype
+
+    @classmethod
+    def from_dof_array(cls, ary):
+        """Keep the value at the first node of each element of the
+        elementwise constant :class:`~meshmode.dof_array.DOFArray` *ary*.
+        """
+        actx = ary.array_context
+
+        @memoize_in(actx, (ElementwiseConstantDOFArray, "from_dof_array_prg"))
+        def prg():
+            return make_loopy_program(
+                "{[iel]: 0<=iel<nelements}",
+                "result[iel, 0] = ary[iel, 0]",
+                kernel_data=[
+                    lp.GlobalArg("result", None, shape="nelements, 1",
+                        tags=IsDOFArray()),
+                    lp.GlobalArg("ary", None, shape="nelements, nunit_dofs",
+                        tags=IsDOFArray()),
+                    ...
+                ],
+                name="grudge_elementwise_constant_from_dof_array")
+
+        return cls(
+                DOFArray(actx, tuple(
+                    actx.call_loopy(prg(), ary=grp_ary)[1]["result"]
+                    for grp_ary in ary)),
+                tuple(grp_ary.shape[1] for grp_ary in ary))
+
+    def expand(self):
+        """Return a :class:`~meshmode.dof_array.DOFArray` holding the value
+        of each element at all of its nodes.
+
+        The expanded array is computed on the first call and kept, so that
+        values stored with the discretization (such as normals and face
+        jacobians) are expanded at most once, and only if they are read
+        outside of kernels that take the compact form.
+        """
+        if self._expanded is None:
+            self._expanded = self._expand()
+
+        return self._expanded
+
+    def _expand(self):
+        actx = self.array_context
+
+        @memoize_in(actx, (ElementwiseConstantDOFArray, "expand_prg"))
+        def prg():
+            return make_loopy_program(
+                "{[iel, idof]: 0<=iel<nelements and 0<=idof<nunit_dofs}",
+                "result[iel, idof] = element_values[iel, 0]",
+                kernel_data=[
+                    lp.GlobalArg("result", None, shape="nelements, nunit_dofs",
+                        tags=IsDOFArray()),
+                    lp.GlobalArg("element_values", None, shape="nelements, 1",
+                        tags=IsDOFArray()),
+                    ...
+                ],
+                name="grudge_elementwise_constant_expand")
+
+        return DOFArray(actx, tuple(
+            actx.call_loopy(prg(),
+                element_values=grp_ary, nunit_dofs=nunit_dofs)[1]["result"]
+            for grp_ary, nunit_dofs in zip(
+                self.element_values, self.nunit_dofs)))
+
+
+def _make_elementwise_constant_input_kernel(knl, arg_names):
+    """Return a version of the elementwise kernel *knl* that reads its
+    arguments *arg_names* from arrays of shape ``(nelements, 1)`` holding one
+    value per element, see :class:`ElementwiseConstantDOFArray`.
+    """
+    from loopy.symbolic import IdentityMapper
+
+    class ElementwiseConstantArgReader(IdentityMapper):
+        def map_subscript(self, expr):
+            if expr.aggregate.name in arg_names:
+                return expr.aggregate[expr.index_tuple[0], 0]
+            return super().map_subscript(expr)
+
+    reader = ElementwiseConstantArgReader()
+
+    return knl.copy(
+            name="%s_elwise_const" % knl.name,
+            instructions=[insn.with_transformed_expressions(reader)
+                for insn in knl.instructions],
+            args=[
+                arg.copy(shape=(arg.shape[0], 1), dim_tags=None, order="C")
+                if arg.name in arg_names else arg
+                for arg in knl.args])
+
+# }}}
+
+
+# {{{ constant DOF arrays
+
+class ConstantDOFArray:
+    """Stands for a :class:`~meshmode.dof_array.DOFArray` on :attr:`discr`
+    all of whose entries are :attr:`value`, without allocating it.
+
+    .. attribute:: discr
+    .. attribute:: value
+
+        A scalar.
+
+    .. automethod:: expand
+    """
+
+    def __init__(self, discr, value):
+        self.discr = discr
+        self.value = value
+
+    def expand(self, actx):
+        """Return a :class:`~meshmode.dof_array.DOFArray` holding
+        :attr:`value` at all nodes.
+        """
+        result = self.discr.empty(actx)
+        for grp_ary in result:
+            grp_ary.fill(self.value)
+
+        return result
+
+
+def _make_constant_input_kernel(knl, arg_names):
+    """Return a version of the elementwise kernel *knl* that receives its
+    arguments *arg_names* as scalars, see :class:`ConstantDOFArray`.
+    """
+    from loopy.symbolic import IdentityMapper
+
+    class ConstantArgReader(IdentityMapper):
+        def map_subscript(self, expr):
+            if expr.aggregate.name in arg_names:
+                return expr.aggregate
+            return super().map_subscript(expr)
+
+    reader = ConstantArgReader()
+
+    return knl.copy(
+            name="%s_const" % knl.name,
+            instructions=[insn.with_transformed_expressions(reader)
+                for insn in knl.instructions],
+            args=[
+                lp.ValueArg(arg.name, arg.dtype)
+                if arg.name in arg_names else arg
+                for arg in knl.args])
+
+# }}}
+
+
+# {{{ device-side nodal reductions
+
+class DeviceScalar:
+    """The result of a nodal reduction, kept on the device until its value
+    is needed on the host.
+
+    .. attribute:: array_context
+    .. attribute:: value
+
+        A zero-dimensional array of :attr:`array_context`.
+
+    .. attribute:: op_name
+
+        One of ``"sum"``, ``"min"``, or ``"max"``.
+
+    .. automethod:: start_allreduce
+    .. automethod:: get
+    """
+
+    def __init__(self, array_context, value, op_name):
+        self.array_context = array_context
+        self.value = value
+        self.op_name = op_name
+
+        self._host_value = None
+        self._allreduce = None
+
+    def start_allreduce(self, comm):
+        """Start combining the values of all ranks of the MPI communicator
+        *comm* using a nonblocking ``MPI.Iallreduce``. :meth:`get` then
+        returns the global value.
+
+        :returns: *self*.
+        """
+        from mpi4py import MPI
+
+        local_value = self.array_context.to_numpy(self.value).reshape(1)
+        global_value = np.empty_like(local_value)
+        request = comm.Iallreduce(local_value, global_value, op={
+            "sum": MPI.SUM,
+            "min": MPI.MIN,
+            "max": MPI.MAX,
+            }[self.op_name])
+
+        self._allreduce = request, local_value, global_value
+        return self
+
+    def get(self):
+        """Return the value as a :mod:`numpy` scalar, waiting for the
+        device and, if started, for :meth:`start_allreduce` to complete.
+        """
+        if self._host_value is None:
+            if self._allreduce is not None:
+                request, _, global_value = self._allreduce
+                request.Wait()
+                self._host_value = global_value[0]
+                self._allreduce = None
+            else:
+                self._host_value = \
+                        self.array_context.to_numpy(self.value)[()]
+
+        return self._host_value
+
+
+def nodal_reduction(actx, op_name, vec):
+    """Reduce all nodal values of *vec* on the device, without synchronizing
+    with the host.
+
+    :arg op_name: one of ``"sum"``, ``"min"``, or ``"max"``.
+    :arg vec: a :class:`~meshmode.dof_array.DOFArray` or an object array of
+        them, all of which are included in the reduction.
+    :returns: a :class:`DeviceScalar`.
+    """
+    @memoize_in(actx, (nodal_reduction, "nodal_%s_partial_prg" % op_name))
+    def prg():
+        return make_loopy_program(
+            "{[iel, jdof]: 0<=iel<nelements and 0<=jdof<ndofs}",
+            """
+            partials[iel] = %s(jdof, operand[iel, jdof])
+            """ % op_name,
+            kernel_data=[
+                lp.GlobalArg("partials", None, shape="nelements",
+                    offset=lp.auto),
+                lp.GlobalArg("operand", None, shape=lp.auto, tags=IsDOFArray()),
+                ...
+            ],
+            name="grudge_nodal_%s_partial" % op_name)
+
+    if isinstance(vec, DOFArray):
+        vec = make_obj_array([vec])
+
+    grp_arys = [grp_ary for ary in vec for grp_ary in ary]
+    dtype = np.result_type(*[grp_ary.dtype for grp_ary in grp_arys])
+
+    # The per-element results of all groups of all entries share one buffer,
+    # which is then reduced in a single pass.
+    partials = actx.empty(sum(grp_ary.shape[0] for grp_ary in grp_arys), dtype)
+
+    offset = 0
+    for grp_ary in grp_arys:
+        nelements = grp_ary.shape[0]
+        if not nelements:
+            continue
+
+        actx.call_loopy(prg(),
+                operand=grp_ary,
+                partials=partials[offset:offset + nelements])
+        offset += nelements
+
+    return DeviceScalar(actx, _reduce_flat_array(actx, op_name, partials), op_name)
+
+
+def _to_host_at_once(actx, values):
+    """Return a :class:`numpy.ndarray` of the zero-dimensional arrays
+    *values* of *actx*, transferred to the host with a single copy.
+    """
+    if isinstance(values[0], cl.array.Array):
+        values = cl.array.concatenate(
+                [value.reshape(1) for value in values], queue=actx.queue)
+    else:
+        values = np.stack(values)
+
+    return actx.to_numpy(values)
+
+
+def _reduce_flat_array(actx, op_name, ary):
+    """Return a zero-dimensional array of *actx* holding the sum, minimum or
+    maximum of the one-dimensional array *ary*.
+    """
+    if isinstance(ary, cl.array.Array):
+        return getattr(cl.array, op_name)(ary, queue=actx.queue)
+    else:
+        return np.asarray(getattr(np, op_name)(ary))
+
+# }}}
+
+
 # {{{ exec mapper
 
 class ExecutionMapper(mappers.Evaluator,
@@ -65,51 +385,82 @@ class ExecutionMapper(mappers.Evaluator,
         self.bound_op = bound_op
         self.function_registry = bound_op.function_registry
         self.array_context = array_context
+        self.buffer_pool = None
+
+    def _empty_dof_array(self, discr, dtype):
+        if self.buffer_pool is None:
+            return discr.empty(self.array_context, dtype=dtype)
+        else:
+            return self.buffer_pool.empty_dof_array(
+                    self.array_context, discr, dtype)
 
     # {{{ expression mappings
 
+    def _get_constant_dof_array(self, expr):
+        """Return a :class:`ConstantDOFArray` if *expr* broadcasts a scalar
+        onto a discretization, or *None*.
+        """
+        from numbers import Number
+        from pymbolic.primitives import Variable, Subscript
+
+        if isinstance(expr, sym.Ones):
+            dd = expr.dd
+            value = 1.0
+        elif isinstance(expr, sym.Variable):
+            dd = expr.dd
+            value = self.context.get(expr.name)
+        elif (isinstance(expr, Subscript)
+                and isinstance(expr.aggregate, sym.Variable)):
+            dd = expr.aggregate.dd
+            value = super().map_subscript(expr)
+        elif isinstance(expr, Variable):
+            value = self.context.get(expr.name)
+            if isinstance(value, ConstantDOFArray):
+                return value
+            return None
+        else:
+            return None
+
+        if dd.is_scalar() or not isinstance(value, Number):
+            return None
+
+        return ConstantDOFArray(self.discrwb.discr_from_dd(dd), value)
+
+    def _expand_constant_dof_array(self, constant):
+        return self.bound_op.get_expanded_constant(self.array_context, constant)
+
     def map_ones(self, expr):
         if expr.dd.is_scalar():
             return 1
 
-        discr = self.discrwb.discr_from_dd(expr.dd)
-
-        result = discr.empty(self.array_context)
-        for grp_ary in result:
-            grp_ary.fill(1.0)
-        return result
+        return self._expand_constant_dof_array(self._get_constant_dof_array(expr))
 
     def map_node_coordinate_component(self, expr):
         discr = self.discrwb.discr_from_dd(expr.dd)
         return thaw(self.array_context, discr.nodes()[expr.axis])
 
-    def map_grudge_variable(self, expr):
-        from numbers import Number
-
-        value = self.context[expr.name]
-        if not expr.dd.is_scalar() and isinstance(value, Number):
-            discr = self.discrwb.discr_from_dd(expr.dd)
-            ary = discr.empty(self.array_context)
-            for grp_ary in ary:
-                grp_ary.fill(value)
-            value = ary
+    def map_variable(self, expr):
+        value = super().map_variable(expr)
+        if isinstance(value, ElementwiseConstantDOFArray):
+            value = value.expand()
+        elif isinstance(value, ConstantDOFArray):
+            value = self._expand_constant_dof_array(value)
 
         return value
 
-    def map_subscript(self, expr):
-        value = super().map_subscript(expr)
+    def map_grudge_variable(self, expr):
+        constant = self._get_constant_dof_array(expr)
+        if constant is not None:
+            return self._expand_constant_dof_array(constant)
 
-        if isinstance(expr.aggregate, sym.Variable):
-            dd = expr.aggregate.dd
+        return self.context[expr.name]
 
-            from numbers import Number
-            if not dd.is_scalar() and isinstance(value, Number):
-                discr = self.discrwb.discr_from_dd(dd)
-                ary = discr.empty(self.array_context)
-                for grp_ary in ary:
-                    grp_ary.fill(value)
-                value = ary
-        return value
+    def map_subscript(self, expr):
+        constant = self._get_constant_dof_array(expr)
+        if constant is not None:
+            return self._expand_constant_dof_array(constant)
+
+        return super().map_subscript(expr)
 
     def map_call(self, expr):
         args = [self.rec(p) for p in expr.parameters]
@@ -119,18 +470,41 @@ class ExecutionMapper(mappers.Evaluator,
 
     # {{{ elementwise reductions
 
+    def _get_elementwise_constant_value(self, expr):
+        """Return the :class:`ElementwiseConstantDOFArray` that is the value
+        of the variable *expr* without expanding it, or *None*.
+        """
+        from pymbolic.primitives import Variable
+        if isinstance(expr, Variable):
+            value = self.context.get(expr.name)
+            if isinstance(value, ElementwiseConstantDOFArray):
+                return value
+
+        return None
+
     def _map_elementwise_reduction(self, op_name, field_expr, dd):
+        """
+        :returns: an :class:`ElementwiseConstantDOFArray`, which only stores
+            one value per element.
+        """
+        if op_name in ["min", "max"]:
+            value = self._get_elementwise_constant_value(field_expr)
+            if value is not None:
+                return value
+
         @memoize_in(self.array_context,
                 (ExecutionMapper, "elementwise_%s_prg" % op_name))
         def prg():
             return make_loopy_program(
-                "{[iel, idof, jdof]: 0<=iel<nelements and 0<=idof, jdof<ndofs}",
+                "{[iel, jdof]: 0<=iel<nelements and 0<=jdof<ndofs}",
                 """
-                result[iel, idof] = %s(jdof, operand[iel, jdof])
+                result[iel, 0] = %s(jdof, operand[iel, jdof])
                 """ % op_name,
                 kernel_data=[
-                    lp.GlobalArg("result", None, shape=lp.auto, tags=IsDOFArray()),
-                    lp.GlobalArg("operand", None, shape=lp.auto, tags=IsOpArray()),
+                    lp.GlobalArg("result", None, shape="nelements, 1",
+                        tags=IsDOFArray()),
+                    lp.GlobalArg("operand", None, shape="nelements, ndofs",
+                        tags=IsOpArray()),
                     ...
                 ],
                 name="grudge_elementwise_%s" % op_name)
@@ -139,15 +513,16 @@ class ExecutionMapper(mappers.Evaluator,
         discr = self.discrwb.discr_from_dd(dd)
         assert field.shape == (len(discr.groups),)
 
-        result = discr.empty(self.array_context, dtype=field.entry_dtype)
+        element_values = []
         for grp in discr.groups:
             assert field[grp.index].shape == (grp.nelements, grp.nunit_dofs)
-            self.array_context.call_loopy(
-                    prg(),
-                    operand=field[grp.index],
-                    result=result[grp.index])
+            _, result = self.array_context.call_loopy(
+                    prg(), operand=field[grp.index])
+            element_values.append(result["result"])
 
-        return result
+        return ElementwiseConstantDOFArray(
+                DOFArray(self.array_context, tuple(element_values)),
+                tuple(grp.nunit_dofs for grp in discr.groups))
 
     def map_elementwise_sum(self, op, field_expr):
         return self._map_elementwise_reduction("sum", field_expr, op.dd_in)
@@ -163,26 +538,24 @@ class ExecutionMapper(mappers.Evaluator,
     # {{{ nodal reductions
 
     def map_nodal_sum(self, op, field_expr):
-        # FIXME: Could allow array scalars
-        # FIXME: Fix CL-specific-ness
-        return sum([
-                cl.array.sum(grp_ary).get()[()]
-                for grp_ary in self.rec(field_expr)
-                ])
+        return nodal_reduction(
+                self.array_context, "sum", self.rec(field_expr)).get()
+
+    def _map_nodal_min_max(self, op_name, field_expr):
+        value = self._get_elementwise_constant_value(field_expr)
+        if value is not None:
+            # the extremal values are among the per-element values
+            field = value.element_values
+        else:
+            field = self.rec(field_expr)
+
+        return nodal_reduction(self.array_context, op_name, field).get()
 
     def map_nodal_max(self, op, field_expr):
-        # FIXME: Could allow array scalars
-        # FIXME: Fix CL-specific-ness
-        return np.max([
-            cl.array.max(grp_ary).get()[()]
-            for grp_ary in self.rec(field_expr)])
+        return self._map_nodal_min_max("max", field_expr)
 
     def map_nodal_min(self, op, field_expr):
-        # FIXME: Could allow array scalars
-        # FIXME: Fix CL-specific-ness
-        return np.min([
-            cl.array.min(grp_ary).get()[()]
-            for grp_ary in self.rec(field_expr)])
+        return self._map_nodal_min_max("min", field_expr)
 
     # }}}
 
@@ -305,7 +678,7 @@ class ExecutionMapper(mappers.Evaluator,
         in_discr = self.discrwb.discr_from_dd(op.dd_in)
         out_discr = self.discrwb.discr_from_dd(op.dd_out)
 
-        result = out_discr.empty(self.array_context, dtype=field.entry_dtype)
+        result = self._empty_dof_array(out_discr, field.entry_dtype)
 
         for in_grp, out_grp in zip(in_discr.groups, out_discr.groups):
 
@@ -350,6 +723,19 @@ class ExecutionMapper(mappers.Evaluator,
 
     # {{{ face mass operator
 
+    def _get_face_mass_matrix(self, op, afgrp, volgrp, dtype):
+        cache_key = "face_mass", afgrp, op, dtype
+        try:
+            return self.bound_op.operator_data_cache[cache_key]
+        except KeyError:
+            pass
+
+        matrix = self.array_context.freeze(
+                self.array_context.from_numpy(op.matrix(afgrp, volgrp, dtype)))
+
+        self.bound_op.operator_data_cache[cache_key] = matrix
+        return matrix
+
     def map_ref_face_mass_operator(self, op, field_expr):
         field = self.rec(field_expr)
 
@@ -379,23 +765,14 @@ class ExecutionMapper(mappers.Evaluator,
         all_faces_discr = all_faces_conn.to_discr
         vol_discr = all_faces_conn.from_discr
 
-        result = vol_discr.empty(self.array_context, dtype=field.entry_dtype)
+        result = self._empty_dof_array(vol_discr, field.entry_dtype)
 
         assert len(all_faces_discr.groups) == len(vol_discr.groups)
 
         for afgrp, volgrp in zip(all_faces_discr.groups, vol_discr.groups):
-            cache_key = "face_mass", afgrp, op, field.entry_dtype
-
             nfaces = volgrp.mesh_el_group.nfaces
-
-            try:
-                matrix = self.bound_op.operator_data_cache[cache_key]
-            except KeyError:
-                matrix = op.matrix(afgrp, volgrp, field.entry_dtype)
-                matrix = self.array_context.freeze(
-                        self.array_context.from_numpy(matrix))
-
-                self.bound_op.operator_data_cache[cache_key] = matrix
+            matrix = self._get_face_mass_matrix(
+                    op, afgrp, volgrp, field.entry_dtype)
 
             input_view = field[afgrp.index].reshape(
                     nfaces, volgrp.nelements, afgrp.nunit_dofs)
@@ -436,24 +813,30 @@ class ExecutionMapper(mappers.Evaluator,
     # {{{ instruction execution functions
 
     def map_insn_rank_data_swap(self, insn, profile_data=None):
-        local_data = self.array_context.to_numpy(flatten(self.rec(insn.field)))
-        comm = self.discrwb.mpi_communicator
-
-        # print("Sending data to rank %d with tag %d"
-        #             % (insn.i_remote_rank, insn.send_tag))
-        send_req = comm.Isend(local_data, insn.i_remote_rank, tag=insn.send_tag)
-
-        remote_data_host = np.empty_like(local_data)
-        recv_req = comm.Irecv(remote_data_host, insn.i_remote_rank, insn.recv_tag)
+        local_data = flatten(self.rec(insn.field))
+
+        exchange = self.discrwb.get_rank_boundary_exchange(
+                self.array_context, insn.i_remote_rank,
+                insn.send_tag, insn.recv_tag,
+                local_data.shape, local_data.dtype)
+        exchange.start_receive()
+
+        # Do not block on the copy to the host, the send is started once
+        # it has completed.
+        copy_evt = exchange.copy_to_send_buffer(local_data)
+        if copy_evt is not None:
+            send_future = MPIPendingSendFuture(copy_evt, exchange)
+        else:
+            exchange.start_send()
+            send_future = MPISendFuture(exchange.send_request)
 
         return [], [
                 MPIRecvFuture(
                     array_context=self.array_context,
                     bdry_discr=self.discrwb.discr_from_dd(insn.dd_out),
-                    recv_req=recv_req,
-                    insn_name=insn.name,
-                    remote_data_host=remote_data_host),
-                MPISendFuture(send_req)]
+                    exchange=exchange,
+                    insn_name=insn.name),
+                send_future]
 
     def map_insn_loopy_kernel(self, insn, profile_data=None):
         kdescr = insn.kernel_descriptor
@@ -461,15 +844,37 @@ class ExecutionMapper(mappers.Evaluator,
 
         dof_array_kwargs = {}
         other_kwargs = {}
+        elementwise_constant_args = set()
+        constant_args = set()
 
         for name, expr in kdescr.input_mappings.items():
+            elementwise_constant = self._get_elementwise_constant_value(expr)
+            if elementwise_constant is not None:
+                # read by the kernel without expanding it to all nodes
+                dof_array_kwargs[name] = elementwise_constant.element_values
+                elementwise_constant_args.add(name)
+                continue
+
+            # The differentiated input of a fused kernel is always read as an
+            # array, see grudge.symbolic.compiler.fuse_diff_batches.
+            if kdescr.diff_operators is not None and name == "diff_vec":
+                constant = None
+            else:
+                constant = self._get_constant_dof_array(expr)
+
+            if constant is not None:
+                # passed to the kernel as a scalar
+                other_kwargs[name] = constant.value
+                constant_args.add(name)
+                continue
+
             v = self.rec(expr)
             if isinstance(v, DOFArray):
                 dof_array_kwargs[name] = v
             else:
                 other_kwargs[name] = v
 
-        for name in kdescr.scalar_args():
+        for name in kdescr.scalar_args() + sorted(constant_args):
             v = other_kwargs[name]
             if isinstance(v, (int, float)):
                 other_kwargs[name] = discr.real_dtype.type(v)
@@ -481,6 +886,21 @@ class ExecutionMapper(mappers.Evaluator,
                 raise ValueError("unrecognized scalar type for variable '%s': %s"
                         % (name, type(v)))
 
+        knl = kdescr.loopy_kernel
+        if elementwise_constant_args or constant_args:
+            cache_key = ("constant_input_kernel", insn,
+                    frozenset(elementwise_constant_args),
+                    frozenset(constant_args))
+            try:
+                knl = self.bound_op.operator_data_cache[cache_key]
+            except KeyError:
+                if elementwise_constant_args:
+                    knl = _make_elementwise_constant_input_kernel(
+                            knl, elementwise_constant_args)
+                if constant_args:
+                    knl = _make_constant_input_kernel(knl, constant_args)
+                self.bound_op.operator_data_cache[cache_key] = knl
+
         result = {}
         for grp in discr.groups:
             kwargs = other_kwargs.copy()
@@ -490,8 +910,36 @@ class ExecutionMapper(mappers.Evaluator,
             for name, ary in dof_array_kwargs.items():
                 kwargs[name] = ary[grp.index]
 
-            _, knl_result = self.array_context.call_loopy(
-                    kdescr.loopy_kernel, **kwargs)
+            if kdescr.diff_operators is not None:
+                # reference derivatives computed within the kernel, see
+                # grudge.symbolic.compiler.fuse_diff_batches
+                kwargs["diff_mat"] = self._get_diff_matrices(
+                        kdescr.diff_operators, grp, grp,
+                        dof_array_kwargs["diff_vec"].entry_dtype)
+
+            if self.buffer_pool is not None:
+                # Reuse pooled arrays for the outputs, with the layout loopy
+                # chose for them in an earlier call.
+                outputs_key = ("loopy_kernel_outputs", insn, grp.index,
+                        tuple(sorted(
+                            (name, getattr(val, "dtype", type(val)))
+                            for name, val in kwargs.items())))
+                output_templates = self.bound_op.operator_data_cache.get(
+                        outputs_key, {})
+                for name, (shape, dtype, strides) in output_templates.items():
+                    ary = self.buffer_pool.take(shape, dtype, strides,
+                            allow_donated=True)
+                    if ary is not None:
+                        kwargs[name] = ary
+
+            _, knl_result = self.array_context.call_loopy(knl, **kwargs)
+
+            if self.buffer_pool is not None:
+                for val in knl_result.values():
+                    self.buffer_pool.adopt(val)
+                self.bound_op.operator_data_cache[outputs_key] = {
+                        name: (val.shape, val.dtype, val.strides)
+                        for name, val in knl_result.items()}
 
             for name, val in knl_result.items():
                 result.setdefault(name, []).append(val)
@@ -503,13 +951,25 @@ class ExecutionMapper(mappers.Evaluator,
         return list(result.items()), []
 
     def map_insn_assign(self, insn, profile_data=None):
-        return [(name, self.rec(expr))
-                for name, expr in zip(insn.names, insn.exprs)], []
+        assignments = []
+        for name, expr in zip(insn.names, insn.exprs):
+            # Broadcast scalars are only expanded once they are needed, see
+            # map_variable.
+            value = self._get_constant_dof_array(expr)
+            if value is None:
+                value = self.rec(expr)
+
+            assignments.append((name, value))
+
+        return assignments, []
 
     def map_insn_assign_to_discr_scoped(self, insn, profile_data=None):
         assignments = []
         for name, expr in zip(insn.names, insn.exprs):
             value = self.rec(expr)
+            if insn.elementwise_constant and isinstance(value, DOFArray):
+                value = ElementwiseConstantDOFArray.from_dof_array(value)
+
             self.discrwb._discr_scoped_subexpr_name_to_value[name] = value
             assignments.append((name, value))
 
@@ -519,7 +979,39 @@ class ExecutionMapper(mappers.Evaluator,
         return [(insn.name,
             self.discrwb._discr_scoped_subexpr_name_to_value[insn.name])], []
 
+    def _get_diff_matrices(self, operators, out_grp, in_grp, dtype):
+        """Return a device array of shape ``(len(operators), nunit_dofs_out,
+        nunit_dofs_in)`` holding the reference matrices of *operators*.
+        """
+        cache_key = "diff_batch", in_grp, out_grp, tuple(operators), dtype
+        try:
+            return self.bound_op.operator_data_cache[cache_key]
+        except KeyError:
+            pass
+
+        matrices_ary = np.empty(
+            (len(operators), out_grp.nunit_dofs, in_grp.nunit_dofs),
+            dtype=dtype)
+
+        if isinstance(operators[0], RefDiffOperatorBase):
+            matrices = operators[0].matrices(out_grp, in_grp)
+            for i, op in enumerate(operators):
+                matrices_ary[i] = matrices[op.rst_axis]
+        else:
+            for i, op in enumerate(operators):
+                matrices_ary[i] = op.matrix(out_grp, in_grp)
+
+        matrices_ary_dev = self.array_context.from_numpy(matrices_ary)
+        self.bound_op.operator_data_cache[cache_key] = matrices_ary_dev
+        return matrices_ary_dev
+
     def map_insn_diff_batch_assign(self, insn, profile_data=None):
+        if isinstance(insn.operators[0], RefFaceMassOperator):
+            return self._map_face_mass_batch_assign(insn)
+
+        if len(insn.fields) > 1:
+            return self._map_multi_field_diff_batch_assign(insn)
+
         ifield = insn.field
         field = self.rec(ifield)
         repr_op = insn.operators[0]
@@ -560,40 +1052,28 @@ class ExecutionMapper(mappers.Evaluator,
             result = lp.tag_array_axes(result, "result", "sep,c,c")
             return result
 
+        @memoize_in(self.array_context,
+                (ExecutionMapper, "opt_reference_derivative_prg"))
+        def opt_prg(n_mat, n_elem, n_in, n_out, fp_format):
+            return dgk.gen_diff_knl_fortran2(n_mat, n_elem, n_in, n_out,
+                    options=lp.Options(no_numpy=True, return_dict=True),
+                    fp_format=fp_format)
+
         noperators = len(insn.operators)
 
         in_discr = self.discrwb.discr_from_dd(repr_op.dd_in)
         out_discr = self.discrwb.discr_from_dd(repr_op.dd_out)
 
         result = make_obj_array([
-            out_discr.empty(self.array_context, dtype=field.entry_dtype)
+            self._empty_dof_array(out_discr, field.entry_dtype)
             for idim in range(noperators)])
 
         for in_grp, out_grp in zip(in_discr.groups, out_discr.groups):
             if in_grp.nelements == 0:
                 continue
 
-            # Cache operator
-            cache_key = "diff_batch", in_grp, out_grp, tuple(insn.operators),\
-                field.entry_dtype
-            try:
-                matrices_ary_dev = self.bound_op.operator_data_cache[cache_key]
-            except KeyError:
-                matrices = repr_op.matrices(out_grp, in_grp)
-                matrices_ary = np.empty(
-                    (noperators, out_grp.nunit_dofs, in_grp.nunit_dofs),
-                    dtype=field.entry_dtype)
-
-                for i, op in enumerate(insn.operators):
-                    # Is there a more flexible way to do this?
-                    if isinstance(op, RefInverseMassOperator) or \
-                       isinstance(op, RefMassOperator):
-                        matrices_ary[i] = matrices[0]
-                    else:
-                        matrices_ary[i] = matrices[op.rst_axis]
-
-                matrices_ary_dev = self.array_context.from_numpy(matrices_ary)
-                self.bound_op.operator_data_cache[cache_key] = matrices_ary_dev
+            matrices_ary_dev = self._get_diff_matrices(insn.operators,
+                    out_grp, in_grp, field.entry_dtype)
 
             # Breaks on complex data types without check
             # TODO Add fallback transformations to hjson file
@@ -604,9 +1084,8 @@ class ExecutionMapper(mappers.Evaluator,
                     and isinstance(self.array_context, GrudgeArrayContext):
                 n_out, n_in = matrices_ary_dev[0].shape
                 n_elem = field[in_grp.index].shape[0]
-                options = lp.Options(no_numpy=True, return_dict=True)
-                program = dgk.gen_diff_knl_fortran2(noperators, n_elem, n_in,
-                    n_out, options=options, fp_format=field.entry_dtype)
+                program = opt_prg(noperators, n_elem, n_in, n_out,
+                        field.entry_dtype)
             else:
                 program = prg(noperators)
 
@@ -619,36 +1098,290 @@ class ExecutionMapper(mappers.Evaluator,
 
         return [(name, result[i]) for i, name in enumerate(insn.names)], []
 
+    def _map_multi_field_diff_batch_assign(self, insn):
+        fields = [self.rec(ifield) for ifield in insn.fields]
+        repr_op = insn.operators[0]
+
+        if len({field.entry_dtype for field in fields}) > 1:
+            # The kernel below requires a common data type for all fields.
+            noperators = len(insn.operators)
+            assignments = []
+            for ifield, field in enumerate(insn.fields):
+                field_assignments, _ = self.map_insn_diff_batch_assign(
+                        DiffBatchAssign(
+                            names=insn.names[
+                                ifield*noperators:(ifield+1)*noperators],
+                            operators=insn.operators,
+                            field=field))
+                assignments.extend(field_assignments)
+
+            return assignments, []
+
+        assert repr_op.dd_in.domain_tag == repr_op.dd_out.domain_tag
+
+        @memoize_in(self.array_context,
+                (ExecutionMapper, "multi_field_reference_derivative_prg"))
+        def prg(n_mat, n_fields):
+            result = make_loopy_program(
+                """{[ifield, imatrix, iel, idof, j]:
+                    0<=ifield<nfields and
+                    0<=imatrix<nmatrices and
+                    0<=iel<nelements and
+                    0<=idof<nunit_nodes_out and
+                    0<=j<nunit_nodes_in}""",
+                """
+                result[ifield*nmatrices + imatrix, iel, idof] = simul_reduce(sum,
+                        j, diff_mat[imatrix, idof, j] * vec[ifield, iel, j])
+                """,
+                kernel_data=[
+                    lp.GlobalArg("result", None, shape=lp.auto,
+                                    tags=VecIsDOFArray()),
+                    lp.GlobalArg("vec", None, shape=lp.auto,
+                                    tags=VecIsDOFArray()),
+                    lp.GlobalArg("diff_mat", None, shape=lp.auto,
+                        tags=VecOpIsDOFArray()),
+                    ...
+                ],
+                name="multi_field_diff_{}d_{}f".format(n_mat, n_fields))
+
+            result = lp.fix_parameters(result, nmatrices=n_mat, nfields=n_fields)
+            result = lp.tag_inames(result, "imatrix: ilp, ifield: ilp")
+            result = lp.tag_array_axes(result, "result", "sep,c,c")
+            result = lp.tag_array_axes(result, "vec", "sep,c,c")
+            return result
+
+        noperators = len(insn.operators)
+        dtype = fields[0].entry_dtype
+
+        in_discr = self.discrwb.discr_from_dd(repr_op.dd_in)
+        out_discr = self.discrwb.discr_from_dd(repr_op.dd_out)
+
+        result = make_obj_array([
+            self._empty_dof_array(out_discr, dtype)
+            for name in insn.names])
+
+        program = prg(noperators, len(fields))
+        for in_grp, out_grp in zip(in_discr.groups, out_discr.groups):
+            if in_grp.nelements == 0:
+                continue
+
+            self.array_context.call_loopy(
+                    program,
+                    diff_mat=self._get_diff_matrices(insn.operators,
+                        out_grp, in_grp, dtype),
+                    result=make_obj_array([result_i[out_grp.index]
+                        for result_i in result]),
+                    vec=make_obj_array([field[in_grp.index]
+                        for field in fields]))
+
+        return list(zip(insn.names, result)), []
+
+    def _map_face_mass_batch_assign(self, insn):
+        op, = insn.operators
+        fields = [self.rec(ifield) for ifield in insn.fields]
+
+        if (not all(isinstance(field, DOFArray) for field in fields)
+                or len({field.entry_dtype for field in fields}) > 1):
+            # The kernel below requires a common data type for all fields.
+            return [
+                    (name, self.map_ref_face_mass_operator(op, ifield))
+                    for name, ifield in zip(insn.names, insn.fields)], []
+
+        @memoize_in(self.array_context,
+                (ExecutionMapper, "multi_field_face_mass_knl"))
+        def prg(n_fields):
+            result = make_loopy_program(
+                """{[ifield,iel,idof,f,j]:
+                    0<=ifield<nfields and
+                    0<=iel<nelements and
+                    0<=f<nfaces and
+                    0<=idof<nvol_nodes and
+                    0<=j<nface_nodes}""",
+                """
+                result[ifield,iel,idof] = sum(f, sum(j,
+                        mat[idof, f, j] * vec[ifield, f, iel, j]))
+                """,
+                kernel_data=[
+                    lp.GlobalArg("result", None, shape=lp.auto,
+                        tags=VecIsDOFArray()),
+                    lp.GlobalArg("vec", None, shape=lp.auto,
+                        tags=VecFaceIsDOFArray()),
+                    "..."
+                ],
+                name="multi_field_face_mass_{}f".format(n_fields))
+
+            result = lp.fix_parameters(result, nfields=n_fields)
+            result = lp.tag_inames(result, "ifield: ilp")
+            result = lp.tag_array_axes(result, "result", "sep,c,c")
+            result = lp.tag_array_axes(result, "vec", "sep,c,c,c")
+            return result
+
+        all_faces_conn = self.discrwb.connection_from_dds("vol", op.dd_in)
+        all_faces_discr = all_faces_conn.to_discr
+        vol_discr = all_faces_conn.from_discr
+
+        dtype = fields[0].entry_dtype
+        result = [self._empty_dof_array(vol_discr, dtype) for field in fields]
+
+        assert len(all_faces_discr.groups) == len(vol_discr.groups)
+
+        program = prg(len(fields))
+        for afgrp, volgrp in zip(all_faces_discr.groups, vol_discr.groups):
+            if volgrp.nelements == 0:
+                continue
+
+            nfaces = volgrp.mesh_el_group.nfaces
+            self.array_context.call_loopy(
+                    program,
+                    mat=self._get_face_mass_matrix(op, afgrp, volgrp, dtype),
+                    result=make_obj_array([result_i[volgrp.index]
+                        for result_i in result]),
+                    vec=make_obj_array([
+                        field[afgrp.index].reshape(
+                            nfaces, volgrp.nelements, afgrp.nunit_dofs)
+                        for field in fields]))
+
+        return list(zip(insn.names, result)), []
+
     # }}}
 
 # }}}
 
 
+# {{{ rank boundary exchange
+
+class RankBoundaryExchange:
+    """Host staging buffers and persistent MPI requests for repeatedly
+    exchanging flat arrays of a fixed shape and dtype with one remote rank.
+
+    For a :class:`pyopencl.array.Array`-based array context, the staging
+    buffers are page-locked, so that the copies from and to the device may
+    proceed asynchronously.
+
+    .. attribute:: send_buffer
+    .. attribute:: recv_buffer
+    .. attribute:: send_request
+    .. attribute:: recv_request
+
+    .. automethod:: start_receive
+    .. automethod:: copy_to_send_buffer
+    .. automethod:: start_send
+    .. automethod:: get_received
+    """
+
+    def __init__(self, comm, array_context, remote_rank, send_tag, recv_tag,
+            shape, dtype):
+        self.array_context = array_context
+        self.remote_rank = remote_rank
+
+        self._mapped_buffers = []
+        self.send_buffer = self._allocate_host_buffer(shape, dtype)
+        self.recv_buffer = self._allocate_host_buffer(shape, dtype)
+
+        self.send_request = comm.Send_init(
+                self.send_buffer, remote_rank, tag=send_tag)
+        self.recv_request = comm.Recv_init(
+                self.recv_buffer, remote_rank, tag=recv_tag)
+
+    def _allocate_host_buffer(self, shape, dtype):
+        queue = getattr(self.array_context, "queue", None)
+        nbytes = np.dtype(dtype).itemsize * int(np.prod(shape))
+        if queue is None or not nbytes:
+            return np.empty(shape, dtype=dtype)
+
+        buf = cl.Buffer(queue.context,
+                cl.mem_flags.READ_WRITE | cl.mem_flags.ALLOC_HOST_PTR, nbytes)
+        # The buffer stays mapped for the lifetime of the exchange.
+        ary, _ = cl.enqueue_map_buffer(queue, buf,
+                cl.map_flags.READ | cl.map_flags.WRITE, 0, shape, dtype,
+                is_blocking=True)
+        self._mapped_buffers.append(buf)
+        return ary
+
+    def start_receive(self):
+        self.recv_request.Start()
+
+    def copy_to_send_buffer(self, ary):
+        """Copy the flat array *ary* into :attr:`send_buffer`.
+
+        :returns: a :class:`pyopencl.Event` if the copy was enqueued
+            asynchronously, or *None* if it has already completed.
+        """
+        if isinstance(ary, cl.array.Array) and ary.size:
+            evt = cl.enqueue_copy(self.array_context.queue,
+                    self.send_buffer, ary.data,
+                    device_offset=ary.offset, is_blocking=False)
+            self.array_context.queue.flush()
+            return evt
+        else:
+            self.send_buffer[:] = self.array_context.to_numpy(ary)
+            return None
+
+    def start_send(self):
+        self.send_request.Start()
+
+    def get_received(self):
+        """Return the contents of :attr:`recv_buffer` as an array of the
+        array context. Must only be called once :attr:`recv_request` has
+        completed.
+        """
+        result = self.array_context.from_numpy(self.recv_buffer)
+        if result is self.recv_buffer:
+            # The buffer is overwritten by the next exchange.
+            result = result.copy()
+        return result
+
+# }}}
+
+
 # {{{ futures
 
 class MPIRecvFuture:
-    def __init__(self, array_context, bdry_discr, recv_req, insn_name,
-            remote_data_host):
+    def __init__(self, array_context, bdry_discr, exchange, insn_name):
         self.array_context = array_context
         self.bdry_discr = bdry_discr
-        self.receive_request = recv_req
+        self.exchange = exchange
+        self.receive_request = exchange.recv_request
+        self.mpi_request = exchange.recv_request
         self.insn_name = insn_name
-        self.remote_data_host = remote_data_host
 
     def is_ready(self):
         return self.receive_request.Test()
 
     def __call__(self):
         self.receive_request.Wait()
-        actx = self.array_context
         remote_data = unflatten(self.array_context, self.bdry_discr,
-                actx.from_numpy(self.remote_data_host))
+                self.exchange.get_received())
         return [(self.insn_name, remote_data)], []
 
 
+class MPIPendingSendFuture:
+    """Starts the send of *exchange* once *copy_event*, the copy of the data
+    to its send buffer, has completed.
+    """
+
+    # Code.execute evaluates this as soon as it is ready, to post the send
+    # early.
+    evaluate_when_ready = True
+
+    def __init__(self, copy_event, exchange):
+        self.copy_event = copy_event
+        self.exchange = exchange
+
+    def is_ready(self):
+        return (self.copy_event.command_execution_status
+                == cl.command_execution_status.COMPLETE)
+
+    def __call__(self):
+        self.copy_event.wait()
+        self.exchange.start_send()
+        return [], [MPISendFuture(self.exchange.send_request)]
+
+
 class MPISendFuture:
     def __init__(self, send_request):
         self.send_request = send_request
+        self.mpi_request = send_request
 
     def is_ready(self):
         return self.send_request.Test()
@@ -660,6 +1393,253 @@ class MPISendFuture:
 # }}}
 
 
+# {{{ buffer pool
+
+def _get_buffer_id(ary):
+    """Return an identifier of the memory underlying *ary*, which is shared
+    by all views of the same allocation.
+    """
+    base_data = getattr(ary, "base_data", None)
+    if base_data is not None:
+        return base_data.int_ptr
+
+    while isinstance(getattr(ary, "base", None), np.ndarray):
+        ary = ary.base
+    return id(ary)
+
+
+def _get_buffer_ids(value, buffer_ids):
+    if isinstance(value, DOFArray):
+        for grp_ary in value:
+            _get_buffer_ids(grp_ary, buffer_ids)
+    elif isinstance(value, ElementwiseConstantDOFArray):
+        _get_buffer_ids(value.element_values, buffer_ids)
+    elif isinstance(value, np.ndarray) and value.dtype.char == "O":
+        for subvalue in value.flat:
+            _get_buffer_ids(subvalue, buffer_ids)
+    elif isinstance(value, (tuple, list)):
+        for subvalue in value:
+            _get_buffer_ids(subvalue, buffer_ids)
+    elif hasattr(value, "shape") and hasattr(value, "dtype"):
+        buffer_ids.add(_get_buffer_id(value))
+
+    return buffer_ids
+
+
+class BufferPool:
+    """Recycles the arrays holding intermediate results of a
+    :class:`BoundOperator`. Arrays are handed out during a call (see
+    :meth:`begin_call`). Arrays that are only referenced by variables that
+    have been discarded (see :meth:`add_reference` and
+    :meth:`remove_reference`) become available for reuse right away, and, at
+    the end of the call (see :meth:`end_call`), all arrays that are not part
+    of the result become available for reuse by the next call.
+
+    .. attribute:: in_use_nbytes
+
+        Number of bytes in arrays handed out during the current call and not
+        yet released.
+
+    .. attribute:: peak_nbytes
+
+        Maximum of :attr:`in_use_nbytes` during the most recent call.
+
+    .. attribute:: held_nbytes
+
+        Number of bytes in all arrays owned by the pool, whether in use
+        or not.
+
+    .. attribute:: nallocations
+
+        Number of arrays newly allocated during the most recent call.
+
+    .. attribute:: nreuses
+
+        Number of arrays reused during the most recent call.
+
+    .. automethod:: empty_dof_array
+    .. automethod:: take
+    .. automethod:: adopt
+    .. automethod:: add_reference
+    .. automethod:: remove_reference
+    .. automethod:: donate
+    .. automethod:: retain
+    """
+
+    def __init__(self):
+        self._free = {}
+        self._in_use = {}
+        self._refcounts = {}
+        self._donated = []
+
+        self.in_use_nbytes = 0
+        self.peak_nbytes = 0
+        self.held_nbytes = 0
+        self.nallocations = 0
+        self.nreuses = 0
+
+    def begin_call(self):
+        # Arrays still marked as in use were handed out by a call that did
+        # not finish and may be referenced from anywhere.
+        for ary in self._in_use.values():
+            self.held_nbytes -= ary.nbytes
+        self._in_use = {}
+        self._refcounts = {}
+        self._donated = []
+        self.in_use_nbytes = 0
+
+        self.peak_nbytes = 0
+        self.nallocations = 0
+        self.nreuses = 0
+
+    def _mark_in_use(self, ary):
+        self._in_use[_get_buffer_id(ary)] = ary
+        self.in_use_nbytes += ary.nbytes
+        self.peak_nbytes = max(self.peak_nbytes, self.in_use_nbytes)
+
+    def _release(self, ary):
+        self.in_use_nbytes -= ary.nbytes
+        self._free.setdefault((ary.shape, ary.dtype), []).append(ary)
+
+    def take(self, shape, dtype, strides=None, allow_donated=False):
+        """Return a free array with the given properties, or *None* if there
+        is none.
+
+        :arg allow_donated: if *True*, arrays passed to :meth:`donate` may be
+            returned as well. Only pass this when the returned array is used
+            for the output of a pointwise operation.
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+
+        def matches(ary):
+            return (ary.shape == shape and ary.dtype == dtype
+                    and (strides is None or ary.strides == tuple(strides)))
+
+        if allow_donated:
+            for i, ary in enumerate(self._donated):
+                if matches(ary):
+                    del self._donated[i]
+                    self.nreuses += 1
+                    return ary
+
+        free = self._free.get((shape, dtype), [])
+        for i, ary in enumerate(free):
+            if matches(ary):
+                del free[i]
+                self._mark_in_use(ary)
+                self.nreuses += 1
+                return ary
+
+        return None
+
+    def adopt(self, ary):
+        """Make the pool responsible for *ary*, which was allocated outside of
+        the pool during the current call.
+        """
+        if _get_buffer_id(ary) in self._in_use:
+            return
+
+        self._mark_in_use(ary)
+        self.held_nbytes += ary.nbytes
+        self.nallocations += 1
+
+    def _add_free(self, ary):
+        self._free.setdefault((ary.shape, ary.dtype), []).append(ary)
+        self.held_nbytes += ary.nbytes
+
+    def empty_dof_array(self, actx, discr, dtype):
+        """Return a :class:`~meshmode.dof_array.DOFArray` on *discr* with
+        (uninitialized) storage taken from the pool where possible.
+        """
+        dtype = np.dtype(dtype)
+        grp_arys = [self.take((grp.nelements, grp.nunit_dofs), dtype)
+                for grp in discr.groups]
+
+        if any(grp_ary is None for grp_ary in grp_arys):
+            new_ary = discr.empty(actx, dtype=dtype)
+            for i, grp_ary in enumerate(grp_arys):
+                if grp_ary is None:
+                    grp_arys[i] = new_ary[i]
+                    self.adopt(new_ary[i])
+                else:
+                    self._add_free(new_ary[i])
+
+        return DOFArray(actx, tuple(grp_arys))
+
+    def add_reference(self, value):
+        """Record that the pooled arrays in *value* are referenced by one more
+        variable.
+        """
+        for buffer_id in _get_buffer_ids(value, set()):
+            if buffer_id in self._in_use:
+                self._refcounts[buffer_id] = self._refcounts.get(buffer_id, 0) + 1
+
+    def remove_reference(self, value):
+        """Record that a variable referencing the pooled arrays in *value* was
+        discarded. Arrays no longer referenced by any variable are released.
+        """
+        for buffer_id in _get_buffer_ids(value, set()):
+            refcount = self._refcounts.get(buffer_id)
+            if refcount is None:
+                continue
+            elif refcount > 1:
+                self._refcounts[buffer_id] = refcount - 1
+            else:
+                del self._refcounts[buffer_id]
+                self._release(self._in_use.pop(buffer_id))
+
+    def donate(self, value):
+        """Allow the pooled arrays in *value* that are referenced by just one
+        variable to be reused for the output of the next instruction (see
+        *allow_donated* in :meth:`take`). The caller guarantees that the
+        variable is not needed after that instruction.
+        """
+        for buffer_id in _get_buffer_ids(value, set()):
+            if self._refcounts.get(buffer_id) == 1:
+                self._donated.append(self._in_use[buffer_id])
+
+    def end_donation(self):
+        self._donated = []
+
+    def retain(self, value):
+        """Hand the pooled arrays in *value* over to the caller, who keeps
+        them beyond the current call. They are no longer owned by the pool.
+        """
+        for buffer_id in _get_buffer_ids(value, set()):
+            ary = self._in_use.pop(buffer_id, None)
+            if ary is not None:
+                self._refcounts.pop(buffer_id, None)
+                self.in_use_nbytes -= ary.nbytes
+                self.held_nbytes -= ary.nbytes
+
+    def end_call(self, result):
+        """Release all arrays handed out during the current call that are
+        not referenced by *result*. Arrays that are referenced are no longer
+        owned by the pool.
+        """
+        result_buffer_ids = _get_buffer_ids(result, set())
+
+        for buffer_id, ary in self._in_use.items():
+            if buffer_id in result_buffer_ids:
+                self.held_nbytes -= ary.nbytes
+            else:
+                self._free.setdefault((ary.shape, ary.dtype), []).append(ary)
+
+        self._in_use = {}
+        self._refcounts = {}
+        self._donated = []
+        self.in_use_nbytes = 0
+
+    def clear(self):
+        """Drop all free arrays."""
+        for free in self._free.values():
+            self.held_nbytes -= sum(ary.nbytes for ary in free)
+        self._free = {}
+
+# }}}
+
+
 # {{{ bound operator
 
 class BoundOperator:
@@ -673,6 +1653,82 @@ class BoundOperator:
         self.function_registry = function_registry
         self.exec_mapper_factory = exec_mapper_factory
 
+        # If not *None*, log progress every this many seconds while waiting
+        # for communication.
+        self.wait_timeout = None
+
+        # If *True*, also reuse results depending on inputs that are the
+        # same objects as in the previous call. Inputs must then never be
+        # modified in place between calls, see HoistedValueCache.
+        self.reuse_input_dependent_results = False
+
+        from weakref import WeakKeyDictionary
+        self._buffer_pools = WeakKeyDictionary()
+        self._hoisted_value_caches = WeakKeyDictionary()
+        self._expanded_constants = WeakKeyDictionary()
+
+    def get_expanded_constant(self, array_context, constant):
+        """Return :meth:`ConstantDOFArray.expand` of *constant*, which is only
+        computed once per discretization and value for each *array_context*.
+        The returned array is shared and must not be modified.
+        """
+        expanded_constants = self._expanded_constants.setdefault(
+                array_context, {})
+
+        key = (constant.discr, type(constant.value), constant.value)
+        try:
+            return expanded_constants[key]
+        except KeyError:
+            result = expanded_constants[key] = constant.expand(array_context)
+            return result
+
+    def _copy_expanded_constants(self, array_context, result):
+        """Return *result* with copies in place of the arrays returned by
+        :meth:`get_expanded_constant`, so that callers may modify it.
+        """
+        expanded_ids = {id(ary)
+                for ary in self._expanded_constants.get(
+                    array_context, {}).values()}
+        if not expanded_ids:
+            return result
+
+        def copy_if_expanded(value):
+            if id(value) in expanded_ids:
+                return DOFArray(array_context,
+                        tuple(grp_ary.copy() for grp_ary in value))
+            return value
+
+        return obj_array_vectorize(copy_if_expanded, result)
+
+    def get_buffer_pool(self, array_context):
+        """Return the :class:`BufferPool` used to recycle intermediate arrays
+        when evaluating with *array_context*.
+        """
+        try:
+            return self._buffer_pools[array_context]
+        except KeyError:
+            pool = self._buffer_pools[array_context] = BufferPool()
+            return pool
+
+    def get_hoisted_value_cache(self, array_context):
+        """Return the :class:`~grudge.symbolic.compiler.HoistedValueCache`
+        holding results of the per-evaluation code that are reused across
+        calls with *array_context*, or *None* if ``"no_hoisting"`` is among
+        the debug flags.
+        """
+        if "no_hoisting" in self.debug_flags:
+            return None
+
+        try:
+            cache = self._hoisted_value_caches[array_context]
+        except KeyError:
+            from grudge.symbolic.compiler import HoistedValueCache
+            cache = self._hoisted_value_caches[array_context] = \
+                    HoistedValueCache()
+
+        cache.reuse_input_dependent = self.reuse_input_dependent_results
+        return cache
+
     def __str__(self):
         sep = 75 * "=" + "\n"
         return (
@@ -744,26 +1800,107 @@ class BoundOperator:
 
         # }}}
 
-        return self.eval_code.execute(
-                self.exec_mapper_factory(array_context, context, self),
+        buffer_pool = self.get_buffer_pool(array_context)
+        exec_mapper = self.exec_mapper_factory(array_context, context, self)
+        exec_mapper.buffer_pool = buffer_pool
+
+        buffer_pool.begin_call()
+        result = self.eval_code.execute(
+                exec_mapper,
                 profile_data=profile_data,
-                log_quantities=log_quantities)
+                log_quantities=log_quantities,
+                wait_timeout=self.wait_timeout,
+                hoisted_values=self.get_hoisted_value_cache(array_context))
+        buffer_pool.end_call(result)
+
+        if profile_data is not None:
+            result, profile_data = result
+            profile_data["buffer_pool_peak_nbytes"] = buffer_pool.peak_nbytes
+            profile_data["buffer_pool_held_nbytes"] = buffer_pool.held_nbytes
+
+        result = self._copy_expanded_constants(array_context, result)
+
+        if profile_data is not None:
+            return result, profile_data
+        return result
 
 # }}}
 
 
 # {{{ process_sym_operator function
 
-def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=None,
-        local_only=None):
-    if local_only is None:
-        local_only = False
+def _get_canonical_form(expr, memo):
+    """Return a nested :class:`tuple` of :class:`str`, :class:`bytes` and
+    numbers describing the structure of *expr*, including the data types of
+    numpy values and all :class:`~grudge.symbolic.primitives.DOFDesc`
+    attributes. Unlike a pickle of *expr*, it does not depend on which
+    subexpressions are shared objects, and unlike its printed form, it does
+    not omit any of the arguments of an expression node.
+    """
+    try:
+        _, result = memo[id(expr)]
+        return result
+    except KeyError:
+        pass
+
+    def rec(subexpr):
+        return _get_canonical_form(subexpr, memo)
+
+    def type_name(obj_type):
+        return "%s.%s" % (obj_type.__module__, obj_type.__qualname__)
+
+    if isinstance(expr, np.generic):
+        result = ("numpy-scalar", expr.dtype.str, expr.tobytes())
+    elif expr is None or isinstance(expr, (bool, int, float, complex, str, bytes)):
+        result = (type(expr).__name__, expr)
+    elif isinstance(expr, type):
+        result = ("type", type_name(expr))
+    elif isinstance(expr, np.dtype):
+        result = ("dtype", expr.str)
+    elif isinstance(expr, np.ndarray):
+        if expr.dtype.char == "O":
+            result = ("object-array", expr.shape,
+                    tuple(rec(entry) for entry in expr.flat))
+        else:
+            result = ("array", expr.dtype.str, expr.shape, expr.tobytes())
+    elif isinstance(expr, (tuple, list)):
+        result = (type(expr).__name__, tuple(rec(entry) for entry in expr))
+    elif isinstance(expr, (set, frozenset)):
+        result = (type(expr).__name__, tuple(sorted(
+            repr(rec(entry)) for entry in expr)))
+    elif isinstance(expr, dict):
+        result = ("dict", tuple(sorted(
+            (repr(rec(key)), rec(value)) for key, value in expr.items())))
+    elif isinstance(expr, sym.DOFDesc):
+        result = (type_name(type(expr)),
+                rec(expr.domain_tag), rec(expr.quadrature_tag))
+    elif hasattr(expr, "__getinitargs__"):
+        result = (type_name(type(expr)), rec(tuple(expr.__getinitargs__())))
+    elif hasattr(expr, "__dict__"):
+        result = (type_name(type(expr)), rec(vars(expr)))
+    else:
+        result = (type_name(type(expr)), repr(expr))
+
+    # *expr* is kept alive so that its id is not reused by another object.
+    memo[id(expr)] = (expr, result)
+    return result
+
+
+def _get_sym_operator_hash(sym_operator):
+    """Return a hash of the structure of *sym_operator* (see
+    :func:`_get_canonical_form`) that agrees between ranks given equal
+    operators.
+    """
+    import hashlib
+    canonical = repr(_get_canonical_form(sym_operator, {}))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
-    if dumper is None:
-        def dumper(name, sym_operator):
-            return
 
-    orig_sym_operator = sym_operator
+def _process_sym_operator_rank_independent(discrwb, sym_operator,
+        post_bind_mapper, dumper):
+    """Run the stages of :func:`process_sym_operator` whose result does not
+    depend on the part of the mesh local to a rank.
+    """
     import grudge.symbolic.mappers as mappers
 
     dumper("before-bind", sym_operator)
@@ -774,34 +1911,10 @@ def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=No
     sym_operator = \
             mappers.OppositeInteriorFaceSwapUniqueIDAssigner()(sym_operator)
 
-    if not local_only:
-        # {{{ broadcast root rank's symn_operator
-
-        # also make sure all ranks had same orig_sym_operator
-
-        if discrwb.mpi_communicator is not None:
-            (mgmt_rank_orig_sym_operator, mgmt_rank_sym_operator) = \
-                    discrwb.mpi_communicator.bcast(
-                        (orig_sym_operator, sym_operator),
-                        discrwb.get_management_rank_index())
-
-            if not np.array_equal(mgmt_rank_orig_sym_operator, orig_sym_operator):
-                raise ValueError("rank %d received a different symbolic "
-                        "operator to bind from rank %d"
-                        % (discrwb.mpi_communicator.Get_rank(),
-                            discrwb.get_management_rank_index()))
-
-            sym_operator = mgmt_rank_sym_operator
-
-        # }}}
-
     if post_bind_mapper is not None:
         dumper("before-postbind", sym_operator)
         sym_operator = post_bind_mapper(sym_operator)
 
-    dumper("before-empty-flux-killer", sym_operator)
-    sym_operator = mappers.EmptyFluxKiller(discrwb.mesh)(sym_operator)
-
     dumper("before-cfold", sym_operator)
     sym_operator = mappers.CommutativeConstantFoldingMapper()(sym_operator)
 
@@ -809,6 +1922,9 @@ def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=No
     sym_operator = mappers.QuadratureCheckerAndRemover(
             discrwb.quad_tag_to_group_factory)(sym_operator)
 
+    dumper("before-derivative-join", sym_operator)
+    sym_operator = mappers.DerivativeJoiner()(sym_operator)
+
     # Work around https://github.com/numpy/numpy/issues/9438
     #
     # The idea is that we need 1j as an expression to survive
@@ -824,6 +1940,110 @@ def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=No
             complex_type=discrwb.complex_dtype.type,
             )(sym_operator)
 
+    return sym_operator
+
+
+def _process_sym_operator_on_management_rank(discrwb, sym_operator,
+        post_bind_mapper, dumper):
+    """Run :func:`_process_sym_operator_rank_independent` on the management
+    rank only and broadcast its result to all ranks as a compressed pickle.
+    All ranks check, by comparing hashes, that they were given the same
+    *sym_operator* as the management rank. Since *post_bind_mapper* is only
+    applied on the management rank, it must not depend on the rank.
+
+    If processing fails on the management rank, the error is broadcast along
+    with the result and raised on every rank, so that no rank is left waiting
+    in the broadcast.
+    """
+    import pickle
+    import zlib
+
+    comm = discrwb.mpi_communicator
+    mgmt_rank = discrwb.get_management_rank_index()
+    sym_operator_hash = _get_sym_operator_hash(sym_operator)
+
+    processed_sym_operator = None
+    payload = None
+    error = None
+
+    if discrwb.is_management_rank():
+        try:
+            processed_sym_operator = _process_sym_operator_rank_independent(
+                    discrwb, sym_operator, post_bind_mapper, dumper)
+            payload = zlib.compress(pickle.dumps(processed_sym_operator,
+                protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as exc:
+            local_error = exc
+            try:
+                pickle.dumps(exc)
+                error = exc
+            except Exception:
+                error = RuntimeError("%s: %s" % (type(exc).__name__, exc))
+        else:
+            local_error = None
+            logger.debug("broadcasting processed operator (%d bytes)",
+                    len(payload))
+
+    mgmt_rank_hash, payload, error = comm.bcast(
+            (sym_operator_hash, payload, error), mgmt_rank)
+
+    if error is not None:
+        if discrwb.is_management_rank():
+            raise local_error
+        raise error
+
+    # Every rank must learn about a mismatch, not only the mismatched ones,
+    # or the others go on to wait for them in communication.
+    mismatched_ranks = [rank
+            for rank, matches in enumerate(
+                comm.allgather(sym_operator_hash == mgmt_rank_hash))
+            if not matches]
+    if mismatched_ranks:
+        raise ValueError("ranks %s received a different symbolic "
+                "operator to bind from rank %d"
+                % (", ".join(str(rank) for rank in mismatched_ranks), mgmt_rank))
+
+    if processed_sym_operator is None:
+        processed_sym_operator = pickle.loads(zlib.decompress(payload))
+
+        # Check the operator against the local mesh, as on the management
+        # rank.
+        mappers.ErrorChecker(discrwb.mesh)(processed_sym_operator)
+
+    return processed_sym_operator
+
+
+def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=None,
+        local_only=None):
+    if local_only is None:
+        local_only = False
+
+    if dumper is None:
+        def dumper(name, sym_operator):
+            return
+
+    import grudge.symbolic.mappers as mappers
+
+    # {{{ rank-independent stages
+
+    # These are run once on the management rank, unless the operator is
+    # processed for local use only. The stages after them, and the
+    # compilation of the result, depend on the part of the mesh local to
+    # each rank (its boundary tags, its connections to other ranks), and
+    # so run on every rank.
+
+    if not local_only and discrwb.mpi_communicator is not None:
+        sym_operator = _process_sym_operator_on_management_rank(
+                discrwb, sym_operator, post_bind_mapper, dumper)
+    else:
+        sym_operator = _process_sym_operator_rank_independent(
+                discrwb, sym_operator, post_bind_mapper, dumper)
+
+    # }}}
+
+    dumper("before-empty-flux-killer", sym_operator)
+    sym_operator = mappers.EmptyFluxKiller(discrwb.mesh)(sym_operator)
+
     dumper("before-global-to-reference", sym_operator)
     sym_operator = mappers.GlobalToReferenceMapper(discrwb)(sym_operator)
 
@@ -843,10 +2063,6 @@ def process_sym_operator(discrwb, sym_operator, post_bind_mapper=None, dumper=No
     dumper("before-cfold-2", sym_operator)
     sym_operator = mappers.CommutativeConstantFoldingMapper()(sym_operator)
 
-    # FIXME: Reenable derivative joiner
-    # dumper("before-derivative-join", sym_operator)
-    # sym_operator = mappers.DerivativeJoiner()(sym_operator)
-
     dumper("process-finished", sym_operator)
 
     return sym_operator
@@ -859,6 +2075,11 @@ def bind(discr, sym_operator, *, post_bind_mapper=lambda x: x,
         exec_mapper_factory=ExecutionMapper,
         debug_flags=frozenset(), local_only=None):
     """
+    :param post_bind_mapper: a mapper applied to *sym_operator* once its
+        operators are bound. If *discr* has an MPI communicator and
+        *local_only* is not *True*, it is applied only on the management
+        rank, whose result is used on all ranks, so it must give the same
+        result on every rank.
     :param local_only: If *True*, *sym_operator* should oly be evaluated on the
         local part of the mesh. No inter-rank communication will take place.
         (However rank boundaries, tagged :class:`~meshmode.mesh.BTAG_PARTITION`,
@@ -1,31 +1,22 @@
-from meshmode.array_context import PyOpenCLArrayContext, ArrayContext
+from meshmode.array_context import (PyOpenCLArrayContext, ArrayContext,
+        _BaseFakeNumpyNamespace, _BaseFakeNumpyLinalgNamespace)
 from meshmode.dof_array import IsDOFArray
 from pytools.tag import Tag
 from pytools import memoize_method
+from pytools.obj_array import make_obj_array
 import loopy as lp
+import pyopencl as cl
 import pyopencl.array as cla
 import grudge.loopy_dg_kernels as dgk
-from numpy import prod
-import hjson
 import numpy as np
+import numpy.linalg as la
+from collections import deque
 
 #from grudge.loopy_dg_kernels.run_tests import analyzeResult
 
-try:
-    import importlib.resources as pkg_resources
-except ImportError:
-    # Use backported version for python < 3.7
-    import importlib_resources as pkg_resources
-
 ctof_knl = lp.make_copy_kernel("f,f", old_dim_tags="c,c")
 ftoc_knl = lp.make_copy_kernel("c,c", old_dim_tags="f,f")
 
-def get_transformation_id(device_id):
-    hjson_file = pkg_resources.open_text(dgk, "device_mappings.hjson") 
-    hjson_text = hjson_file.read()
-    hjson_file.close()
-    od = hjson.loads(hjson_text)
-    return od[device_id]
 
 class VecIsDOFArray(Tag):
     pass
@@ -35,6 +26,10 @@ class FaceIsDOFArray(Tag):
     pass
 
 
+class VecFaceIsDOFArray(Tag):
+    pass
+
+
 class VecOpIsDOFArray(Tag):
     pass
 
@@ -42,7 +37,111 @@ class VecOpIsDOFArray(Tag):
 class IsOpArray(Tag):
     pass
 
+
+# {{{ kernel profiling helpers
+
+def _get_nbytes_accessed(ary, seen_ids):
+    """Return the number of bytes spanned by *ary*, based on its actual dtype
+    and strides. Object arrays (e.g. arguments with ``sep`` axes) are traversed.
+    Arrays whose :func:`id` is in *seen_ids* are skipped, so that outputs passed
+    in as arguments are only counted once.
+    """
+    if id(ary) in seen_ids:
+        return 0
+    seen_ids.add(id(ary))
+
+    if isinstance(ary, np.ndarray) and ary.dtype.char == "O":
+        return sum(_get_nbytes_accessed(subary, seen_ids) for subary in ary.flat)
+
+    shape = getattr(ary, "shape", None)
+    strides = getattr(ary, "strides", None)
+    if shape is None or strides is None:
+        return 0
+
+    if 0 in shape:
+        return 0
+
+    return ary.dtype.itemsize + sum(
+            (n - 1) * abs(stride) for n, stride in zip(shape, strides))
+
+
+class KernelProfile:
+    """Aggregated profiling information for all launches of a kernel.
+
+    .. attribute:: name
+    .. attribute:: num_calls
+    .. attribute:: time
+
+        Total device execution time in seconds.
+
+    .. attribute:: nbytes
+
+        Total number of bytes spanned by the array arguments of all launches.
+
+    .. attribute:: bandwidth
+
+        Average achieved bandwidth in bytes per second.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.num_calls = 0
+        self.time = 0
+        self.nbytes = 0
+
+    def add_launch(self, time, nbytes):
+        self.num_calls += 1
+        self.time += time
+        self.nbytes += nbytes
+
+    @property
+    def bandwidth(self):
+        if self.time == 0:
+            return 0
+        return self.nbytes / self.time
+
+    def __repr__(self):
+        return (f"KernelProfile({self.name!r}, num_calls={self.num_calls}, "
+                f"time={self.time}, nbytes={self.nbytes})")
+
+# }}}
+
+
 class GrudgeArrayContext(PyOpenCLArrayContext):
+    """
+    .. attribute:: profile_kernels
+
+        If *True*, the device execution time and the number of bytes accessed
+        are recorded for each kernel launched through :meth:`call_loopy`.
+        Events are only waited upon when the data is requested through
+        :meth:`get_profiling_data`, so that profiling does not serialize
+        kernel execution. Requires a queue with profiling enabled.
+
+    .. attribute:: layout_conversion_nbytes
+
+        The number of bytes read and written when converting C-ordered DOF
+        arrays to the Fortran order used by this array context. Frozen DOF
+        arrays are stored in Fortran order, so that :meth:`thaw` does not
+        need to copy them.
+    """
+
+    def __init__(self, queue, allocator=None, wait_event_queue_length=None,
+            profile_kernels=False):
+        super().__init__(queue, allocator=allocator,
+                wait_event_queue_length=wait_event_queue_length)
+
+        if profile_kernels and not (
+                queue.properties & cl.command_queue_properties.PROFILING_ENABLE):
+            raise ValueError("profile_kernels requires a command queue "
+                    "with profiling enabled")
+
+        self.profile_kernels = profile_kernels
+        self._is_gpu = bool(queue.device.type & cl.device_type.GPU)
+        self._pending_profile_events = deque()
+        self._max_pending_profile_events = 1024
+        self._kernel_profiles = {}
+
+        self.layout_conversion_nbytes = 0
 
     def empty(self, shape, dtype):
         return cla.empty(self.queue, shape=shape, dtype=dtype,
@@ -52,212 +151,338 @@ class GrudgeArrayContext(PyOpenCLArrayContext):
         return cla.zeros(self.queue, shape=shape, dtype=dtype,
                 allocator=self.allocator, order="F")
 
-    def thaw(self, array):
-        thawed = super().thaw(array)
-        if type(getattr(array, "tags", None)) == IsDOFArray:
-            cq = thawed.queue
-            _, (out,) = ctof_knl(cq, input=thawed)
-            thawed = out
-            # May or may not be needed
-            #thawed.tags = "dof_array"
-        return thawed
+    def _to_dof_layout(self, array):
+        """Return *array*, or a Fortran-ordered copy of it if *array* is a
+        C-ordered DOF array.
+        """
+        if (type(getattr(array, "tags", None)) != IsDOFArray
+                or array.flags.f_contiguous
+                or not array.flags.c_contiguous):
+            return array
 
-    @memoize_method
-    def transform_loopy_program(self, program):
-        #print(program.name)
+        _, (out,) = ctof_knl(array.queue, input=array)
+        out.tags = array.tags
+        self.layout_conversion_nbytes += array.nbytes + out.nbytes
+        return out
+
+    def freeze(self, array):
+        # Convert at freeze time so that frozen DOF arrays already have the
+        # layout used by the kernels, which makes thawing them zero-copy.
+        return super().freeze(self._to_dof_layout(array))
+
+    def thaw(self, array):
+        # Only DOF arrays that were frozen by another array context can still
+        # need conversion here.
+        return self._to_dof_layout(super().thaw(array))
+
+    def get_loopy_transformations(self, program):
+        """Return a tuple ``(transformations, use_default)``, where
+        *transformations* is a list in the format accepted by
+        :func:`grudge.loopy_dg_kernels.apply_transformation_list` for
+        *program* and *use_default* indicates whether the transformations of
+        :class:`meshmode.array_context.PyOpenCLArrayContext` are to be applied
+        afterwards.
+        """
+        transformations = []
 
         for arg in program.args:
             if isinstance(arg.tags, IsDOFArray):
-                program = lp.tag_array_axes(program, arg.name, "f,f")
+                transformations.append(["tag_array_axes", [arg.name, "f,f"]])
             elif isinstance(arg.tags, IsOpArray):
-                program = lp.tag_array_axes(program, arg.name, "f,f")
+                transformations.append(["tag_array_axes", [arg.name, "f,f"]])
             elif isinstance(arg.tags, VecIsDOFArray):
-                program = lp.tag_array_axes(program, arg.name, "sep,f,f")
+                transformations.append(["tag_array_axes", [arg.name, "sep,f,f"]])
             #elif isinstance(arg.tags, VecOpIsDOFArray):
             #    program = lp.tag_array_axes(program, arg.name, "sep,c,c")
             elif isinstance(arg.tags, FaceIsDOFArray):
-                program = lp.tag_array_axes(program, arg.name, "N1,N0,N2")
-
-        if program.name == "opt_diff":
-            # TODO: Dynamically determine device id,
-            # Rename this file
-            hjson_file = pkg_resources.open_text(dgk, "diff.hjson")
-            device_id = "NVIDIA Titan V"
-            transform_id = get_transformation_id(device_id)
-
-            pn = -1
-            fp_format = None
-            dofs_to_order = {10: 2, 20: 3, 35: 4, 56: 5, 84: 6, 120: 7}
-            # Is this a list or a dictionary?
-            for arg in program.args:
-                if arg.name == "diff_mat":
-                    pn = dofs_to_order[arg.shape[2]]
-                    fp_format = arg.dtype.numpy_dtype
-                    break
-
-            #print(pn)
-            #print(fp_format)
-            #print(pn<=0)
-            #exit()
-            #print(type(fp_format) == None)
-            #print(type(None) == None)
-            # FP format is very specific. Could have integer arrays?
-            # What about mixed data types?
-            #if pn <= 0 or not isinstance(fp_format, :
-                #print("Need to specify a polynomial order and data type")
-                # Should throw an error
-                #exit()
-
-            # Probably need to generalize this
-            fp_string = "FP64" if fp_format == np.float64 else "FP32"
-            indices = [transform_id, str(3), fp_string, str(pn)]
-            transformations = dgk.load_transformations_from_file(hjson_file,
-                indices)#transform_id, fp_string, pn)
-            hjson_file.close()
-            program = dgk.apply_transformation_list(program, transformations)
+                transformations.append(
+                        ["tag_array_axes", [arg.name, "N1,N0,N2"]])
+            elif isinstance(arg.tags, VecFaceIsDOFArray):
+                transformations.append(
+                        ["tag_array_axes", [arg.name, "sep,N1,N0,N2"]])
+
+        if program.name.startswith("opt_diff"):
+            transformations.extend(
+                    dgk.get_diff_transformations(self.queue.device, program))
         elif "actx_special" in program.name:
-            program = lp.split_iname(program, "i0", 512, outer_tag="g.0",
-                                        inner_tag="l.0", slabs=(0, 1))
-            #program = lp.split_iname(program, "i0", 128, outer_tag="g.0",
-            #                           slabs=(0,1))
-            #program = lp.split_iname(program, "i0_inner", 32, outer_tag="ilp",
-            #                           inner_tag="l.0")
-            #program = lp.split_iname(program, "i1", 20, outer_tag="g.1",
-            #                           inner_tag="l.1", slabs=(0,0))
-            #program2 = lp.join_inames(program, ("i1", "i0"), "i")
-            #from islpy import BasicMap
-            #m = BasicMap("[x,y] -> {[n0,n1]->[i]:}")
-            #program2 = lp.map_domain(program, m)
-            #print(program2)
-            #exit()
-
-            #program = super().transform_loopy_program(program)
-            #print(program)
-            #print(lp.generate_code_v2(program).device_code())
-        elif "grudge_assign" in program.name or \
-             "flatten" in program.name or \
-             "resample" in program.name or  \
-             "face_mass" in program.name:
-            #program = lp.set_options(program, "write_cl")
-            program = lp.split_iname(program, "iel", 128, outer_tag="g.0",
-                                        slabs=(0, 1))
-            program = lp.split_iname(program, "iel_inner", 32, outer_tag="ilp",
-                                        inner_tag="l.0")
-            program = lp.split_iname(program, "idof", 20, outer_tag="g.1",
-                                        inner_tag="l.1", slabs=(0, 0))
+            transformations.append(["split_iname", ["i0", 512],
+                {"outer_tag": "g.0", "inner_tag": "l.0", "slabs": (0, 1)}])
+        elif ("grudge_assign" in program.name
+                or "flatten" in program.name
+                or "resample" in program.name
+                or "face_mass" in program.name):
+            if self._is_gpu:
+                transformations.extend([
+                    ["split_iname", ["iel", 128],
+                        {"outer_tag": "g.0", "slabs": (0, 1)}],
+                    ["split_iname", ["iel_inner", 32],
+                        {"outer_tag": "ilp", "inner_tag": "l.0"}],
+                    ["split_iname", ["idof", 20],
+                        {"outer_tag": "g.1", "inner_tag": "l.1", "slabs": (0, 0)}],
+                    ])
+            else:
+                transformations.append(["split_iname", ["iel", 16],
+                    {"outer_tag": "g.0", "inner_tag": "l.0", "slabs": (0, 1)}])
         else:
-            program = super().transform_loopy_program(program)
+            return transformations, True
+
+        return transformations, False
 
-        return program
+    @memoize_method
+    def transform_loopy_program(self, program):
+        transformations, use_default = self.get_loopy_transformations(program)
+
+        def transform():
+            knl = dgk.apply_transformation_list(program, transformations)
+            if use_default:
+                knl = super(GrudgeArrayContext, self).transform_loopy_program(knl)
+            return knl
+
+        # Transformed kernels are stored on disk so that warm starts need not
+        # rerun the transformations. Loopy's own caches then take care of the
+        # scheduled kernel, the generated code and the invoker.
+        return dgk.get_cached_kernel("transformed-kernels",
+                dgk.get_transformed_kernel_key(program, self.queue.device,
+                    transformations, use_default),
+                transform)
 
     def call_loopy(self, program, **kwargs):
         evt, result = super().call_loopy(program, **kwargs)
-        evt.wait()
-        dt = (evt.profile.end - evt.profile.start) / 1e9
-        nbytes = 0
-        # Could probably just use program.args
-        for val in kwargs.values():
-            if isinstance(val, lp.ArrayArg): 
-              nbytes += prod(val.shape)*8
-        for val in result.values():
-            nbytes += prod(val.shape)*8
-
-        bw = nbytes / dt / 1e9
-
-        print("Kernel {}, Time {}, Bytes {}, Bandwidth {}".format(program.name, dt, nbytes, bw))
+
+        if self.profile_kernels:
+            seen_ids = set()
+            nbytes = 0
+            for val in list(kwargs.values()) + list(result.values()):
+                nbytes += _get_nbytes_accessed(val, seen_ids)
+
+            self._pending_profile_events.append((program.name, evt, nbytes))
+            if len(self._pending_profile_events) > self._max_pending_profile_events:
+                self._collect_profile_events(wait=False)
+
         return evt, result
 
-    '''
-    def call_loopy(self, program, **kwargs):
-        if program.name == "opt_diff":
-            self.queue.finish()
-            start = time.time()
-            evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-            self.queue.finish()
-            dt = time.time() - start
-            _, nelem, n = program.args[0].shape
-            print(program.args[0].shape)
-            #print(lp.generate_code_v2(program).device_code())
-            analyzeResult(n, n, nelem, 6144, 540, dt, 8)
-            print(dt)
-            # First is warmup
-            self.queue.finish()
-            start = time.time()
-            evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-            self.queue.finish()
-            dt = time.time() - start
-            _, nelem, n = program.args[0].shape
-            print(program.args[0].shape)
-            #print(lp.generate_code_v2(program).device_code())
-            analyzeResult(n, n, nelem, 6144, 540, dt, 8)
-            print(dt)
-            #exit()
-            result = kwargs["result"]
-        elif "actx_special" in program.name:
-            print(program.name)
-            start = time.time()
-            evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-            self.queue.finish()
-            dt = time.time() - start
-            print(dt)
-            d1, d2 = program.args[0].shape
-            print((d1, d2))
-            nbytes = d1*d2*8
-            bandwidth = 2*(nbytes / dt) / 1e9
-            print(bandwidth)
-        else:
-            evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-        """
-        if program.name == "opt_diff":
-             self.queue.finish()
-             start = time.time()
-             evt, result = super().call_loopy(program, **kwargs)
-             #evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-             self.queue.finish()
-             dt = time.time() - start
-             _, nelem, n = program.args[0].shape
-             print(program.args[0].shape)
-             #print(lp.generate_code_v2(program).device_code())
-             analyzeResult(n, n, nelem, 6144, 540, dt, 8)
-             print(dt)
-             # First was warmup
-             self.queue.finish()
-             start = time.time()
-             evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-             self.queue.finish()
-             dt = time.time() - start
-             _, nelem, n = program.args[0].shape
-             print(program.args[0].shape)
-             #print(lp.generate_code_v2(program).device_code())
-             analyzeResult(n, n, nelem, 6144, 540, dt, 8)
-             print(dt)
-             #exit()
-             result = kwargs["result"]
-        else:
-            evt, result = super().call_loopy(program, **kwargs)
-             #evt, result = program(self.queue, **kwargs, allocator=self.allocator)
-        """
-        # """
-        #start = time.time()
-        evt, result = super().call_loopy(program, **kwargs)
+    # {{{ kernel profiling
+
+    def _collect_profile_events(self, wait):
+        # Kernels mostly complete in the order they were enqueued, so without
+        # waiting, stop at the first one that has not completed instead of
+        # rescanning all pending events on every launch.
+        pending = self._pending_profile_events
+        while pending:
+            name, evt, nbytes = pending[0]
+            if wait:
+                evt.wait()
+            elif (evt.command_execution_status
+                    != cl.command_execution_status.COMPLETE):
+                break
+            pending.popleft()
+
+            try:
+                kernel_profile = self._kernel_profiles[name]
+            except KeyError:
+                kernel_profile = self._kernel_profiles[name] = KernelProfile(name)
+
+            kernel_profile.add_launch(
+                    (evt.profile.end - evt.profile.start) * 1e-9, nbytes)
+
+    def get_profiling_data(self):
+        """Return a :class:`dict` mapping kernel names to :class:`KernelProfile`
+        instances aggregating all launches since the last call to
+        :meth:`reset_profiling_data`. Waits for all outstanding kernels that
+        have been recorded.
         """
-        if False:#program.name == "opt_diff":
-             self.queue.finish()
-             dt = time.time() - start
-             _, nelem, n = program.args[0].shape
-             print(program.args[0].shape)
-             print(lp.generate_code_v2(program).device_code())
-             analyzeResult(n, n, nelem, 6144, 540, dt, 8)
-             exit()
+        if not self.profile_kernels:
+            raise RuntimeError("kernel profiling was not enabled for "
+                    "this array context")
+
+        self._collect_profile_events(wait=True)
+        return dict(self._kernel_profiles)
+
+    def reset_profiling_data(self):
+        self._collect_profile_events(wait=True)
+        self._kernel_profiles = {}
+
+    def tabulate_profiling_data(self):
+        """Return a :class:`pytools.Table` summarizing
+        :meth:`get_profiling_data`, sorted by total time.
         """
-        # """
-        return evt, result
-        '''
+        from pytools import Table
+        tbl = Table()
+        tbl.add_row(("kernel", "calls", "time [s]", "bytes", "bandwidth [GB/s]"))
+
+        for kp in sorted(self.get_profiling_data().values(),
+                key=lambda kp: kp.time, reverse=True):
+            tbl.add_row((kp.name, kp.num_calls, "%.6g" % kp.time, kp.nbytes,
+                "%.4g" % (kp.bandwidth * 1e-9)))
+
+        return tbl
+
+    # }}}
+
+
+# {{{ numpy array context
+
+class _NumpyFakeNumpyNamespace(_BaseFakeNumpyNamespace):
+    def _get_fake_numpy_linalg_namespace(self):
+        return _NumpyFakeNumpyLinalgNamespace(self._array_context)
+
+    def __getattr__(self, name):
+        name = self._c_to_numpy_arc_functions.get(name, name)
+        if name in self._numpy_math_functions:
+            from meshmode.dof_array import obj_or_dof_array_vectorized_n_args
+            return obj_or_dof_array_vectorized_n_args(getattr(np, name))
+        else:
+            raise AttributeError(name)
+
+    def minimum(self, x, y):
+        from meshmode.dof_array import obj_or_dof_array_vectorize_n_args
+        return obj_or_dof_array_vectorize_n_args(np.minimum, x, y)
+
+    def where(self, criterion, then, else_):
+        from meshmode.dof_array import obj_or_dof_array_vectorize_n_args
+
+        def where_inner(inner_crit, inner_then, inner_else):
+            return np.where(inner_crit != 0, inner_then, inner_else)
+
+        return obj_or_dof_array_vectorize_n_args(where_inner, criterion, then, else_)
+
+    def sum(self, a, dtype=None):
+        return np.sum(a, dtype=dtype)
+
+    def min(self, a):
+        return np.min(a)
+
+    def max(self, a):
+        return np.max(a)
+
+
+class _NumpyFakeNumpyLinalgNamespace(_BaseFakeNumpyLinalgNamespace):
+    def norm(self, array, ord=None):
+        if len(array.shape) != 1:
+            raise NotImplementedError("only vector norms are implemented")
+
+        from meshmode.dof_array import DOFArray
+        if isinstance(array, DOFArray):
+            return la.norm(np.array([
+                self.norm(grp_ary.reshape(-1), ord)
+                for grp_ary in array]), ord)
+
+        return la.norm(array, ord)
+
+
+def _numpy_elwise_linear(actx, mat, vec, result=None):
+    if result is None:
+        result = actx.empty((vec.shape[0], mat.shape[0]), vec.dtype)
+
+    np.matmul(vec, mat.T, out=result)
+    return {"result": result}
+
+
+def _numpy_diff(actx, diff_mat, vec, result=None):
+    if result is None:
+        result = make_obj_array([
+            actx.empty((vec.shape[0], diff_mat.shape[1]), vec.dtype)
+            for _ in range(diff_mat.shape[0])])
+
+    for imat, result_i in enumerate(result):
+        np.matmul(vec, diff_mat[imat].T, out=result_i)
+
+    return {"result": result}
+
+
+def _numpy_multi_field_diff(actx, diff_mat, vec, result=None):
+    if result is None:
+        result = make_obj_array([
+            actx.empty((vec_i.shape[0], diff_mat.shape[1]), vec_i.dtype)
+            for vec_i in vec
+            for _ in range(diff_mat.shape[0])])
+
+    noperators = diff_mat.shape[0]
+    for ifield, vec_i in enumerate(vec):
+        for imat in range(noperators):
+            np.matmul(vec_i, diff_mat[imat].T,
+                    out=result[ifield*noperators + imat])
+
+    return {"result": result}
+
+
+def _numpy_face_mass(actx, mat, vec, result=None):
+    if result is None:
+        result = actx.empty((vec.shape[1], mat.shape[0]), vec.dtype)
+
+    np.einsum("ifj,fej->ei", mat, vec, out=result, optimize=True)
+    return {"result": result}
+
+
+def _numpy_multi_field_face_mass(actx, mat, vec, result=None):
+    if result is None:
+        result = make_obj_array([
+            actx.empty((vec_i.shape[1], mat.shape[0]), vec_i.dtype)
+            for vec_i in vec])
+
+    for vec_i, result_i in zip(vec, result):
+        np.einsum("ifj,fej->ei", mat, vec_i, out=result_i, optimize=True)
+
+    return {"result": result}
+
+
+def _make_numpy_elementwise_reduction(reduce_func):
+    def numpy_elementwise_reduction(actx, operand, result=None):
+        if result is None:
+            result = actx.empty((operand.shape[0], 1), operand.dtype)
+
+        result[...] = reduce_func(operand, axis=1, keepdims=True)
+        return {"result": result}
+
+    return numpy_elementwise_reduction
+
+
+def _make_numpy_nodal_reduction_partial(reduce_func):
+    def numpy_nodal_reduction_partial(actx, operand, partials):
+        partials[...] = reduce_func(operand, axis=1)
+        return {"partials": partials}
+
+    return numpy_nodal_reduction_partial
+
+
+_NUMPY_KERNEL_IMPLEMENTATIONS = {
+        "elwise_linear": _numpy_elwise_linear,
+        "face_mass": _numpy_face_mass,
+        "grudge_elementwise_sum": _make_numpy_elementwise_reduction(np.sum),
+        "grudge_elementwise_min": _make_numpy_elementwise_reduction(np.min),
+        "grudge_elementwise_max": _make_numpy_elementwise_reduction(np.max),
+        "grudge_nodal_sum_partial": _make_numpy_nodal_reduction_partial(np.sum),
+        "grudge_nodal_min_partial": _make_numpy_nodal_reduction_partial(np.min),
+        "grudge_nodal_max_partial": _make_numpy_nodal_reduction_partial(np.max),
+        }
+
+
+def _get_numpy_kernel_implementation(name):
+    import re
+    if re.match(r"^diff_[0-9]+d$", name):
+        return _numpy_diff
+    elif re.match(r"^multi_field_diff_[0-9]+d_[0-9]+f$", name):
+        return _numpy_multi_field_diff
+    elif re.match(r"^multi_field_face_mass_[0-9]+f$", name):
+        return _numpy_multi_field_face_mass
+    else:
+        return _NUMPY_KERNEL_IMPLEMENTATIONS.get(name)
+
 
 class BaseNumpyArrayContext(ArrayContext):
+    """An :class:`~meshmode.array_context.ArrayContext` that uses
+    :class:`numpy.ndarray` instances for DOF arrays and runs without an
+    OpenCL platform.
+
+    Elementwise-linear, differentiation and face mass kernels are evaluated
+    with (multithreaded) BLAS through :func:`numpy.matmul` and
+    :func:`numpy.einsum`. All other :mod:`loopy` kernels, such as the ones
+    generated for ``grudge_assign`` instructions, are compiled and run using
+    :class:`loopy.ExecutableCTarget`.
+    """
 
-    #def __init__(self):
-    #    super().__init__()
+    def _get_fake_numpy_namespace(self):
+        return _NumpyFakeNumpyNamespace(self)
 
     def empty(self, shape, dtype):
         return np.empty(shape, dtype=dtype)
@@ -277,119 +502,198 @@ class BaseNumpyArrayContext(ArrayContext):
     def thaw(self, np_array: np.ndarray):
         return np_array
 
-    #def call_loopy(self, program, **kwargs):
-    #    program = self.transform_loopy_program(program)
-    #    evt, result = program(self.queue, **
+    def call_loopy(self, program, **kwargs):
+        numpy_impl = _get_numpy_kernel_implementation(program.name)
+        if numpy_impl is not None:
+            return None, numpy_impl(self, **kwargs)
 
-    # TODO
-    #def transform_loopy_program(self, program):
-    #    pass
+        program = self.transform_loopy_program(program)
+        return program(**kwargs)
 
-class MultipleDispatchArrayContext(BaseNumpyArrayContext):
-    
-    def __init__(self, queues, allocator=None, wait_event_queue_length=None):
+    @memoize_method
+    def transform_loopy_program(self, program):
+        return program.copy(target=lp.ExecutableCTarget())
+
+# }}}
+
+
+# {{{ multiple dispatch
+
+def make_fissioned_queues(device, compute_units_per_queue=None,
+        properties=None):
+    """Partition *device* into sub-devices using OpenCL device fission and
+    return a list of command queues, one per sub-device, sharing one context,
+    e.g. for use with :class:`MultipleDispatchArrayContext`.
+
+    :arg compute_units_per_queue: if given, partition into sub-devices with
+        this many compute units each. Otherwise, partition by NUMA domain.
+    """
+    if compute_units_per_queue is not None:
+        partition = [cl.device_partition_property.EQUALLY,
+                compute_units_per_queue]
+    else:
+        partition = [cl.device_partition_property.BY_AFFINITY_DOMAIN,
+                cl.device_affinity_domain.NUMA]
+
+    sub_devices = device.create_sub_devices(partition)
+    ctx = cl.Context(sub_devices)
+    return [cl.CommandQueue(ctx, sub_device, properties=properties)
+            for sub_device in sub_devices]
+
+
+def _get_element_iname(program):
+    all_inames = program.all_inames()
+    if "iel" in all_inames:
+        return "iel"
+    elif program.name.startswith("actx_special") and "i0" in all_inames:
+        return "i0"
+    else:
+        return None
+
+
+class MultipleDispatchArrayContext(GrudgeArrayContext):
+    """A :class:`GrudgeArrayContext` that splits kernels operating on DOF
+    arrays along the element axis and executes the pieces concurrently on
+    several command queues, e.g. ones created by
+    :func:`make_fissioned_queues`.
+
+    The queues must share a context. The first queue is used for all other
+    operations, and it is synchronized with the per-queue pieces of each
+    kernel through events, so that the context can be used like a
+    single-queue one.
+
+    .. attribute:: queues
+    """
+
+    def __init__(self, queues, allocator=None, wait_event_queue_length=None,
+            profile_kernels=False):
+        queues = list(queues)
+        if not queues:
+            raise ValueError("at least one queue is required")
+        if any(queue.context != queues[0].context for queue in queues):
+            raise ValueError("all queues must share the same context")
+
+        super().__init__(queues[0], allocator=allocator,
+                wait_event_queue_length=wait_event_queue_length,
+                profile_kernels=profile_kernels)
 
-        super().__init__()
         self.queues = queues
-        self.contexts = (queue.context for queue in queues)
-        self.allocator = allocator if allocator else None
 
-        # TODO add queue length stuff as needed
-        #if wait_event_queue_length is None:
-        #    wait_event_queue_length = 10
+    @memoize_method
+    def _get_element_range_program(self, program, iname):
+        """Return a version of *program* in which *iname* only runs over the
+        range given by the additional arguments ``iel_start`` and ``iel_end``.
+        """
+        import islpy as isl
+
+        restriction = isl.BasicSet(
+                "[iel_start, iel_end] -> { [%s] : iel_start <= %s < iel_end }"
+                % (iname, iname))
+
+        new_domains = []
+        for dom in program.domains:
+            if iname in dom.get_var_dict():
+                nparams = dom.dim(isl.dim_type.param)
+                dom = dom.insert_dims(isl.dim_type.param, nparams, 2)
+                dom = dom.set_dim_name(isl.dim_type.param, nparams, "iel_start")
+                dom = dom.set_dim_name(isl.dim_type.param, nparams+1, "iel_end")
+                dom = dom & isl.align_spaces(restriction, dom)
+
+            new_domains.append(dom)
+
+        return program.copy(
+                domains=new_domains,
+                args=program.args + [
+                    lp.ValueArg("iel_start", np.int32),
+                    lp.ValueArg("iel_end", np.int32)])
+
+    def _get_element_count(self, program, iname, kwargs):
+        """Return the number of elements *program* processes when invoked
+        with *kwargs*, or *None* if it cannot be determined.
+        """
+        import islpy as isl
+        from pymbolic.primitives import Variable
+
+        param_values = {name: val for name, val in kwargs.items()
+                if isinstance(val, (int, np.integer))}
+
+        for arg in program.args:
+            ary = kwargs.get(arg.name)
+            arg_shape = getattr(arg, "shape", None)
+            if (not isinstance(ary, cla.Array)
+                    or not isinstance(arg_shape, tuple)
+                    or len(arg_shape) != len(ary.shape)):
+                continue
+
+            for axis_len, ary_axis_len in zip(arg_shape, ary.shape):
+                if isinstance(axis_len, Variable):
+                    param_values.setdefault(axis_len.name, ary_axis_len)
+
+        dom = program.get_inames_domain(iname)
+        for i, name in enumerate(dom.get_var_names(isl.dim_type.param)):
+            if name in param_values:
+                dom = dom.fix_val(isl.dim_type.param, i, int(param_values[name]))
+
+        _, iname_pos = dom.get_var_dict()[iname]
+        upper = dom.dim_max(iname_pos)
+        if not upper.is_cst():
+            return None
+
+        return max(aff.get_constant_val().to_python()
+                for _, aff in upper.get_pieces()) + 1
 
     def call_loopy(self, program, **kwargs):
-        print(program.name)
-        #print(kwargs)
-        #for arg in kwargs.values():
-        #    #if isinstance(arg, np.ndarray):
-        #    #    setattr(arg, "offset", 0)
-        #    print(type(arg))
-        #print(program)
-        #print(program.options)
-        program = lp.set_options(program, no_numpy=False)
-        #exit()
-
-        #for arg in program.args:
-            #try:
-            #    print(arg.shape)
-            #except AttributeError:
-            #    pass
-            #print(arg.tags)
-        for key, val in kwargs.items():
-            try:
-                print(key)
-                print(val.shape)
-            except AttributeError:
-                pass
-        
-
-        # If it has a DOF Array, then split the dof array into two or more viewed and execute with each view
-        # What about any loop bounds. Do they need to be reassigned?
-        # Loopy limits, maybe use fix_parameters to adjust?
-        # Experiment with sqrt function first
-        if program.name == "actx_special_sqrt":
-            n = 4 # placeholder for number of divisions to make
-            out_shape = kwargs["out"].shape
-            split_points = []
-            step = out_shape[0] // n
-            for i in range(0, out_shape[0], step):
-                split_points.append(i)
-            print(split_points)
-            # Currently special functions do not have fixed parameters
-            #program = lp.fix_parameters(program, i0=mid)
-
-            # make separate kwargs for each n
-            kwargs_list = []
-            for i in range(n):
-                kwargs_list.append(kwargs.copy())
-
-            start = 0
-            for i in range(1, n - 1):
-                end = i * step
-                kwargs_list[i - 1]["inp0"] = kwargs["inp0"][start:end,:]
-                kwargs_list[i - 1]["out"] = kwargs["out"][start:end,:]
-                start = end
-            kwargs_list[n-1]["inp0"] = kwargs["inp0"][start:out_shape[0],:]
-            kwargs_list[n-1]["out"] = kwargs["out"][start:out_shape[0],:]
-
-
-
-            # Create separate views of input and output arrays
-            # kwargs1["inp0"] = kwargs["inp0"][:mid,:]
-            # kwargs2["inp0"] = kwargs["inp0"][mid:,:]
-            # kwargs1["out"] = kwargs["out"][:mid,:]
-            # kwargs2["out"] = kwargs["out"][mid:,:]
- 
-            result = np.empty(out_shape ,dtype=np.float64)
-
-            result_list = []
-            evt_list = []
-            queue_count = len(self.queues)
-            for i in range(n):
-                evt, result = program(self.queues[i % queue_count], **kwargs_list[i], allocator=self.allocator)
-                evt_list.append(evt)
-                result_list.append(result)
-
-            # evt, result1 = program(self.queues[0], **kwargs1, allocator=self.allocator)
-            # evt, result2 = program(self.queues[1], **kwargs2, allocator=self.allocator)
-
-            #evt, result3 = program(self.queues[0], **kwargs, allocator=self.allocator)
-            
-            # kwargs["out"] should be completely filled by both operations
-            print(result_list[0]["out"])
-            print(result_list[2]["out"])
-            print(kwargs["out"])
-            #print(np.sum(result["out"] - result2["out"))
-            exit()
-            return evt, result        
+        iname = _get_element_iname(program)
+        if len(self.queues) == 1 or iname is None:
+            return super().call_loopy(program, **kwargs)
+
+        nelements = self._get_element_count(program, iname, kwargs)
+        if nelements is None or nelements < len(self.queues):
+            return super().call_loopy(program, **kwargs)
+
+        program = self.transform_loopy_program(
+                self._get_element_range_program(program, iname))
+
+        nchunks = len(self.queues)
+        chunk_bounds = [ichunk * nelements // nchunks
+                for ichunk in range(nchunks + 1)]
+
+        # The pieces may only start once all work enqueued so far on the
+        # primary queue is done.
+        start_evt = cl.enqueue_marker(self.queue)
+
+        result = None
+        chunk_evts = []
+        for queue, start, end in zip(
+                self.queues, chunk_bounds[:-1], chunk_bounds[1:]):
+            chunk_kwargs = kwargs.copy()
+            if result is not None:
+                # Outputs allocated by the first piece are shared by all
+                # others.
+                for name, ary in result.items():
+                    chunk_kwargs.setdefault(name, ary)
+
+            evt, chunk_result = program(queue, **chunk_kwargs,
+                    iel_start=start, iel_end=end,
+                    wait_for=[start_evt], allocator=self.allocator)
+
+            if result is None:
+                result = chunk_result
+            chunk_evts.append(evt)
+
+            if self.profile_kernels:
+                seen_ids = set()
+                nbytes = sum(_get_nbytes_accessed(val, seen_ids)
+                        for val in list(chunk_kwargs.values())
+                        + list(chunk_result.values()))
+                self._pending_profile_events.append(
+                        (program.name, evt, nbytes * (end - start) // nelements))
+
+        # Later work on the primary queue must wait for all pieces.
+        evt = cl.enqueue_barrier(self.queue, wait_for=chunk_evts)
 
-        else:
-            evt, result = program(self.queues[0], **kwargs, allocator=self.allocator)
-            return evt, result        
+        return evt, result
 
-    @memoize_method
-    def transform_loopy_program(self, program):
-        pass 
-    
-# vim: foldmethod=marker
\ No newline at end of file
+# }}}
+
+# vim: foldmethod=marker
@@ -0,0 +1,68 @@
+"""Log quantities for use with :mod:`logpyle`.
+
+.. autoclass:: CommunicationOverlapEfficiency
+"""
+
+__copyright__ = "Copyright (C) 2021 University of Illinois Board of Trustees"
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from logpyle import PostLogQuantity
+
+
+class CommunicationOverlapEfficiency(PostLogQuantity):
+    """The fraction of the time spent exchanging boundary data with other
+    ranks during which local work was done rather than waiting, accumulated
+    over all operator evaluations in a time step.
+
+    Pass this under the key ``"overlap_efficiency"`` in the *log_quantities*
+    given to :class:`grudge.execution.BoundOperator`.
+
+    .. automethod:: add_exchange
+    """
+
+    def __init__(self, name="comm_overlap_efficiency", description=None):
+        if description is None:
+            description = ("Fraction of boundary data exchange time "
+                    "overlapped with local work")
+
+        super().__init__(name, "1", description)
+
+        self.exchange_time = 0
+        self.exposed_wait_time = 0
+
+    def add_exchange(self, exchange_time, exposed_wait_time):
+        """Record an exchange that took *exchange_time* seconds, of which
+        *exposed_wait_time* seconds were spent waiting.
+        """
+        self.exchange_time += exchange_time
+        self.exposed_wait_time += exposed_wait_time
+
+    def __call__(self):
+        if not self.exchange_time:
+            return None
+
+        result = 1 - self.exposed_wait_time / self.exchange_time
+
+        self.exchange_time = 0
+        self.exposed_wait_time = 0
+
+        return result
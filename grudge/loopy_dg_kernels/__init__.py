@@ -1,5 +1,5 @@
 import numpy as np
-from pytools import memoize_in
+from pytools import memoize
 
 #import pyopencl as cl
 #import pyopencl.array
@@ -20,13 +20,18 @@ import loopy as lp
 
 #from bs4 import UnicodeDammit
 import hjson
+
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    # Use backported version for python < 3.7
+    import importlib_resources as pkg_resources
 #import time
 #from math import ceil
 #import sys
 
 # setup
 # -----
-lp.set_caching_enabled(False)
 import loopy.options
 loopy.options.ALLOW_TERMINAL_COLORS = False
 
@@ -52,12 +57,10 @@ def gen_elwise_linear_knl(n_elem, n_in, n_out, fp_format):
     return knl
 
 # Se podría usar el de Grudge.
-#@memoize_method
 def gen_diff_knl_fortran2(n_mat, n_elem, n_in, n_out, fp_format=np.float32,
         options=None):
-    
-    @memoize_in(gen_diff_knl_fortran2, "_gen_diff_knl")
-    def _gen_diff_knl(n_mat, n_elem, n_in, n_out, fp_format):
+
+    def build():
         knl = lp.make_kernel(
         """{[imatrix,iel,idof,j]:
             0<=imatrix<nmatrices and
@@ -81,18 +84,20 @@ def gen_diff_knl_fortran2(n_mat, n_elem, n_in, n_out, fp_format=np.float32,
         options=options,
         name="opt_diff_{}d".format(n_mat)
         )
-        return knl
 
-    knl = _gen_diff_knl(n_mat, n_elem, n_in, n_out, fp_format)
+        # This should be in array context probably but need to avoid circular
+        # dependency
+        knl = lp.tag_inames(knl, "imatrix: ilp")
+        knl = lp.tag_array_axes(knl, "diff_mat", "sep,c,c")
+        knl = lp.tag_array_axes(knl, "result", "sep,f,f")
+        knl = lp.tag_array_axes(knl, "vec", "f,f")
+        knl = lp.fix_parameters(knl, nmatrices=n_mat, nelements=n_elem,
+            ndiscr_nodes_in=n_in, ndiscr_nodes_out=n_out)
+        return knl
 
-    # This should be in array context probably but need to avoid circular dependency
-    knl = lp.tag_inames(knl, "imatrix: ilp")
-    knl = lp.tag_array_axes(knl, "diff_mat", "sep,c,c")
-    knl = lp.tag_array_axes(knl, "result", "sep,f,f")
-    knl = lp.tag_array_axes(knl, "vec", "f,f")
-    knl = lp.fix_parameters(knl, nmatrices=n_mat, nelements=n_elem,
-        ndiscr_nodes_in=n_in, ndiscr_nodes_out=n_out)
-    return knl
+    return get_cached_kernel("diff-kernels",
+            (n_mat, n_elem, n_in, n_out, np.dtype(fp_format), options),
+            build)
 
 
 # Is k x i in F layout equivalent to i x k in C layout?
@@ -336,3 +341,240 @@ def apply_transformation_list(knl, transformations):
 #knl = apply_transformation_list(knl, trans)
 #code = lp.generate_code_v2(knl).device_code()
 #print(code)
+
+
+# {{{ device-aware transformation lookup
+
+def get_device_properties(device):
+    """Return a :class:`dict` of the properties of the :class:`pyopencl.Device`
+    *device* that are used to look up tuned transformations in
+    ``device_mappings.hjson``.
+    """
+    import pyopencl as cl
+
+    if device.type & cl.device_type.GPU:
+        device_type = "GPU"
+    elif device.type & cl.device_type.CPU:
+        device_type = "CPU"
+    else:
+        device_type = "ACCELERATOR"
+
+    return {
+            "vendor": device.vendor,
+            "name": device.name,
+            "platform": device.platform.name,
+            "type": device_type,
+            "compute_units": device.max_compute_units,
+            "local_mem_size": device.local_mem_size,
+            }
+
+
+def _device_entry_matches(entry, props):
+    for key, value in entry.items():
+        if key == "transformation_id":
+            continue
+        elif key in ["vendor", "name", "platform", "type"]:
+            if value.lower() not in props[key].lower():
+                return False
+        elif props[key] != value:
+            return False
+
+    return True
+
+
+@memoize
+def _load_hjson_resource(filename):
+    with pkg_resources.open_text(__name__, filename) as hjson_file:
+        return hjson.loads(hjson_file.read())
+
+
+@memoize
+def get_transformation_id(device):
+    """Return the identifier of the set of tuned transformations for
+    *device*, or *None* if ``device_mappings.hjson`` has no matching entry.
+    Each property given in an entry must match the device. If several entries
+    match, the one specifying the most properties wins.
+    """
+    return get_transformation_id_for_properties(get_device_properties(device))
+
+
+def get_transformation_id_for_properties(props):
+    """Return the identifier of the set of tuned transformations for a
+    device with the properties *props*, as returned by
+    :func:`get_device_properties`, or *None* if there is none.
+    """
+    matches = [entry
+            for entry in _load_hjson_resource("device_mappings.hjson")["devices"]
+            if _device_entry_matches(entry, props)]
+    if not matches:
+        return None
+
+    return max(matches, key=len)["transformation_id"]
+
+
+def simplex_order_from_ndofs(ndofs, dim):
+    """Return the polynomial order of a simplex element of dimension *dim*
+    with *ndofs* degrees of freedom, or *None* if there is no such order.
+    """
+    from math import factorial
+
+    order = 0
+    while True:
+        n = factorial(order + dim) // (factorial(order) * factorial(dim))
+        if n == ndofs:
+            return order
+        elif n > ndofs:
+            return None
+        order += 1
+
+
+def get_heuristic_diff_transformations(device, n_mat, n_elem, n_in, n_out,
+        fp_format):
+    """Return a transformation list for :func:`gen_diff_knl_fortran2` kernels
+    on devices (or kernel sizes) for which no tuned transformations are
+    available.
+    """
+    import pyopencl as cl
+
+    if device.type & cl.device_type.GPU:
+        # one work item per (element, output node), elements mapped to the
+        # faster-varying local axis for coalesced access to F-ordered data
+        nel_inner = 32
+        ndof_inner = max(1, min(n_out, device.max_work_group_size // nel_inner))
+
+        transformations = [
+                ["split_iname", ["iel", nel_inner],
+                    {"outer_tag": "g.0", "inner_tag": "l.0", "slabs": (0, 1)}],
+                ["split_iname", ["idof", ndof_inner],
+                    {"outer_tag": "g.1", "inner_tag": "l.1"}],
+                ]
+
+        vec_prefetch_nbytes = nel_inner * n_in * np.dtype(fp_format).itemsize
+        if 2*vec_prefetch_nbytes <= device.local_mem_size:
+            transformations.append(
+                    ["add_prefetch", ["vec", "j,iel_inner"],
+                        {"temporary_name": "vecf", "default_tag": "l.auto"}])
+
+    else:
+        # one work item per element, vectorized across the work group by
+        # CPU runtimes such as pocl
+        transformations = [
+                ["split_iname", ["iel", 16],
+                    {"outer_tag": "g.0", "inner_tag": "l.0", "slabs": (0, 1)}],
+                ]
+
+    return transformations
+
+
+def get_diff_transformations(device, knl):
+    """Return the transformation list to be applied to the differentiation
+    kernel *knl* (as generated by :func:`gen_diff_knl_fortran2`) on *device*.
+    Tuned transformations from ``diff_<n>d_transform.hjson`` are used if
+    available for the device, data type and element order (or a ``default``
+    entry for all orders). Otherwise, heuristic transformations are returned.
+    """
+    transform_id = get_transformation_id(device)
+    if transform_id is not None:
+        transformations = get_tuned_diff_transformations(transform_id, knl)
+        if transformations is not None:
+            return transformations
+
+    n_mat, n_out, n_in = knl.arg_dict["diff_mat"].shape
+    n_elem = knl.arg_dict["vec"].shape[0]
+    fp_format = knl.arg_dict["vec"].dtype.numpy_dtype
+
+    return get_heuristic_diff_transformations(
+            device, n_mat, n_elem, n_in, n_out, fp_format)
+
+
+def get_tuned_diff_transformations(transform_id, knl):
+    """Return the transformation list for the differentiation kernel *knl*
+    from the set of tuned transformations *transform_id* in
+    ``diff_<n>d_transform.hjson``, or *None* if there is none.
+    """
+    n_mat, n_out, n_in = knl.arg_dict["diff_mat"].shape
+    fp_format = knl.arg_dict["vec"].dtype.numpy_dtype
+
+    fp_string = {
+            np.dtype(np.float32): "FP32",
+            np.dtype(np.float64): "FP64",
+            }.get(fp_format)
+    if fp_string is None:
+        return None
+
+    try:
+        table = _load_hjson_resource(f"diff_{n_mat}d_transform.hjson")
+    except FileNotFoundError:
+        table = {}
+
+    fp_table = table.get(transform_id, {}).get(fp_string, {})
+
+    order = simplex_order_from_ndofs(n_in, n_mat)
+    return fp_table.get(str(order), fp_table.get("default"))
+
+# }}}
+
+
+# {{{ persistent kernel caches
+
+def make_persistent_key(obj):
+    """Convert *obj*, which may contain (possibly ordered) :class:`dict`
+    and :class:`list` instances such as the ones read from the transformation
+    files, into a nested :class:`tuple` usable as a persistent cache key.
+    """
+    if isinstance(obj, dict):
+        return tuple(sorted(
+            (key, make_persistent_key(value)) for key, value in obj.items()))
+    elif isinstance(obj, (list, tuple)):
+        return tuple(make_persistent_key(item) for item in obj)
+    else:
+        return obj
+
+
+def get_device_key(device):
+    return (device.platform.name, device.platform.version,
+            device.vendor, device.name, device.driver_version)
+
+
+def get_transformed_kernel_key(program, device, transformations, use_default):
+    """Return the key under which *program*, transformed with the list
+    *transformations* for *device*, is stored in the persistent kernel cache.
+    """
+    return (program, get_device_key(device),
+            make_persistent_key(transformations), use_default)
+
+
+@memoize
+def _get_persistent_kernel_cache(name):
+    from pytools.persistent_dict import WriteOncePersistentDict
+    from loopy.tools import LoopyKeyBuilder
+    from loopy.version import DATA_MODEL_VERSION
+    return WriteOncePersistentDict(
+            f"grudge-{name}-v1-{DATA_MODEL_VERSION}",
+            key_builder=LoopyKeyBuilder())
+
+
+def get_cached_kernel(cache_name, key, build):
+    """Return the loopy kernel stored under *key* in the persistent on-disk
+    cache *cache_name*, or call *build* to create it and store the result.
+    Caching is bypassed if loopy's caching is disabled (e.g. through
+    :func:`loopy.set_caching_enabled` or ``LOOPY_NO_CACHE``).
+    """
+    if not lp.CACHING_ENABLED:
+        return build()
+
+    from pytools.persistent_dict import NoSuchEntryError
+    cache = _get_persistent_kernel_cache(cache_name)
+
+    try:
+        return cache[key]
+    except NoSuchEntryError:
+        pass
+
+    knl = build()
+    cache.store_if_not_present(key, knl)
+    return knl
+
+# }}}
+
+# vim: foldmethod=marker
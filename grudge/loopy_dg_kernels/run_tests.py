@@ -601,12 +601,15 @@ def randomSearch(n_in, n_out, n_elem, sm_size, time_limit=float("inf"),
     print("Time limit exceeded: returning current best result")
     return result_saved
 
-def get_transformation_id(device_id):
-    hjson_file = open("device_mappings.hjson") 
+def get_transformation_id(device_name):
+    hjson_file = open("device_mappings.hjson")
     hjson_text = hjson_file.read()
     hjson_file.close()
     od = hjson.loads(hjson_text)
-    return od[device_id]
+    for entry in od["devices"]:
+        if entry.get("name", "").lower() in device_name.lower():
+            return entry["transformation_id"]
+    raise ValueError("no transformations for device '%s'" % device_name)
 
 # Test existing optimizations
 if __name__ == "__main__": 
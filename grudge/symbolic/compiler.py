@@ -35,6 +35,9 @@ from functools import reduce
 from loopy.version import LOOPY_USE_LANGUAGE_VERSION_2018_2  # noqa: F401
 from meshmode.dof_array import IsDOFArray
 
+import logging
+logger = logging.getLogger(__name__)
+
 # {{{ instructions
 
 
@@ -72,13 +75,22 @@ def _make_dep_mapper(include_subscripts):
 # {{{ loopy kernel instruction
 
 class LoopyKernelDescriptor:
+    """
+    .. attribute:: diff_operators
+
+        If not *None*, a list of reference differentiation operators whose
+        matrices are passed to the kernel as ``diff_mat``, see
+        :func:`fuse_diff_batches`.
+    """
+
     def __init__(self, loopy_kernel, input_mappings, output_mappings,
-            fixed_arguments, governing_dd):
+            fixed_arguments, governing_dd, diff_operators=None):
         self.loopy_kernel = loopy_kernel
         self.input_mappings = input_mappings
         self.output_mappings = output_mappings
         self.fixed_arguments = fixed_arguments
         self.governing_dd = governing_dd
+        self.diff_operators = diff_operators
 
     @memoize_method
     def scalar_args(self):
@@ -243,7 +255,15 @@ class RankDataSwapAssign(Instruction):
 
 
 class ToDiscretizationScopedAssign(Assign):
+    """
+    .. attribute:: elementwise_constant
+
+        *True* if the assigned values are known to be constant on each
+        element, which allows storing them with a single value per element.
+    """
+
     scope_indicator = "(to discr)-"
+    elementwise_constant = False
 
     mapper_method = intern("map_insn_assign_to_discr_scoped")
 
@@ -273,36 +293,60 @@ class FromDiscretizationScopedAssign(AssignBase):
 
 class DiffBatchAssign(Instruction):
     """
-    :ivar names:
+    :ivar names: the names assigned to, ordered by field first, i.e. the
+        result of applying ``operators[iop]`` to ``fields[ifield]`` is
+        assigned to ``names[ifield*len(operators) + iop]``.
     :ivar operators:
 
         .. note ::
 
             All operators here are guaranteed to satisfy
             :meth:`grudge.symbolic.operators.DiffOperatorBase.
-            equal_except_for_axis`.
-
-    :ivar field:
+            equal_except_for_axis`. Alternatively, *operators* may consist
+            of a single
+            :class:`~grudge.symbolic.operators.RefMassOperatorBase` or
+            :class:`~grudge.symbolic.operators.RefFaceMassOperator`
+            to be applied to several fields.
+
+    :ivar fields: the fields to which all *operators* are applied. Batching
+        several fields allows the reference matrices to be loaded once for
+        all of them.
+    :ivar field: the single entry of *fields*, if there is only one.
     """
 
+    def __init__(self, names, operators, field=None, fields=None, **kwargs):
+        if (field is None) == (fields is None):
+            raise TypeError("exactly one of 'field' and 'fields' must be given")
+
+        if fields is None:
+            fields = (field,)
+
+        super().__init__(names=names, operators=operators, fields=tuple(fields),
+                **kwargs)
+
+    @property
+    def field(self):
+        field, = self.fields
+        return field
+
     def get_assignees(self):
         return frozenset(self.names)
 
     @memoize_method
     def get_dependencies(self):
-        return _make_dep_mapper(include_subscripts=False)(self.field)
+        dep_mapper = _make_dep_mapper(include_subscripts=False)
+        return frozenset().union(*[dep_mapper(field) for field in self.fields])
 
     def __str__(self):
         lines = []
 
-        if len(self.names) > 1:
-            lines.append("{")
-            for n, d in zip(self.names, self.operators):
-                lines.append(f"  {n} <- {d}({self.field})")
-            lines.append("}")
-        else:
-            for n, d in zip(self.names, self.operators):
-                lines.append(f"{n} <- {d}({self.field})")
+        names = iter(self.names)
+        for field in self.fields:
+            for d in self.operators:
+                lines.append(f"{next(names)} <- {d}({field})")
+
+        if len(lines) > 1:
+            lines = ["{"] + ["  " + line for line in lines] + ["}"]
 
         return "\n".join(lines)
 
@@ -370,14 +414,639 @@ def dot_dataflow_graph(code, max_node_label_length=30,
 # }}}
 
 
+# {{{ memory footprint report
+
+def _get_value_nbytes(value):
+    from meshmode.dof_array import DOFArray
+    if isinstance(value, DOFArray):
+        return sum(grp_ary.nbytes for grp_ary in value)
+    elif isinstance(value, np.ndarray) and value.dtype.char == "O":
+        return sum(_get_value_nbytes(subvalue) for subvalue in value.flat)
+    else:
+        return getattr(value, "nbytes", 0)
+
+
+def _get_slot_class(insn, name):
+    """Return an identifier of the discretization on which the value *name*
+    assigned by *insn* lives, or *None* if that is not known.
+    """
+    if isinstance(insn, LoopyKernelInstruction):
+        return insn.kernel_descriptor.governing_dd
+    elif isinstance(insn, DiffBatchAssign):
+        return insn.operators[0].dd_out
+    elif isinstance(insn, RankDataSwapAssign):
+        return insn.dd_out
+    elif isinstance(insn, Assign):
+        from grudge.symbolic.primitives import OperatorBinding
+        expr = insn.exprs[insn.names.index(name)]
+        if isinstance(expr, OperatorBinding):
+            return expr.op.dd_out
+
+    return None
+
+
+def _get_inplace_inputs(insn):
+    """Return the names of the inputs of *insn* whose storage may be used for
+    its output. This is only the case for kernels consisting of a single
+    pointwise assignment.
+    """
+    if not isinstance(insn, LoopyKernelInstruction):
+        return frozenset()
+
+    kdescr = insn.kernel_descriptor
+    if (len(kdescr.loopy_kernel.instructions) != 1
+            or len(insn.get_assignees()) != 1):
+        return frozenset()
+
+    return frozenset(
+            expr.name for expr in kdescr.input_mappings.values()
+            if isinstance(expr, Variable))
+
+
+class MemoryFootprintReport:
+    """An estimate of the storage needed for the variables assigned in a
+    :class:`Code` if variables with disjoint lifetimes in the schedule of its
+    :class:`ExecutionPlan` shared storage, to compare against storing each
+    variable separately.
+
+    This is only a report, used to judge how much storage reuse can save.
+    Storage is not allocated according to it: at run time,
+    :class:`grudge.execution.BufferPool` already recycles arrays as soon as
+    the variables referencing them are discarded, which needs no more
+    storage than the slots assigned here.
+
+    .. attribute:: schedule
+
+        A list of instructions in order of execution.
+
+    .. attribute:: lifetimes
+
+        A mapping from variable names to tuples ``(first, last)`` of indices
+        into :attr:`schedule` of the instruction assigning and of the one
+        last using the variable. Variables that are part of the result live
+        until ``len(schedule)``.
+
+    .. attribute:: var_to_slot
+
+        A mapping from variable names to indices of storage slots. Variables
+        with disjoint lifetimes on the same discretization are assigned the
+        same slot.
+
+    .. attribute:: nslots
+
+    .. attribute:: inplace_inputs
+
+        A mapping from instructions to the names of their inputs whose storage
+        may be reused for their output once the inputs are no longer needed.
+
+    .. attribute:: result_names
+
+    .. automethod:: get_footprint
+    """
+
+    def __init__(self, code):
+        self.result_names = frozenset(_get_result_names(code.result))
+
+        schedule = code.get_execution_plan().schedule
+        self.schedule = schedule
+
+        # {{{ lifetimes
+
+        lifetimes = {}
+        for i, insn in enumerate(schedule):
+            for dep in insn.get_dependencies():
+                if dep.name in lifetimes:
+                    lifetimes[dep.name] = (lifetimes[dep.name][0], i)
+
+            if isinstance(insn, FromDiscretizationScopedAssign):
+                # lives in discretization scope, not counted here
+                continue
+
+            for name in insn.get_assignees():
+                lifetimes[name] = (i, i)
+
+        for name in self.result_names & set(lifetimes):
+            lifetimes[name] = (lifetimes[name][0], len(schedule))
+
+        self.lifetimes = lifetimes
+
+        # }}}
+
+        # {{{ slot assignment
+
+        self.inplace_inputs = {}
+        slot_classes = []
+        slot_occupants = []
+        var_to_slot = {}
+
+        for i, insn in enumerate(schedule):
+            inplace_inputs = _get_inplace_inputs(insn) - self.result_names
+            if inplace_inputs:
+                self.inplace_inputs[insn] = inplace_inputs
+
+            for name in sorted(insn.get_assignees()):
+                if name not in lifetimes:
+                    continue
+
+                slot_class = _get_slot_class(insn, name)
+                for islot, occupant in enumerate(slot_occupants):
+                    if slot_class is None or slot_classes[islot] != slot_class:
+                        continue
+
+                    _, occupant_end = lifetimes[occupant]
+                    if occupant_end < i or (
+                            occupant_end == i and occupant in inplace_inputs):
+                        break
+                else:
+                    islot = len(slot_occupants)
+                    slot_occupants.append(None)
+                    slot_classes.append(slot_class)
+
+                slot_occupants[islot] = name
+                var_to_slot[name] = islot
+
+        self.var_to_slot = var_to_slot
+        self.nslots = len(slot_occupants)
+
+        # }}}
+
+    def get_footprint(self, var_to_nbytes):
+        """Return a tuple ``(with_reuse_nbytes, naive_nbytes)`` of the storage
+        required for the variables in :attr:`var_to_slot` with and without
+        sharing of slots, given their sizes in *var_to_nbytes*.
+        """
+        slot_nbytes = [0] * self.nslots
+        naive_nbytes = 0
+        for name, islot in self.var_to_slot.items():
+            nbytes = var_to_nbytes.get(name, 0)
+            slot_nbytes[islot] = max(slot_nbytes[islot], nbytes)
+            naive_nbytes += nbytes
+
+        return sum(slot_nbytes), naive_nbytes
+
+
+def _get_result_names(result):
+    dm = mappers.DependencyMapper(composite_leaves=False)
+    result_names = set()
+
+    def add_result_names(result_expr):
+        for var in dm(result_expr):
+            assert isinstance(var, Variable)
+            result_names.add(var.name)
+
+    obj_array_vectorize(add_result_names, result)
+    return result_names
+
+# }}}
+
+
+# {{{ execution plan
+
+class ExecutionStep(Record):
+    """
+    .. attribute:: insn
+
+        The instruction to execute, or *None* if this step waits for
+        data to arrive.
+
+    .. attribute:: wait_names
+
+        A :class:`frozenset` of names provided by futures (e.g. received from
+        other ranks) that must be available before continuing.
+
+    .. attribute:: discard_names
+
+        A :class:`tuple` of names that are no longer needed after this step.
+
+    .. attribute:: donatable_names
+
+        A :class:`tuple` of names of inputs of :attr:`insn` that are not needed
+        after it, and whose storage may be reused for its output.
+    """
+
+
+class ExecutionPlan:
+    """A precomputed order of execution for the instructions of a
+    :class:`Code`. Instructions are ordered by priority among those whose
+    dependencies are available. Data provided by futures, e.g. through
+    :class:`RankDataSwapAssign`, is assumed to arrive only once no other
+    instruction can make progress.
+
+    .. attribute:: steps
+
+        A list of :class:`ExecutionStep` instances.
+
+    .. attribute:: schedule
+
+        A list of the instructions in the order they are executed.
+
+    .. attribute:: input_names
+
+        A :class:`frozenset` of names that must be supplied when executing.
+
+    .. attribute:: unscheduled_insns
+
+        A list of instructions that cannot be executed, because they depend
+        on each other.
+
+    If *prioritize_communication* is *True*, each :class:`RankDataSwapAssign`
+    and the instructions it depends on take precedence over all other
+    instructions, so that data is sent as early as possible and local work
+    overlaps with communication.
+    """
+
+    def __init__(self, code, prioritize_communication=True):
+        result_names = frozenset(_get_result_names(code.result))
+
+        assigned_names = {name
+                for insn in code.instructions
+                for name in insn.get_assignees()}
+
+        # {{{ find instructions needed for communication
+
+        comm_insns = set()
+        if prioritize_communication:
+            name_to_writer = {name: insn
+                    for insn in code.instructions
+                    for name in insn.get_assignees()}
+
+            def add_comm_insn(insn):
+                if insn in comm_insns:
+                    return
+
+                comm_insns.add(insn)
+                for dep in insn.get_dependencies():
+                    if dep.name in name_to_writer:
+                        add_comm_insn(name_to_writer[dep.name])
+
+            for insn in code.instructions:
+                if isinstance(insn, RankDataSwapAssign):
+                    add_comm_insn(insn)
+
+        def get_sched_priority(insn):
+            return (insn in comm_insns, insn.priority)
+
+        # }}}
+        self.input_names = frozenset(
+                dep.name
+                for insn in code.instructions
+                for dep in insn.get_dependencies()) - assigned_names
+
+        # {{{ simulate scheduling
+
+        entries = []
+        available_names = set(self.input_names)
+        pending_names = set()
+        remaining_insns = list(code.instructions)
+
+        while True:
+            ready_insns = [insn for insn in remaining_insns
+                    if all(dep.name in available_names
+                        for dep in insn.get_dependencies())]
+
+            if ready_insns:
+                insn = max(ready_insns, key=get_sched_priority)
+                remaining_insns.remove(insn)
+                entries.append((insn, frozenset()))
+
+                if isinstance(insn, RankDataSwapAssign):
+                    pending_names.update(insn.get_assignees())
+                else:
+                    available_names.update(insn.get_assignees())
+            else:
+                needed_names = pending_names & (result_names | {dep.name
+                    for insn in remaining_insns
+                    for dep in insn.get_dependencies()})
+                if not needed_names:
+                    break
+
+                entries.append((None, frozenset(needed_names)))
+                available_names.update(needed_names)
+                pending_names -= needed_names
+
+        self.unscheduled_insns = remaining_insns
+
+        # }}}
+
+        # {{{ discards
+
+        last_use = {}
+        for i, (insn, _) in enumerate(entries):
+            if insn is not None:
+                for dep in insn.get_dependencies():
+                    last_use[dep.name] = i
+
+        for i, (insn, wait_names) in enumerate(entries):
+            if insn is None:
+                new_names = wait_names
+            elif isinstance(insn, RankDataSwapAssign):
+                new_names = ()
+            else:
+                new_names = insn.get_assignees()
+
+            # names that are never used are discarded right away
+            for name in new_names:
+                last_use.setdefault(name, i)
+
+        discard_names = {}
+        for name, i in last_use.items():
+            if name not in result_names:
+                discard_names.setdefault(i, []).append(name)
+
+        # }}}
+
+        self.steps = []
+        for i, (insn, wait_names) in enumerate(entries):
+            donatable_names = ()
+            if insn is not None:
+                donatable_names = tuple(sorted(
+                    name for name in _get_inplace_inputs(insn)
+                    if name not in result_names and last_use[name] == i))
+
+            self.steps.append(ExecutionStep(
+                insn=insn,
+                wait_names=wait_names,
+                discard_names=tuple(sorted(discard_names.get(i, []))),
+                donatable_names=donatable_names))
+
+        self.schedule = [step.insn for step in self.steps
+                if step.insn is not None]
+
+    @memoize_method
+    def get_step_functions(self, mapper_class):
+        """Return a :class:`tuple` with an entry for each of :attr:`steps`:
+        the function of *mapper_class* that executes its instruction, to be
+        called as ``func(exec_mapper, insn, profile_data)``, or *None* for
+        steps that wait for data.
+        """
+        return tuple(
+                None if step.insn is None
+                else getattr(mapper_class, step.insn.mapper_method)
+                for step in self.steps)
+
+# }}}
+
+
+# {{{ hoisting
+
+class _InputRef:
+    """Refers to an input value without keeping it alive, if possible, to
+    tell whether a later value is the same. Object arrays are compared entry
+    by entry, so that replacing one of their entries counts as a change.
+    """
+
+    def __init__(self, value):
+        from numbers import Number
+        self.ref = None
+        self.value = None
+        self.entry_refs = None
+
+        if isinstance(value, np.ndarray) and value.dtype.char == "O":
+            self.shape = value.shape
+            self.entry_refs = [_InputRef(entry) for entry in value.flat]
+        elif isinstance(value, Number):
+            self.value = value
+        else:
+            from weakref import ref
+            try:
+                self.ref = ref(value)
+            except TypeError:
+                self.value = value
+
+    def matches(self, value):
+        from numbers import Number
+        if self.entry_refs is not None:
+            return (isinstance(value, np.ndarray)
+                    and value.dtype.char == "O"
+                    and value.shape == self.shape
+                    and all(entry_ref.matches(entry)
+                        for entry_ref, entry in zip(self.entry_refs, value.flat)))
+        elif self.ref is not None:
+            return self.ref() is value
+        elif isinstance(self.value, Number) and isinstance(value, Number):
+            return self.value == value
+        else:
+            return self.value is value
+
+
+class _HoistedValue(Record):
+    pass
+
+
+class HoistedValueCache:
+    """Keeps results of instructions of a :class:`Code` across executions and
+    reuses them as long as the inputs they depend on are unchanged (see
+    :meth:`Code.get_hoistable_insns`). Inputs are compared by identity,
+    numbers by value, and object arrays entry by entry.
+
+    Results are only kept for instructions without inputs, or whose inputs
+    were unchanged from the previous execution, so that results computed
+    from inputs that change every time (such as the state of a time
+    integrator) are not held on to.
+
+    .. attribute:: reuse_input_dependent
+
+        If *False* (the default), only results of instructions that depend
+        on no inputs at all are reused.
+
+        .. warning::
+
+            Since inputs are compared by identity, results are reused even
+            if an input array was modified in place between executions. Only
+            set this to *True* if inputs are never modified in place.
+
+    .. attribute:: nhits
+
+        Number of instruction results reused in the most recent execution.
+
+    .. attribute:: saved_time
+
+        Time originally spent computing the results reused in the most recent
+        execution.
+
+    .. automethod:: begin_execution
+    .. automethod:: get
+    .. automethod:: should_store
+    .. automethod:: store
+    .. automethod:: clear
+    .. automethod:: get_report
+    """
+
+    def __init__(self, reuse_input_dependent=False):
+        self.reuse_input_dependent = reuse_input_dependent
+
+        self._input_refs = {}
+        self._changed_names = frozenset()
+        self._entries = {}
+
+        self.nhits = 0
+        self.saved_time = 0
+
+    def begin_execution(self, input_values):
+        """Compare *input_values*, a mapping from input names to values,
+        to those of the previous execution, and drop results depending on
+        inputs that changed. Unless :attr:`reuse_input_dependent` is set,
+        all inputs are considered changed.
+        """
+        if self.reuse_input_dependent:
+            self._changed_names = frozenset(
+                    name for name, value in input_values.items()
+                    if not (name in self._input_refs
+                        and self._input_refs[name].matches(value)))
+        else:
+            self._changed_names = frozenset(input_values)
+
+        self._input_refs = {name: _InputRef(value)
+                for name, value in input_values.items()}
+
+        self._entries = {insn: entry for insn, entry in self._entries.items()
+                if not entry.input_names & self._changed_names}
+
+        self.nhits = 0
+        self.saved_time = 0
+
+    def get(self, insn):
+        """Return the assignments made by *insn* if they are known, otherwise
+        *None*.
+        """
+        entry = self._entries.get(insn)
+        if entry is None:
+            return None
+
+        self.nhits += 1
+        self.saved_time += entry.eval_time
+        return entry.assignments
+
+    def should_store(self, input_names):
+        return not input_names & self._changed_names
+
+    def store(self, insn, input_names, assignments, eval_time):
+        self._entries[insn] = _HoistedValue(
+                input_names=input_names,
+                assignments=assignments,
+                eval_time=eval_time)
+
+    def copy_held_values(self, value):
+        """Return *value*, an (object array of) result(s) of an execution,
+        with copies in place of the held results it contains, so that callers
+        modifying their results in place do not modify the held ones.
+        """
+        from meshmode.dof_array import DOFArray
+
+        held_ids = set()
+        for entry in self._entries.values():
+            for _, held_value in entry.assignments:
+                held_ids.add(id(held_value))
+                if isinstance(held_value, DOFArray):
+                    held_ids.update(id(grp_ary) for grp_ary in held_value)
+
+        def copy_if_held(subvalue):
+            if (isinstance(subvalue, DOFArray)
+                    and (id(subvalue) in held_ids
+                        or any(id(grp_ary) in held_ids for grp_ary in subvalue))):
+                return DOFArray(subvalue.array_context,
+                        tuple(grp_ary.copy() for grp_ary in subvalue))
+
+            return subvalue
+
+        return obj_array_vectorize(copy_if_held, value)
+
+    def clear(self):
+        self._input_refs = {}
+        self._entries = {}
+
+    def get_report(self):
+        return ("%d instruction results held, %d reused in the last "
+                "execution, saving an estimated %.3g s"
+                % (len(self._entries), self.nhits, self.saved_time))
+
+
+def _get_hoistable_insns(code):
+    name_to_writer = {name: insn
+            for insn in code.instructions
+            for name in insn.get_assignees()}
+
+    insn_to_input_names = {}
+    for insn in code.get_execution_plan().schedule:
+        # Communication must happen on every execution, on all ranks.
+        if isinstance(insn, RankDataSwapAssign):
+            continue
+
+        input_names = set()
+        for dep in insn.get_dependencies():
+            writer = name_to_writer.get(dep.name)
+            if writer is None:
+                input_names.add(dep.name)
+            elif writer in insn_to_input_names:
+                input_names.update(insn_to_input_names[writer])
+            else:
+                break
+        else:
+            insn_to_input_names[insn] = frozenset(input_names)
+
+    return insn_to_input_names
+
+# }}}
+
+
+# {{{ future completion
+
+def _wait_for_futures(futures, timeout=None):
+    """Block until at least one of *futures* is ready and return the indices
+    of the ready ones.
+
+    If all futures have an ``mpi_request`` attribute, waiting is done through
+    :meth:`mpi4py.MPI.Request.Waitany` instead of by polling, and all requests
+    that completed in the meantime are collected using
+    :meth:`mpi4py.MPI.Request.Testsome`. If *timeout* is given, the requests are
+    tested instead, and progress is logged every *timeout* seconds.
+    """
+    requests = [getattr(future, "mpi_request", None) for future in futures]
+
+    if any(request is None for request in requests):
+        while True:
+            ready_indices = [i for i, future in enumerate(futures)
+                    if future.is_ready()]
+            if ready_indices:
+                return ready_indices
+
+    from mpi4py import MPI
+
+    if timeout is None:
+        index = MPI.Request.Waitany(requests)
+        if index == MPI.UNDEFINED:
+            # all requests were already completed
+            return list(range(len(futures)))
+        ready_indices = [index]
+    else:
+        from time import time
+        start_time = time()
+        next_report_time = start_time + timeout
+        while True:
+            ready_indices = MPI.Request.Testsome(requests)
+            if ready_indices is None:
+                return list(range(len(futures)))
+            elif ready_indices:
+                break
+
+            if time() >= next_report_time:
+                logger.info("still waiting for %d outstanding requests "
+                        "after %.1f s", len(requests), time() - start_time)
+                next_report_time += timeout
+
+    ready_indices = set(ready_indices)
+    ready_indices.update(MPI.Request.Testsome(requests) or [])
+    return sorted(ready_indices)
+
+# }}}
+
+
 # {{{ code representation
 
 class Code:
     def __init__(self, instructions, result):
         self.instructions = instructions
         self.result = result
-        # self.last_schedule = None
-        self.static_schedule_attempts = 5
 
     def dump_dataflow_graph(self, name=None):
         from pytools.debug import open_unique_debug_file
@@ -438,160 +1107,270 @@ class Code:
 
         return "\n".join(lines)
 
-    # {{{ dynamic scheduler (generates static schedules by self-observation)
-
-    class NoInstructionAvailable(Exception):
-        pass
-
     @memoize_method
-    def get_next_step(self, available_names, done_insns):
-        from pytools import argmax2
-        available_insns = [
-                (insn, insn.priority) for insn in self.instructions
-                if insn not in done_insns
-                and all(dep.name in available_names
-                    for dep in insn.get_dependencies())]
-
-        if not available_insns:
-            raise self.NoInstructionAvailable
-
-        from pytools import flatten
-        discardable_vars = set(available_names) - set(flatten(
-            [dep.name for dep in insn.get_dependencies()]
-            for insn in self.instructions
-            if insn not in done_insns))
-
-        # {{{ make sure results do not get discarded
-
-        dm = mappers.DependencyMapper(composite_leaves=False)
+    def get_execution_plan(self, prioritize_communication=True):
+        """Return the :class:`ExecutionPlan` used by :meth:`execute`."""
+        return ExecutionPlan(self,
+                prioritize_communication=prioritize_communication)
 
-        def remove_result_variable(result_expr):
-            # The extra dependency mapper run is necessary
-            # because, for instance, subscripts can make it
-            # into the result expression, which then does
-            # not consist of just variables.
-
-            for var in dm(result_expr):
-                assert isinstance(var, Variable)
-                discardable_vars.discard(var.name)
-
-        obj_array_vectorize(remove_result_variable, self.result)
-
-        # }}}
+    @memoize_method
+    def get_memory_footprint_report(self):
+        """Return a :class:`MemoryFootprintReport` for this code."""
+        return MemoryFootprintReport(self)
 
-        return argmax2(available_insns), discardable_vars
+    @memoize_method
+    def get_hoistable_insns(self):
+        """Return a :class:`dict` mapping each instruction whose results may
+        be reused across executions to the :class:`frozenset` of input names
+        it depends on, directly or indirectly. Instructions that depend on
+        no inputs at all map to an empty set. Instructions that communicate,
+        and those that depend on them, are not included.
+        """
+        return _get_hoistable_insns(self)
 
     def execute(self, exec_mapper, pre_assign_check=None, profile_data=None,
-                log_quantities=None):
+                log_quantities=None, wait_timeout=None, hoisted_values=None):
+        """
+        :arg wait_timeout: if not *None*, log a message every *wait_timeout*
+            seconds while waiting for futures, e.g. for communication
+            with other ranks.
+        :arg hoisted_values: if not *None*, a :class:`HoistedValueCache` from
+            which results of instructions whose inputs did not change since
+            earlier executions are reused. The number of reused results and
+            the time saved are reported in ``profile_data["hoisted_insn_count"]``
+            and ``profile_data["hoisted_time"]``.
+
+        If *profile_data* is given, the time from executing the first
+        :class:`RankDataSwapAssign` until all received data is available is
+        accumulated in ``profile_data["comm_exchange_time"]``, and the part of
+        it spent waiting in ``profile_data["comm_exposed_wait_time"]``. These
+        are also passed to the ``"overlap_efficiency"`` entry of
+        *log_quantities*, if present (see
+        :class:`grudge.log.CommunicationOverlapEfficiency`).
+        """
+        from time import time
         if profile_data is not None:
-            from time import time
             start_time = time()
             if profile_data == {}:
                 profile_data["insn_eval_time"] = 0
                 profile_data["future_eval_time"] = 0
                 profile_data["busy_wait_time"] = 0
                 profile_data["total_time"] = 0
+                profile_data["comm_exchange_time"] = 0
+                profile_data["comm_exposed_wait_time"] = 0
+                profile_data["hoisted_insn_count"] = 0
+                profile_data["hoisted_time"] = 0
         if log_quantities is not None:
             exec_sub_timer = log_quantities["exec_timer"].start_sub_timer()
         context = exec_mapper.context
 
+        plan = self.get_execution_plan()
+        if plan.unscheduled_insns or not plan.input_names <= context.keys():
+            raise RuntimeError("not all instructions are reachable"
+                    "--did you forget to pass a value for a placeholder?")
+
+        if hoisted_values is not None:
+            hoistable_insns = self.get_hoistable_insns()
+            hoisted_values.begin_execution(
+                    {name: context[name] for name in plan.input_names})
+
+        # If the execution mapper allocates from a pool, release storage of
+        # variables as soon as they are discarded.
+        buffer_pool = getattr(exec_mapper, "buffer_pool", None)
+        if profile_data is not None:
+            var_to_nbytes = {}
+
+        def assign(target, value):
+            if pre_assign_check is not None:
+                pre_assign_check(target, value)
+            context[target] = value
+
+            if buffer_pool is not None:
+                buffer_pool.add_reference(value)
+            if profile_data is not None:
+                var_to_nbytes[target] = _get_value_nbytes(value)
+
         futures = []
-        done_insns = set()
 
-        while True:
-            try:
+        def evaluate_futures(ready_futures):
+            for future in ready_futures:
+                futures.remove(future)
+
+            for future in ready_futures:
+                assignments, new_futures = future()
+
+                for target, value in assignments:
+                    assign(target, value)
+
+                futures.extend(new_futures)
+
+        def complete_futures(is_done):
+            # Wait for futures until is_done() holds, return the time spent
+            # waiting.
+            wait_time = 0
+            if log_quantities is not None:
+                busy_sub_timer =\
+                        log_quantities["busy_wait_timer"].start_sub_timer()
+
+            while not is_done():
+                if not futures:
+                    raise RuntimeError("no outstanding futures left to wait for")
+
+                # About to wait anyway, so finish work that will post more
+                # requests (e.g. sends waiting for a device-to-host copy).
+                pending_futures = [future for future in futures
+                        if getattr(future, "evaluate_when_ready", False)]
+                if pending_futures:
+                    evaluate_futures(pending_futures)
+                    continue
+
+                busy_wait_start_time = time()
+                ready_indices = _wait_for_futures(futures, wait_timeout)
+                wait_time += time() - busy_wait_start_time
+
+                if profile_data is not None:
+                    future_start_time = time()
+                if log_quantities is not None:
+                    busy_sub_timer.stop().submit()
+                    future_sub_timer =\
+                            log_quantities["future_eval_timer"].start_sub_timer()
+
+                evaluate_futures([futures[i] for i in ready_indices])
+
+                if profile_data is not None:
+                    profile_data["future_eval_time"] +=\
+                            time() - future_start_time
+                if log_quantities is not None:
+                    future_sub_timer.stop().submit()
+                    busy_sub_timer =\
+                            log_quantities["busy_wait_timer"].start_sub_timer()
+
+            if profile_data is not None:
+                profile_data["busy_wait_time"] += wait_time
+            if log_quantities is not None:
+                busy_sub_timer.stop().submit()
+
+            return wait_time
+
+        comm_start_time = None
+        comm_end_time = None
+        comm_exposed_wait_time = 0
+
+        step_functions = plan.get_step_functions(type(exec_mapper))
+
+        for step, step_function in zip(plan.steps, step_functions):
+            insn = step.insn
+            if insn is None:
+                comm_exposed_wait_time += complete_futures(
+                        lambda: step.wait_names <= context.keys())
+                comm_end_time = time()
+            else:
+                if comm_start_time is None and isinstance(insn, RankDataSwapAssign):
+                    comm_start_time = time()
+
                 if profile_data is not None:
                     insn_start_time = time()
                 if log_quantities is not None:
                     insn_sub_timer = \
                             log_quantities["insn_eval_timer"].start_sub_timer()
 
-                insn, discardable_vars = self.get_next_step(
-                    frozenset(list(context.keys())),
-                    frozenset(done_insns))
+                input_names = None
+                assignments = None
+                if hoisted_values is not None:
+                    input_names = hoistable_insns.get(insn)
+                    if input_names is not None:
+                        assignments = hoisted_values.get(insn)
 
-                done_insns.add(insn)
-                for name in discardable_vars:
-                    del context[name]
+                if assignments is not None:
+                    new_futures = []
+                else:
+                    eval_start_time = time()
 
-                mapper_method = getattr(exec_mapper, insn.mapper_method)
-                if log_quantities is not None:
-                    if isinstance(insn, RankDataSwapAssign):
+                    if buffer_pool is not None:
+                        # Inputs that are not needed after this instruction
+                        # may donate their storage to its output.
+                        for name in step.donatable_names:
+                            buffer_pool.donate(context[name])
+
+                    if (log_quantities is not None
+                            and isinstance(insn, RankDataSwapAssign)):
                         from logpyle import time_and_count_function
-                        mapper_method = time_and_count_function(
-                                mapper_method,
+                        step_function = time_and_count_function(
+                                step_function,
                                 log_quantities["rank_data_swap_timer"],
                                 log_quantities["rank_data_swap_counter"])
 
-                assignments, new_futures = mapper_method(insn, profile_data)
+                    assignments, new_futures = step_function(
+                            exec_mapper, insn, profile_data)
+
+                    if buffer_pool is not None:
+                        buffer_pool.end_donation()
+
+                    if (input_names is not None
+                            and hoisted_values.should_store(input_names)):
+                        if buffer_pool is not None:
+                            for _, value in assignments:
+                                buffer_pool.retain(value)
+                        hoisted_values.store(insn, input_names, assignments,
+                                time() - eval_start_time)
 
                 for target, value in assignments:
-                    if pre_assign_check is not None:
-                        pre_assign_check(target, value)
-                    context[target] = value
+                    assign(target, value)
 
                 futures.extend(new_futures)
+
+                # Post sends as soon as their data is ready.
+                evaluate_futures([future for future in futures
+                    if getattr(future, "evaluate_when_ready", False)
+                    and future.is_ready()])
+
                 if profile_data is not None:
                     profile_data["insn_eval_time"] += time() - insn_start_time
                 if log_quantities is not None:
                     insn_sub_timer.stop().submit()
-            except self.NoInstructionAvailable:
-                if not futures:
-                    # No more instructions or futures. We are done.
-                    break
-
-                # Busy wait for a new future
-                if profile_data is not None:
-                    busy_wait_start_time = time()
-                if log_quantities is not None:
-                    busy_sub_timer =\
-                            log_quantities["busy_wait_timer"].start_sub_timer()
 
-                did_eval_future = False
-                while not did_eval_future:
-                    for i in range(len(futures)):
-                        if futures[i].is_ready():
-                            if profile_data is not None:
-                                profile_data["busy_wait_time"] +=\
-                                        time() - busy_wait_start_time
-                                future_start_time = time()
-                            if log_quantities is not None:
-                                busy_sub_timer.stop().submit()
-                                future_sub_timer =\
-                                            log_quantities["future_eval_timer"]\
-                                                                .start_sub_timer()
-
-                            future = futures.pop(i)
-                            assignments, new_futures = future()
-
-                            for target, value in assignments:
-                                if pre_assign_check is not None:
-                                    pre_assign_check(target, value)
-                                context[target] = value
-
-                            futures.extend(new_futures)
-                            did_eval_future = True
-
-                            if profile_data is not None:
-                                profile_data["future_eval_time"] +=\
-                                        time() - future_start_time
-                            if log_quantities is not None:
-                                future_sub_timer.stop().submit()
-                            break
-
-        if len(done_insns) < len(self.instructions):
-            raise RuntimeError("not all instructions are reachable"
-                    "--did you forget to pass a value for a placeholder?")
+            for name in step.discard_names:
+                value = context.pop(name)
+                if buffer_pool is not None:
+                    buffer_pool.remove_reference(value)
+
+        # e.g. completion of sends
+        if futures:
+            comm_exposed_wait_time += complete_futures(lambda: not futures)
+            comm_end_time = time()
+
+        if comm_start_time is not None:
+            if comm_end_time is None:
+                comm_end_time = time()
+            comm_exchange_time = comm_end_time - comm_start_time
+
+            if profile_data is not None:
+                profile_data["comm_exchange_time"] += comm_exchange_time
+                profile_data["comm_exposed_wait_time"] += comm_exposed_wait_time
+            if (log_quantities is not None
+                    and "overlap_efficiency" in log_quantities):
+                log_quantities["overlap_efficiency"].add_exchange(
+                        comm_exchange_time, comm_exposed_wait_time)
 
         if log_quantities is not None:
             exec_sub_timer.stop().submit()
         if profile_data is not None:
+            if hoisted_values is not None:
+                profile_data["hoisted_insn_count"] += hoisted_values.nhits
+                profile_data["hoisted_time"] += hoisted_values.saved_time
             profile_data["total_time"] = time() - start_time
-            return (obj_array_vectorize(exec_mapper, self.result),
-                    profile_data)
-        return obj_array_vectorize(exec_mapper, self.result)
+            (profile_data["memory_footprint_with_reuse_nbytes"],
+                    profile_data["memory_footprint_naive_nbytes"]) = \
+                            self.get_memory_footprint_report().get_footprint(
+                                var_to_nbytes)
 
-# }}}
+        result = obj_array_vectorize(exec_mapper, self.result)
+        if hoisted_values is not None:
+            result = hoisted_values.copy_held_values(result)
+
+        if profile_data is not None:
+            return result, profile_data
+        return result
 
 # }}}
 
@@ -930,13 +1709,16 @@ BESSEL_PREAMBLE = """//CL//
 
 
 def bessel_preamble_generator(preamble_info):
+    if not any(func.name in ["bessel_j", "bessel_y"]
+            for func in preamble_info.seen_functions):
+        return
+
     from loopy.target.pyopencl import PyOpenCLTarget
     if not isinstance(preamble_info.kernel.target, PyOpenCLTarget):
-        raise NotImplementedError("Only the PyOpenCLTarget is supported as of now")
+        raise NotImplementedError("Bessel functions are only supported "
+                "on the PyOpenCLTarget as of now")
 
-    if any(func.name in ["bessel_j", "bessel_y"]
-            for func in preamble_info.seen_functions):
-        yield ("50-grudge-bessel", BESSEL_PREAMBLE)
+    yield ("50-grudge-bessel", BESSEL_PREAMBLE)
 
 
 def bessel_function_mangler(kernel, name, arg_dtypes):
@@ -1022,38 +1804,53 @@ class ToLoopyInstructionMapper:
         if not expr_mapper.non_scalar_vars:
             return insn
 
-        knl = lp.make_kernel(
-                "{[%(iel)s, %(idof)s]: "
-                "0 <= %(iel)s < nelements and 0 <= %(idof)s < nunit_dofs}"
-                % {"iel": iel, "idof": idof},
-                insns,
-
-                name="grudge_assign_%d" % self.insn_count,
+        kernel_name = "grudge_assign_%d" % self.insn_count
+        self.insn_count += 1
 
-                # Single-insn kernels may have their no_sync_with resolve to an
-                # empty set, that's OK.
-                options=lp.Options(
-                    check_dep_resolution=False,
-                    return_dict=True,
-                    no_numpy=True,
+        def build():
+            knl = lp.make_kernel(
+                    "{[%(iel)s, %(idof)s]: "
+                    "0 <= %(iel)s < nelements and 0 <= %(idof)s < nunit_dofs}"
+                    % {"iel": iel, "idof": idof},
+                    insns,
+
+                    name=kernel_name,
+
+                    # Single-insn kernels may have their no_sync_with resolve to
+                    # an empty set, that's OK.
+                    options=lp.Options(
+                        check_dep_resolution=False,
+                        return_dict=True,
+                        no_numpy=True,
+                        )
                     )
-                )
-        for arg in knl.args:
-            if type(arg) == lp.ArrayArg:
-                arg.tags = IsDOFArray()
-
-        self.insn_count += 1
+            for arg in knl.args:
+                if type(arg) is lp.ArrayArg:
+                    arg.tags = IsDOFArray()
+
+            knl = lp.register_preamble_generators(knl,
+                    [bessel_preamble_generator])
+            knl = lp.register_function_manglers(knl,
+                    [bessel_function_mangler])
+            return knl
+
+        # Building the kernel is costly, so it is cached on disk. The
+        # instructions are keyed by their pickled form, which captures the
+        # exact types of any constants.
+        import pickle
+        from grudge.loopy_dg_kernels import get_cached_kernel
+        knl = get_cached_kernel("assign-kernels",
+                (kernel_name, pickle.dumps([
+                    (lp_insn.assignee, lp_insn.expression, dnr)
+                    for lp_insn, dnr in zip(insns, insn.do_not_return)],
+                    protocol=4)),
+                build)
 
         from pytools import single_valued
         governing_dd = single_valued(
                 self.dd_inference_mapper(expr)
                 for expr in insn.exprs)
 
-        knl = lp.register_preamble_generators(knl,
-                [bessel_preamble_generator])
-        knl = lp.register_function_manglers(knl,
-                [bessel_function_mangler])
-
         input_mappings = {}
         output_mappings = {}
 
@@ -1108,6 +1905,162 @@ def rewrite_insn_to_loopy_insns(inf_mapper, insn_list):
 # }}}
 
 
+# {{{ derivative fusion
+
+def _make_fused_diff_kernel(knl, diff_arg_to_index, noperators):
+    """Return a version of the elementwise kernel *knl* that computes its
+    inputs named in *diff_arg_to_index* as reference derivatives
+    ``diff_mat[i] @ diff_vec`` of a single field, instead of reading them
+    from global memory.
+    """
+    import loopy as lp
+    from loopy.symbolic import IdentityMapper, Reduction
+    from pymbolic import var
+
+    iel = var("iel")
+    idof = var("idof")
+    j = var("j")
+
+    class DiffArgToTemporary(IdentityMapper):
+        def map_subscript(self, expr):
+            if expr.aggregate.name in diff_arg_to_index:
+                return expr.aggregate
+            return super().map_subscript(expr)
+
+    arg_to_temp = DiffArgToTemporary()
+
+    insns = [
+            lp.Assignment(
+                var(name),
+                Reduction("sum", ("j",),
+                    var("diff_mat")[i, idof, j] * var("diff_vec")[iel, j]),
+                temp_var_type=lp.Optional(None))
+            for name, i in sorted(diff_arg_to_index.items())]
+
+    for insn in knl.instructions:
+        insns.append(
+                lp.Assignment(
+                    arg_to_temp(insn.assignee),
+                    arg_to_temp(insn.expression),
+                    temp_var_type=(
+                        lp.Optional(None)
+                        if insn.assignee_name in knl.temporary_variables
+                        else lp.Optional()),
+                    no_sync_with=frozenset([
+                        ("*", "any"),
+                        ])))
+
+    def build():
+        fused_knl = lp.make_kernel(
+                "{[iel, idof, j]: "
+                "0 <= iel < nelements and 0 <= idof < nunit_dofs "
+                "and 0 <= j < nunit_dofs}",
+                insns,
+                [
+                    lp.GlobalArg("diff_mat", None,
+                        shape=(noperators, "nunit_dofs", "nunit_dofs")),
+                    ...
+                    ],
+                name="%s_fused_diff" % knl.name,
+                options=lp.Options(
+                    check_dep_resolution=False,
+                    return_dict=True,
+                    no_numpy=True,
+                    ))
+        for arg in fused_knl.args:
+            if type(arg) is lp.ArrayArg and arg.name != "diff_mat":
+                arg.tags = IsDOFArray()
+
+        fused_knl = lp.register_preamble_generators(fused_knl,
+                [bessel_preamble_generator])
+        fused_knl = lp.register_function_manglers(fused_knl,
+                [bessel_function_mangler])
+        return fused_knl
+
+    from grudge.loopy_dg_kernels import get_cached_kernel
+    return get_cached_kernel("fused-diff-kernels",
+            (knl, tuple(sorted(diff_arg_to_index.items())), noperators),
+            build)
+
+
+def fuse_diff_batches(instructions, result):
+    """Fuse each :class:`DiffBatchAssign` whose results are used only by a
+    single elementwise :class:`LoopyKernelInstruction` into that kernel,
+    which then computes the reference derivatives itself. This avoids
+    writing the reference derivatives to memory and reading them back.
+    """
+    result_names = _get_result_names(result)
+
+    name_to_readers = {}
+    for insn in instructions:
+        for dep in insn.get_dependencies():
+            name_to_readers.setdefault(dep.name, set()).add(insn)
+
+    fused_insns = {}
+    removed_insns = set()
+
+    for insn in instructions:
+        if not isinstance(insn, DiffBatchAssign):
+            continue
+
+        repr_op = insn.operators[0]
+        if (repr_op.dd_in != repr_op.dd_out
+                or len(insn.fields) != 1
+                or not isinstance(insn.field, (Variable, Subscript))
+                or result_names & set(insn.names)):
+            continue
+
+        readers = {reader
+                for name in insn.names
+                for reader in name_to_readers.get(name, ())}
+        if len(readers) != 1:
+            continue
+
+        reader, = readers
+        if (not isinstance(reader, LoopyKernelInstruction)
+                or reader in fused_insns
+                or reader.kernel_descriptor.diff_operators is not None
+                or reader.kernel_descriptor.governing_dd != repr_op.dd_out):
+            continue
+
+        kdescr = reader.kernel_descriptor
+        knl = kdescr.loopy_kernel
+        if ({"j", "diff_mat", "diff_vec"} & (
+                knl.all_variable_names() | knl.all_inames())):
+            continue
+
+        name_to_index = {name: i for i, name in enumerate(insn.names)}
+        diff_arg_to_index = {arg_name: name_to_index[expr.name]
+                for arg_name, expr in kdescr.input_mappings.items()
+                if isinstance(expr, Variable) and expr.name in name_to_index}
+
+        input_mappings = {arg_name: expr
+                for arg_name, expr in kdescr.input_mappings.items()
+                if arg_name not in diff_arg_to_index}
+        input_mappings["diff_vec"] = insn.field
+
+        fused_insns[reader] = LoopyKernelInstruction(
+                LoopyKernelDescriptor(
+                    loopy_kernel=_make_fused_diff_kernel(
+                        knl, diff_arg_to_index, len(insn.operators)),
+                    input_mappings=input_mappings,
+                    output_mappings=kdescr.output_mappings,
+                    fixed_arguments=kdescr.fixed_arguments,
+                    governing_dd=kdescr.governing_dd,
+                    diff_operators=list(insn.operators)))
+        removed_insns.add(insn)
+
+    if fused_insns:
+        logger.debug("fused %d derivative batches into elementwise kernels",
+                len(fused_insns))
+
+    return [fused_insns.get(insn, insn)
+            for insn in instructions
+            if insn not in removed_insns]
+
+# }}}
+
+
 # {{{ compiler
 
 class CodeGenerationState(Record):
@@ -1123,6 +2076,9 @@ class CodeGenerationState(Record):
 
 
 class OperatorCompiler(mappers.IdentityMapper):
+    # elementwise operators that are applied to several fields at once
+    batchable_op_classes = (sym.RefMassOperatorBase, sym.RefFaceMassOperator)
+
     def __init__(self, discr, function_registry,
             prefix="_expr", max_vectors_in_batch_expr=None):
         super().__init__()
@@ -1145,11 +2101,35 @@ class OperatorCompiler(mappers.IdentityMapper):
         from pytools import UniqueNameGenerator
         self.name_gen = UniqueNameGenerator()
 
+        volume_discr = discr.discr_from_dd(sym.DD_VOLUME)
+        self.all_elements_affine = all(
+                grp.is_affine for grp in volume_discr.groups)
+        self.elementwise_degree_mapper = \
+                mappers.ElementwisePolynomialDegreeMapper()
+
     # {{{ collect various optemplate components
 
     def collect_diff_ops(self, expr):
         return mappers.BoundOperatorCollector(sym.RefDiffOperatorBase)(expr)
 
+    def collect_discr_scoped_diff_ops(self, expr):
+        return mappers.DiscretizationScopedBoundOperatorCollector(
+                sym.RefDiffOperatorBase)(expr)
+
+    def collect_batchable_ops(self, expr):
+        return mappers.BoundOperatorCollector(self.batchable_op_classes)(expr)
+
+    def collect_discr_scoped_batchable_ops(self, expr):
+        return mappers.DiscretizationScopedBoundOperatorCollector(
+                self.batchable_op_classes)(expr)
+
+    def collect_batched_ops(self, expr):
+        """Collect the bindings of all operators that may be computed in a
+        :class:`DiffBatchAssign`.
+        """
+        return mappers.BoundOperatorCollector(
+                (sym.RefDiffOperatorBase,) + self.batchable_op_classes)(expr)
+
     # }}}
 
     # {{{ top-level driver
@@ -1163,6 +2143,13 @@ class OperatorCompiler(mappers.IdentityMapper):
 
         # Used for diff batching
         self.diff_ops = self.collect_diff_ops(expr)
+        self.discr_scoped_diff_ops = self.collect_discr_scoped_diff_ops(expr)
+
+        # Used for batching (face) mass matrix applications across fields
+        self.batchable_ops = self.collect_batchable_ops(expr)
+        self.discr_scoped_batchable_ops = \
+                self.collect_discr_scoped_batchable_ops(expr)
+        self.field_to_batch_level = {}
 
         codegen_state = CodeGenerationState(generating_discr_code=False)
         # Finally, walk the expression and build the code.
@@ -1182,6 +2169,7 @@ class OperatorCompiler(mappers.IdentityMapper):
 
         discr_code = rewrite_insn_to_loopy_insns(inf_mapper, discr_code)
         eval_code = rewrite_insn_to_loopy_insns(inf_mapper, eval_code)
+        eval_code = fuse_diff_batches(eval_code, result)
 
         from pytools.obj_array import make_obj_array
         return (
@@ -1208,6 +2196,13 @@ class OperatorCompiler(mappers.IdentityMapper):
 
         return Variable(new_name)
 
+    def is_elementwise_constant(self, expr):
+        """Return *True* if *expr* is known to be constant on each element,
+        as geometric factors of affine elements are.
+        """
+        return (self.all_elements_affine
+                and self.elementwise_degree_mapper(expr) == 0)
+
     # }}}
 
     # {{{ map_xxx routines
@@ -1244,7 +2239,9 @@ class OperatorCompiler(mappers.IdentityMapper):
 
                 new_codegen_state.get_code_list(self).append(
                         ToDiscretizationScopedAssign(
-                            (expr_name,), (rec_child,), priority=priority))
+                            (expr_name,), (rec_child,), priority=priority,
+                            elementwise_constant=self.is_elementwise_constant(
+                                expr.child)))
 
                 self.discr_scope_names_created.add(expr_name)
 
@@ -1282,17 +2279,23 @@ class OperatorCompiler(mappers.IdentityMapper):
             return self.map_ref_diff_op_binding(expr, codegen_state)
         elif isinstance(expr.op, sym.OppositePartitionFaceSwap):
             return self.map_rank_data_swap_binding(expr, codegen_state, name_hint)
+        elif isinstance(expr.op, self.batchable_op_classes):
+            return self.map_batchable_op_binding(
+                    expr, codegen_state, name_hint)
         else:
-            # make sure operator assignments stand alone and don't get muddled
-            # up in vector math
-            field_var = self.assign_to_new_var(
-                    codegen_state,
-                    self.rec(expr.field, codegen_state))
-            result_var = self.assign_to_new_var(
-                    codegen_state,
-                    expr.op(field_var),
-                    prefix=name_hint)
-            return result_var
+            return self.map_generic_op_binding(expr, codegen_state, name_hint)
+
+    def map_generic_op_binding(self, expr, codegen_state, name_hint):
+        # make sure operator assignments stand alone and don't get muddled
+        # up in vector math
+        field_var = self.assign_to_new_var(
+                codegen_state,
+                self.rec(expr.field, codegen_state))
+        result_var = self.assign_to_new_var(
+                codegen_state,
+                expr.op(field_var),
+                prefix=name_hint)
+        return result_var
 
     def map_call(self, expr, codegen_state):
         if is_function_loopyable(expr.function, self.function_registry):
@@ -1314,10 +2317,28 @@ class OperatorCompiler(mappers.IdentityMapper):
         try:
             return self.expr_to_var[expr]
         except KeyError:
-            all_diffs = [diff
-                    for diff in self.diff_ops
-                    if diff.op.equal_except_for_axis(expr.op)
-                    and diff.field == expr.field]
+            field_to_diffs = {}
+            for diff in self.diff_ops:
+                if diff.op.equal_except_for_axis(expr.op):
+                    field_to_diffs.setdefault(diff.field, []).append(diff)
+
+            field_diffs = field_to_diffs.pop(expr.field)
+            operators = [d.op for d in field_diffs]
+
+            fields = [expr.field]
+            all_diffs = list(field_diffs)
+
+            if self._can_batch_across_fields(field_diffs, codegen_state):
+                level = self._get_batch_level(expr.field)
+                for other_field, other_diffs in field_to_diffs.items():
+                    op_to_diff = {d.op: d for d in other_diffs}
+                    if (len(op_to_diff) == len(operators)
+                            and set(op_to_diff) == set(operators)
+                            and self._get_batch_level(other_field) == level
+                            and self._can_batch_across_fields(
+                                other_diffs, codegen_state)):
+                        fields.append(other_field)
+                        all_diffs.extend(op_to_diff[op] for op in operators)
 
             names = [self.name_gen("expr") for d in all_diffs]
 
@@ -1328,10 +2349,9 @@ class OperatorCompiler(mappers.IdentityMapper):
                     DiffBatchAssign(
                         names=names,
                         op_class=op_class,
-                        operators=[d.op for d in all_diffs],
-                        field=self.rec(
-                            single_valued(d.field for d in all_diffs),
-                            codegen_state)))
+                        operators=operators,
+                        fields=[self.rec(field, codegen_state)
+                            for field in fields]))
 
             from pymbolic import var
             for n, d in zip(names, all_diffs):
@@ -1339,6 +2359,104 @@ class OperatorCompiler(mappers.IdentityMapper):
 
             return self.expr_to_var[expr]
 
+    def _can_batch_across_fields(self, field_diffs, codegen_state):
+        """Return whether the derivatives *field_diffs* of a single field may
+        be computed in the same :class:`DiffBatchAssign` as the derivatives of
+        other fields (of the same :meth:`_get_batch_level`).
+
+        Derivatives that are (also) part of discretization-scoped code are
+        never batched across fields, as the other fields might not be
+        available there.
+        """
+        if codegen_state.generating_discr_code:
+            return False
+
+        for diff in field_diffs:
+            if (diff in self.expr_to_var
+                    or diff in self.discr_scoped_diff_ops):
+                return False
+
+        return True
+
+    def _get_batch_level(self, field):
+        """Return the number of nested operator applications computed in
+        :class:`DiffBatchAssign` instructions that *field* depends on, along
+        the longest chain.
+
+        Batches only combine fields of the same level. Each batch then only
+        depends on batches of lower levels, so that batches can never depend
+        on each other, whichever operators they apply.
+        """
+        try:
+            return self.field_to_batch_level[field]
+        except KeyError:
+            pass
+
+        level = 1 + max(
+                (self._get_batch_level(binding.field)
+                    for binding in self.collect_batched_ops(field)),
+                default=-1)
+
+        self.field_to_batch_level[field] = level
+        return level
+
+    def map_batchable_op_binding(self, expr, codegen_state, name_hint):
+        try:
+            return self.expr_to_var[expr]
+        except KeyError:
+            pass
+
+        fields = self._get_op_batch_fields(expr, codegen_state)
+        if len(fields) == 1:
+            return self.map_generic_op_binding(expr, codegen_state, name_hint)
+
+        # Register the results before recursing into the fields, so that no
+        # other batch claims them.
+        from pymbolic import var
+        names = [self.name_gen("expr") for field in fields]
+        for name, field in zip(names, fields):
+            self.expr_to_var[expr.op(field)] = var(name)
+
+        codegen_state.get_code_list(self).append(
+                DiffBatchAssign(
+                    names=names,
+                    op_class=type(expr.op),
+                    operators=[expr.op],
+                    fields=[
+                        self.assign_to_new_var(
+                            codegen_state, self.rec(field, codegen_state))
+                        for field in fields]))
+
+        return self.expr_to_var[expr]
+
+    def _get_op_batch_fields(self, expr, codegen_state):
+        """Return a list of fields, starting with the field of *expr*, to which
+        the operator of *expr* is applied within a single
+        :class:`DiffBatchAssign`.
+
+        A field is only added if it has the same :meth:`_get_batch_level` as
+        the field of *expr*, so that the batch neither depends on its own
+        results nor on those of a batch that depends on it.
+        """
+        if (codegen_state.generating_discr_code
+                or expr in self.discr_scoped_batchable_ops):
+            return [expr.field]
+
+        fields = [expr.field]
+        level = self._get_batch_level(expr.field)
+
+        for binding in self.batchable_ops:
+            if (binding.op != expr.op
+                    or binding.field in fields
+                    or binding in self.expr_to_var
+                    or binding in self.discr_scoped_batchable_ops
+                    or self._get_batch_level(binding.field) != level):
+                continue
+
+            fields.append(binding.field)
+
+        return fields
+
     def map_rank_data_swap_binding(self, expr, codegen_state, name_hint):
         try:
             return self.expr_to_var[expr]
@@ -210,20 +210,21 @@ class DOFDescInferenceMapper(RecursiveMapper, CSECachingMapperMixin):
     map_insn_assign_to_discr_scoped = map_insn_assign
 
     def map_insn_diff_batch_assign(self, insn):
+        repr_op = insn.operators[0]
         if self.check:
-            repr_op = insn.operators[0]
-            input_dd = self.rec(insn.field)
-            if input_dd != repr_op.dd_in:
-                raise ValueError("mismatched input to %s "
-                        "(got: %s, expected: %s)"
-                        % (
-                            type(insn).__name__,
-                            input_dd, repr_op.dd_in,
-                            ))
+            for field in insn.fields:
+                input_dd = self.rec(field)
+                if input_dd != repr_op.dd_in:
+                    raise ValueError("mismatched input to %s "
+                            "(got: %s, expected: %s)"
+                            % (
+                                type(insn).__name__,
+                                input_dd, repr_op.dd_in,
+                                ))
 
         return [
-                (name, op.dd_out)
-                for name, op in zip(insn.names, insn.operators)]
+                (name, repr_op.dd_out)
+                for name in insn.names]
 
     # }}}
 
@@ -421,7 +421,8 @@ class DistributedMapper(CSECachingMapperMixin, IdentityMapper):
             distributed_work = 0
             for i_remote_part in self.connected_parts:
                 mapped_field = RankGeometryChanger(i_remote_part)(expr.field)
-                btag_part = BTAG_PARTITION(i_remote_part)
+                btag_part = sym.DOFDesc(BTAG_PARTITION(i_remote_part),
+                        expr.op.dd_in.quadrature_tag)
                 distributed_work += op.ProjectionOperator(dd_in=btag_part,
                                              dd_out=expr.op.dd_out)(mapped_field)
             return expr + distributed_work
@@ -430,6 +431,15 @@ class DistributedMapper(CSECachingMapperMixin, IdentityMapper):
 
 
 class RankGeometryChanger(CSECachingMapperMixin, IdentityMapper):
+    """Changes an expression on interior faces into the corresponding
+    expression on the boundary shared with remote part *i_remote_part*.
+
+    Quadrature tags are preserved. Opposite-face swaps of data that was
+    projected to a quadrature grid are rewritten to swap the base-order
+    data and project it to the quadrature grid on the receiving side, so
+    that only base-order data is communicated.
+    """
+
     map_common_subexpression_uncached = IdentityMapper.map_common_subexpression
 
     def __init__(self, i_remote_part):
@@ -444,25 +454,66 @@ class RankGeometryChanger(CSECachingMapperMixin, IdentityMapper):
             "unable to adapt from '%s' to '%s'"
             % (str(expr), self.prev_dd, self.new_dd))
 
+    def _is_changed(self, dd):
+        return dd.domain_tag == self.prev_dd.domain_tag
+
+    def _change_dd(self, dd):
+        return self.new_dd.with_qtag(dd.quadrature_tag)
+
+    def _get_base_field(self, field):
+        """If *field* is a projection of base-order interior face data to a
+        quadrature grid, return the base-order expression, else *None*.
+        """
+        if isinstance(field, pymbolic.primitives.CommonSubexpression):
+            field = field.child
+
+        if (isinstance(field, sym.OperatorBinding)
+                and isinstance(field.op, op.ProjectionOperator)
+                and field.op.dd_in == self.prev_dd
+                and self._is_changed(field.op.dd_out)):
+            return field.field
+        else:
+            return None
+
     def map_operator_binding(self, expr):
         if (isinstance(expr.op, op.OppositeInteriorFaceSwap)
-                    and expr.op.dd_in == self.prev_dd
-                    and expr.op.dd_out == self.prev_dd):
-            field = self.rec(expr.field)
-            return op.OppositePartitionFaceSwap(
+                    and self._is_changed(expr.op.dd_in)):
+            if not expr.op.dd_in.uses_quadrature():
+                field = self.rec(expr.field)
+                return op.OppositePartitionFaceSwap(
+                        dd_in=self.new_dd,
+                        dd_out=self.new_dd,
+                        unique_id=expr.op.unique_id)(field)
+
+            base_field = self._get_base_field(expr.field)
+            if base_field is None:
+                self._raise_unable(expr)
+
+            swapped = op.OppositePartitionFaceSwap(
                     dd_in=self.new_dd,
                     dd_out=self.new_dd,
-                    unique_id=expr.op.unique_id)(field)
+                    unique_id=expr.op.unique_id)(self.rec(base_field))
+            return op.ProjectionOperator(
+                    dd_in=self.new_dd,
+                    dd_out=self._change_dd(expr.op.dd_out))(swapped)
         elif (isinstance(expr.op, op.ProjectionOperator)
-                    and expr.op.dd_out == self.prev_dd):
-            return op.ProjectionOperator(dd_in=expr.op.dd_in,
-                                            dd_out=self.new_dd)(expr.field)
+                    and self._is_changed(expr.op.dd_out)):
+            if self._is_changed(expr.op.dd_in):
+                return op.ProjectionOperator(
+                        dd_in=self._change_dd(expr.op.dd_in),
+                        dd_out=self._change_dd(expr.op.dd_out))(
+                                self.rec(expr.field))
+            else:
+                return op.ProjectionOperator(
+                        dd_in=expr.op.dd_in,
+                        dd_out=self._change_dd(expr.op.dd_out))(expr.field)
         elif (isinstance(expr.op, op.RefDiffOperator)
-                    and expr.op.dd_out == self.prev_dd
-                    and expr.op.dd_in == self.prev_dd):
+                    and self._is_changed(expr.op.dd_out)
+                    and expr.op.dd_in == expr.op.dd_out):
+            new_dd = self._change_dd(expr.op.dd_out)
             return op.RefDiffOperator(expr.op.rst_axis,
-                                      dd_in=self.new_dd,
-                                      dd_out=self.new_dd)(self.rec(expr.field))
+                                      dd_in=new_dd,
+                                      dd_out=new_dd)(self.rec(expr.field))
         else:
             self._raise_unable(expr)
 
@@ -470,8 +521,8 @@ class RankGeometryChanger(CSECachingMapperMixin, IdentityMapper):
         self._raise_unable(expr)
 
     def map_node_coordinate_component(self, expr):
-        if expr.dd == self.prev_dd:
-            return type(expr)(expr.axis, self.new_dd)
+        if self._is_changed(expr.dd):
+            return type(expr)(expr.axis, self._change_dd(expr.dd))
         else:
             self._raise_unable(expr)
 
@@ -983,15 +1034,16 @@ class EmptyFluxKiller(CSECachingMapperMixin, IdentityMapper):
 
 class _InnerDerivativeJoiner(pymbolic.mapper.RecursiveMapper):
     def map_operator_binding(self, expr, derivatives):
-        if isinstance(expr.op, op.DifferentiationOperator):
+        if isinstance(expr.op, op.DiffOperatorBase):
             derivatives.setdefault(expr.op, []).append(expr.field)
             return 0
         else:
             return DerivativeJoiner()(expr)
 
     def map_common_subexpression(self, expr, derivatives):
-        # no use preserving these if we're moving derivatives around
-        return self.rec(expr.child, derivatives)
+        # Derivatives are not pulled out of common subexpressions, since
+        # that would duplicate the work of all other users of the CSE.
+        return DerivativeJoiner()(expr)
 
     def map_sum(self, expr, derivatives):
         from pymbolic.primitives import flattened_sum
@@ -1013,12 +1065,6 @@ class _InnerDerivativeJoiner(pymbolic.mapper.RecursiveMapper):
             sub_derivatives = {}
             nonscalar = self.rec(nonscalar, sub_derivatives)
 
-            def do_map(expr):
-                if is_scalar(expr):
-                    return expr
-                else:
-                    return self.rec(expr, derivatives)
-
             for operator, operands in sub_derivatives.items():
                 for operand in operands:
                     derivatives.setdefault(operator, []).append(
@@ -1045,6 +1091,10 @@ class _InnerDerivativeJoiner(pymbolic.mapper.RecursiveMapper):
     def map_quotient(self, expr, *args):
         return DerivativeJoiner()(expr)
 
+    map_grudge_variable = map_algebraic_leaf
+    map_function_symbol = map_algebraic_leaf
+    map_ones = map_algebraic_leaf
+    map_signed_face_ones = map_algebraic_leaf
     map_node_coordinate_component = map_algebraic_leaf
 
 
@@ -1066,13 +1116,10 @@ class DerivativeJoiner(CSECachingMapperMixin, IdentityMapper):
         def invoke_idj(expr):
             sub_derivatives = {}
             result = idj(expr, sub_derivatives)
-            if not sub_derivatives:
-                return expr
-            else:
-                for operator, operands in sub_derivatives.items():
-                    derivatives.setdefault(operator, []).extend(operands)
+            for operator, operands in sub_derivatives.items():
+                derivatives.setdefault(operator, []).extend(operands)
 
-                return result
+            return result
 
         derivatives = {}
         new_children = [invoke_idj(child)
@@ -1258,6 +1305,21 @@ class BoundOperatorCollector(CSECachingMapperMixin, CollectorMixin, CombineMappe
         return result | CombineMapper.map_operator_binding(self, expr)
 
 
+class DiscretizationScopedBoundOperatorCollector(BoundOperatorCollector):
+    """Collects only the bindings of *op_class* that occur within
+    discretization-scoped common subexpressions.
+    """
+
+    def map_common_subexpression_uncached(self, expr):
+        if expr.scope == sym.cse_scope.DISCRETIZATION:
+            return BoundOperatorCollector(self.op_class)(expr.child)
+        else:
+            return self.rec(expr.child)
+
+    def map_operator_binding(self, expr):
+        return CombineMapper.map_operator_binding(self, expr)
+
+
 class FluxExchangeCollector(CSECachingMapperMixin, CollectorMixin, CombineMapper):
     map_common_subexpression_uncached = \
             CombineMapper.map_common_subexpression
@@ -1268,6 +1330,101 @@ class FluxExchangeCollector(CSECachingMapperMixin, CollectorMixin, CombineMapper
 # }}}
 
 
+# {{{ elementwise polynomial degree
+
+class ElementwisePolynomialDegreeMapper(CSECachingMapperMixin,
+        pymbolic.mapper.RecursiveMapper):
+    """Determines the polynomial degree on each element of an expression,
+    assuming that all elements are affine, i.e. that the node coordinates
+    are linear on each element. Expressions of degree zero are constant on
+    each element. Expressions that are not known to be polynomial on each
+    element have degree *None*.
+    """
+
+    def handle_unsupported_expression(self, expr, *args, **kwargs):
+        return None
+
+    def map_constant(self, expr):
+        return 0
+
+    def map_variable(self, expr):
+        return None
+
+    map_subscript = map_variable
+
+    def map_grudge_variable(self, expr):
+        if expr.dd.is_scalar():
+            return 0
+        else:
+            return None
+
+    def map_ones(self, expr):
+        return 0
+
+    map_signed_face_ones = map_ones
+
+    def map_node_coordinate_component(self, expr):
+        return 1
+
+    def map_sum(self, expr):
+        degrees = [self.rec(child) for child in expr.children]
+        if None in degrees:
+            return None
+
+        return max(degrees)
+
+    def map_product(self, expr):
+        degrees = [self.rec(child) for child in expr.children]
+        if None in degrees:
+            return None
+
+        return sum(degrees)
+
+    def map_quotient(self, expr):
+        if self.rec(expr.denominator) != 0:
+            return None
+
+        return self.rec(expr.numerator)
+
+    def map_power(self, expr):
+        base_degree = self.rec(expr.base)
+        if base_degree == 0 and self.rec(expr.exponent) == 0:
+            return 0
+        elif (base_degree is not None
+                and isinstance(expr.exponent, int) and expr.exponent >= 0):
+            return base_degree * expr.exponent
+        else:
+            return None
+
+    def map_call(self, expr):
+        if all(self.rec(par) == 0 for par in expr.parameters):
+            return 0
+        else:
+            return None
+
+    def map_common_subexpression_uncached(self, expr):
+        return self.rec(expr.child)
+
+    def map_operator_binding(self, expr):
+        if isinstance(expr.op, op.ElementwiseReductionOperator):
+            return 0
+
+        field_degree = self.rec(expr.field)
+        if field_degree is None:
+            return None
+
+        if isinstance(expr.op, op.RefDiffOperator):
+            return max(field_degree - 1, 0)
+        elif isinstance(expr.op, op.ProjectionOperator):
+            # interpolation to another grid on the same (or a face of the
+            # same) element preserves polynomials of low degree
+            return field_degree
+        else:
+            return None
+
+# }}}
+
+
 # {{{ evaluation
 
 class Evaluator(pymbolic.mapper.evaluator.EvaluationMapper):
@@ -1124,6 +1124,849 @@ def test_map_if(actx_factory):
     sym_if = sym.If(sym.Comparison(2.0, "<", 1.0e-14), 1.0, 2.0)
     bind(discr, sym_if)(actx)
 
+
+# {{{ discretizations shared by the tests below
+
+def _make_rect_mesh(dim=2):
+    from meshmode.mesh.generation import generate_regular_rect_mesh
+    return generate_regular_rect_mesh(a=(-0.5,)*dim, b=(0.5,)*dim, n=(8,)*dim)
+
+
+def _make_rect_discr(actx, dim=2, eager=False):
+    if eager:
+        from grudge.eager import EagerDGDiscretization
+        discr_class = EagerDGDiscretization
+    else:
+        discr_class = DGDiscretizationWithBoundaries
+
+    return discr_class(actx, _make_rect_mesh(dim), order=3)
+
+# }}}
+
+
+# {{{ kernel profiling
+
+def test_kernel_profiling(actx_factory):
+    import pyopencl as cl
+
+    actx = actx_factory()
+    queue = cl.CommandQueue(actx.context,
+            properties=cl.command_queue_properties.PROFILING_ENABLE)
+    actx = GrudgeArrayContext(queue, profile_kernels=True)
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    x = thaw(actx, discr.nodes())
+    grad_op = bind(discr, sym.nabla(dim) * sym.var("u"))
+
+    actx.reset_profiling_data()
+    for _ in range(2):
+        grad_op(u=actx.np.sin(x[0]))
+
+    profiles = actx.get_profiling_data()
+    assert profiles
+    for kp in profiles.values():
+        assert kp.num_calls >= 2
+        assert kp.time >= 0
+        assert kp.nbytes > 0
+
+    actx.reset_profiling_data()
+    assert not actx.get_profiling_data()
+
+    # completed launches are collected without waiting
+    actx._max_pending_profile_events = 0
+    grad_op(u=actx.np.sin(x[0]))
+    actx.queue.finish()
+    grad_op(u=actx.np.sin(x[0]))
+    assert len(actx._pending_profile_events) < sum(
+            kp.num_calls for kp in actx.get_profiling_data().values())
+    assert not actx._pending_profile_events
+
+# }}}
+
+
+# {{{ differentiation kernel transformations
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+@pytest.mark.parametrize("order", [1, 4, 9])
+def test_diff_transformation_lookup(actx_factory, dim, order):
+    import loopy as lp
+    import grudge.loopy_dg_kernels as dgk
+    from math import factorial
+
+    actx = actx_factory()
+
+    ndofs = factorial(order + dim) // (factorial(order) * factorial(dim))
+    assert dgk.simplex_order_from_ndofs(ndofs, dim) == order
+
+    knl = dgk.gen_diff_knl_fortran2(dim, 100, ndofs, ndofs,
+            fp_format=np.float64)
+    transformations = dgk.get_diff_transformations(actx.queue.device, knl)
+    assert transformations
+
+    knl = actx.transform_loopy_program(knl)
+    assert lp.generate_code_v2(knl).device_code()
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+@pytest.mark.parametrize("fp_format", [np.float32, np.float64])
+def test_pocl_diff_transformations(dim, fp_format):
+    import grudge.loopy_dg_kernels as dgk
+
+    pocl_props = {
+            "vendor": "GenuineIntel",
+            "name": "pthread-Intel(R) Xeon(R) Gold 6248 CPU @ 2.50GHz",
+            "platform": "Portable Computing Language",
+            "type": "CPU",
+            "compute_units": 40,
+            "local_mem_size": 4194304,
+            }
+    transform_id = dgk.get_transformation_id_for_properties(pocl_props)
+    assert transform_id is not None
+
+    knl = dgk.gen_diff_knl_fortran2(dim, 100, dim + 1, dim + 1,
+            fp_format=fp_format)
+    assert dgk.get_tuned_diff_transformations(transform_id, knl) is not None
+
+# }}}
+
+
+# {{{ persistent kernel caches
+
+def test_cached_kernel_reuse():
+    import loopy as lp
+    import grudge.loopy_dg_kernels as dgk
+
+    if not lp.CACHING_ENABLED:
+        pytest.skip("loopy caching is disabled")
+
+    nbuilds = []
+
+    def build():
+        nbuilds.append(None)
+        return lp.make_kernel(
+                "{[i]: 0<=i<n}",
+                "out[i] = 2*a[i]",
+                name="grudge_test_cached_kernel")
+
+    # a key not stored by earlier test runs
+    from uuid import uuid4
+    key = ("test_cached_kernel_reuse", str(uuid4()))
+
+    knl = dgk.get_cached_kernel("test-kernels", key, build)
+    cached_knl = dgk.get_cached_kernel("test-kernels", key, build)
+    assert len(nbuilds) == 1
+    assert cached_knl == knl
+
+
+def test_transformed_kernel_key(actx_factory):
+    import grudge.loopy_dg_kernels as dgk
+    from loopy.tools import LoopyKeyBuilder
+    from types import SimpleNamespace
+
+    actx = actx_factory()
+    device = actx.queue.device
+    key_builder = LoopyKeyBuilder()
+
+    # third order in 3D, for which there are tuned transformations
+    knl = dgk.gen_diff_knl_fortran2(3, 100, 20, 20, fp_format=np.float64)
+    transformations = dgk.get_diff_transformations(device, knl)
+
+    def get_key(device, transformations):
+        return key_builder(dgk.get_transformed_kernel_key(
+            knl, device, transformations, False))
+
+    key = get_key(device, transformations)
+    assert get_key(device, list(transformations)) == key
+
+    other_device = SimpleNamespace(
+            platform=SimpleNamespace(
+                name="Other Platform", version=device.platform.version),
+            vendor=device.vendor,
+            name=device.name,
+            driver_version=device.driver_version)
+    assert get_key(other_device, transformations) != key
+
+    titan_v_id = "72a3ce98-5d21-48bf-b402-6ee96bafd1b6"
+    if dgk.get_transformation_id(device) != titan_v_id:
+        titan_v_transformations = dgk.get_tuned_diff_transformations(
+                titan_v_id, knl)
+        assert titan_v_transformations is not None
+        assert get_key(device, titan_v_transformations) != key
+
+# }}}
+
+
+# {{{ layout conversion
+
+def test_thaw_without_layout_conversion(actx_factory):
+    actx = actx_factory()
+    if not isinstance(actx, GrudgeArrayContext):
+        pytest.skip("layout conversion is specific to GrudgeArrayContext")
+
+    discr = _make_rect_discr(actx)
+
+    frozen_nodes = discr.nodes()
+    nbytes_before = actx.layout_conversion_nbytes
+
+    for _ in range(3):
+        nodes = thaw(actx, frozen_nodes)
+
+    assert actx.layout_conversion_nbytes == nbytes_before
+    for grp_ary in nodes[0]:
+        assert grp_ary.flags.f_contiguous
+
+# }}}
+
+
+# {{{ multiple dispatch
+
+def test_multiple_dispatch(actx_factory):
+    actx = actx_factory()
+    if not isinstance(actx, GrudgeArrayContext):
+        pytest.skip("multiple dispatch requires a GrudgeArrayContext")
+
+    import pyopencl as cl
+    from grudge.grudge_array_context import MultipleDispatchArrayContext
+    md_actx = MultipleDispatchArrayContext(
+            [cl.CommandQueue(actx.queue.context) for _ in range(3)])
+
+    dim = 2
+
+    def apply_op(actx):
+        discr = _make_rect_discr(actx)
+        x = sym.nodes(dim)
+        sym_op = (
+                sym.stiffness_t(dim) * sym.sin(x[0])
+                + sym.FaceMassOperator()(sym.project("int_faces", "all_faces")(
+                    sym.int_tpair(sym.cos(x[1])).avg)))
+        result = bind(discr, sym_op)(actx)
+        return np.stack([actx.to_numpy(flatten(comp)) for comp in result])
+
+    ref_result = apply_op(actx)
+    md_result = apply_op(md_actx)
+    assert la.norm(md_result - ref_result) <= 1e-12 * la.norm(ref_result)
+
+# }}}
+
+
+# {{{ numpy array context
+
+def test_numpy_array_context(actx_factory):
+    actx = actx_factory()
+
+    from grudge.grudge_array_context import BaseNumpyArrayContext
+    np_actx = BaseNumpyArrayContext()
+
+    dim = 2
+
+    def apply_op(actx):
+        discr = _make_rect_discr(actx)
+        x = sym.nodes(dim)
+        sym_op = (
+                sym.InverseMassOperator()(sym.stiffness_t(dim) * sym.sin(x[0]))
+                + sym.FaceMassOperator()(sym.project("int_faces", "all_faces")(
+                    sym.int_tpair(x[0] * sym.cos(x[1])).avg)))
+        result = bind(discr, sym_op)(actx)
+        return np.stack([actx.to_numpy(flatten(comp)) for comp in result])
+
+    ref_result = apply_op(actx)
+    np_result = apply_op(np_actx)
+    assert la.norm(np_result - ref_result) <= 1e-12 * la.norm(ref_result)
+
+# }}}
+
+
+# {{{ buffer pool
+
+def test_buffer_pool(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    u = sym.var("u")
+    bound_op = bind(discr, sym.InverseMassOperator()(
+        sym.stiffness_t(dim) * sym.sin(u)
+        - sym.FaceMassOperator()(sym.project("int_faces", "all_faces")(
+            sym.int_tpair(u).avg))))
+
+    x = thaw(actx, discr.nodes())
+    result_1 = bound_op(u=x[0])
+    result_1_host = [actx.to_numpy(flatten(comp)) for comp in result_1]
+
+    pool = bound_op.get_buffer_pool(actx)
+    assert pool.nallocations > 0
+    assert pool.peak_nbytes > 0
+
+    profile_data = {}
+    result_2, _ = bound_op(u=2*x[0], profile_data=profile_data)
+    assert pool.nreuses > 0
+    assert profile_data["buffer_pool_peak_nbytes"] == pool.peak_nbytes
+
+    # results are never recycled
+    for comp, comp_host in zip(result_1, result_1_host):
+        assert np.array_equal(actx.to_numpy(flatten(comp)), comp_host)
+
+    # recycled arrays do not change results
+    result_3 = bound_op(u=x[0])
+    for comp, comp_host in zip(result_3, result_1_host):
+        assert np.array_equal(actx.to_numpy(flatten(comp)), comp_host)
+
+# }}}
+
+
+# {{{ memory footprint report
+
+def test_memory_footprint_slots():
+    from pymbolic.primitives import Variable
+    from grudge.symbolic.compiler import Assign, Code
+
+    mass = sym.MassOperator()
+    code = Code([
+        Assign(("a",), (mass(Variable("u")),)),
+        Assign(("b",), (mass(Variable("a")),)),
+        Assign(("c",), (mass(Variable("b")),)),
+        Assign(("d",), (mass(Variable("c")),)),
+        ], Variable("d"))
+
+    report = code.get_memory_footprint_report()
+    assert report.lifetimes == {"a": (0, 1), "b": (1, 2), "c": (2, 3), "d": (3, 4)}
+
+    # A variable may only take the slot of one that was last used by an
+    # earlier instruction.
+    assert report.var_to_slot == {"a": 0, "b": 1, "c": 0, "d": 1}
+    assert report.nslots == 2
+    assert report.get_footprint({name: 8 for name in "abcd"}) == (16, 32)
+
+
+def test_memory_footprint_report(actx_factory):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx)
+
+    u = sym.var("u")
+    v = sym.InverseMassOperator()(sym.MassOperator()(sym.sin(u)))
+    w = sym.InverseMassOperator()(sym.MassOperator()(sym.exp(v) * u))
+    bound_op = bind(discr, sym.cos(w) + u)
+
+    x = thaw(actx, discr.nodes())
+    for _ in range(2):
+        profile_data = {}
+        result, _ = bound_op(u=x[0], profile_data=profile_data)
+        assert (profile_data["memory_footprint_with_reuse_nbytes"]
+                <= profile_data["memory_footprint_naive_nbytes"])
+
+        x_host = actx.to_numpy(flatten(x[0]))
+        ref_result = np.cos(np.exp(np.sin(x_host)) * x_host) + x_host
+        assert la.norm(actx.to_numpy(flatten(result)) - ref_result) \
+                < 1e-10 * la.norm(ref_result)
+
+# }}}
+
+
+# {{{ execution plan
+
+def test_execution_plan(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    u = sym.var("u")
+    bound_op = bind(discr, sym.InverseMassOperator()(
+        sym.stiffness_t(dim) * u
+        - sym.FaceMassOperator()(sym.project("int_faces", "all_faces")(
+            sym.int_tpair(u).avg))))
+
+    code = bound_op.eval_code
+    plan = code.get_execution_plan()
+    assert not plan.unscheduled_insns
+    assert len(plan.schedule) == len(code.instructions)
+    assert plan.input_names == {"u"}
+
+    available_names = set(plan.input_names)
+    for step in plan.steps:
+        assert all(dep.name in available_names
+                for dep in step.insn.get_dependencies())
+        available_names.update(step.insn.get_assignees())
+        available_names.difference_update(step.discard_names)
+
+    from grudge.execution import ExecutionMapper
+    step_functions = plan.get_step_functions(ExecutionMapper)
+    assert step_functions is plan.get_step_functions(ExecutionMapper)
+    for step, step_function in zip(plan.steps, step_functions):
+        assert step_function is getattr(ExecutionMapper, step.insn.mapper_method)
+
+    x = thaw(actx, discr.nodes())
+    with pytest.raises(RuntimeError):
+        bound_op(actx)
+    bound_op(u=x[0])
+
+# }}}
+
+
+# {{{ hoisting of time-invariant code
+
+def test_hoisting(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    sym_x = sym.nodes(dim)
+    sym_u = sym.var("u")
+    sym_t = sym.ScalarVariable("t")
+    sym_op = (
+            sym.sin(sym_t) * sym.InverseMassOperator()(sym.MassOperator()(
+                sym.exp(-np.dot(sym_x, sym_x))))
+            + sym.InverseMassOperator()(sym.MassOperator()(sym_u)))
+
+    bound_op = bind(discr, sym_op)
+    bound_op.reuse_input_dependent_results = True
+    ref_bound_op = bind(discr, sym_op, debug_flags={"no_hoisting"})
+
+    hoistable_insns = bound_op.eval_code.get_hoistable_insns()
+    assert any(not input_names for input_names in hoistable_insns.values())
+    assert any(input_names == {"u"} for input_names in hoistable_insns.values())
+
+    u = thaw(actx, discr.nodes()[0])
+    nhits = []
+    for t in [0, 0.1, 0.2]:
+        result, profile_data = bound_op(u=u, t=t, profile_data={})
+        ref_result = ref_bound_op(u=u, t=t)
+        assert actx.np.linalg.norm(result - ref_result) < 1.0e-13
+        nhits.append(profile_data["hoisted_insn_count"])
+
+    # nothing to reuse on the first call, geometry-only results on the second,
+    # and results depending on the unchanged 'u' on the third
+    assert nhits[0] == 0
+    assert 0 < nhits[1] < nhits[2]
+
+    # a new 'u' is not mistaken for the old one
+    result = bound_op(u=2*u, t=0.2)
+    ref_result = ref_bound_op(u=2*u, t=0.2)
+    assert actx.np.linalg.norm(result - ref_result) < 1.0e-13
+
+    logger.info(bound_op.get_hoisted_value_cache(actx).get_report())
+
+
+def test_hoisting_modified_inputs(actx_factory):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx)
+
+    sym_u = sym.make_sym_array("u", 2)
+    sym_op = sym.InverseMassOperator()(sym.MassOperator()(sym_u[0] * sym_u[1]))
+
+    bound_op = bind(discr, sym_op)
+    ref_bound_op = bind(discr, sym_op, debug_flags={"no_hoisting"})
+
+    x = thaw(actx, discr.nodes())
+
+    def check(u):
+        result = bound_op(u=u)
+        ref_result = ref_bound_op(u=u)
+        assert actx.np.linalg.norm(result - ref_result) < 1.0e-13
+
+    # by default, results depending on inputs are not reused, so modifying
+    # an input in place is fine
+    u = make_obj_array([x[0] + 1, x[1] + 1])
+    check(u)
+    u[0][0].fill(2.0)
+    check(u)
+
+    # when reusing them, replacing an entry of an object array is noticed
+    bound_op.reuse_input_dependent_results = True
+    check(u)
+    u[1] = 2 * u[1]
+    check(u)
+
+
+def test_hoisting_modified_results(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    sym_x = sym.nodes(dim)
+    sym_op = sym.InverseMassOperator()(sym.MassOperator()(
+        sym.exp(-np.dot(sym_x, sym_x))))
+
+    bound_op = bind(discr, sym_op)
+    ref_result = bind(discr, sym_op, debug_flags={"no_hoisting"})(actx)
+
+    # the time-invariant result is reused, but callers may modify it
+    for _ in range(3):
+        result, profile_data = bound_op(actx, profile_data={})
+        assert actx.np.linalg.norm(result - ref_result) < 1.0e-13
+        result[0].fill(0)
+
+    assert profile_data["hoisted_insn_count"] > 0
+
+# }}}
+
+
+# {{{ fusion of derivatives with elementwise kernels
+
+def test_fused_diff(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    bound_op = bind(discr, sym.nabla(dim) * sym.var("u"))
+
+    from grudge.symbolic.compiler import DiffBatchAssign, LoopyKernelInstruction
+    insns = bound_op.eval_code.instructions
+    assert not any(isinstance(insn, DiffBatchAssign) for insn in insns)
+    assert any(isinstance(insn, LoopyKernelInstruction)
+            and insn.kernel_descriptor.diff_operators is not None
+            for insn in insns)
+
+    x = thaw(actx, discr.nodes())
+    grad_u = bound_op(u=x[0]**2 + 3*x[1])
+
+    assert actx.np.linalg.norm(grad_u[0] - 2*x[0]) < 1.0e-10
+    assert actx.np.linalg.norm(grad_u[1] - 3) < 1.0e-10
+
+# }}}
+
+
+# {{{ derivative batching across fields
+
+def test_multi_field_diff_batch(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    nabla = sym.nabla(dim)
+    u = sym.var("u")
+    v = sym.var("v")
+
+    bound_op = bind(discr, flat_obj_array(
+        nabla * u,
+        nabla * v,
+        # joined into a single derivative of u + v
+        nabla[0] * u + nabla[0] * v))
+
+    from grudge.symbolic.compiler import DiffBatchAssign
+    insns = bound_op.eval_code.instructions
+    assert any(isinstance(insn, DiffBatchAssign) and len(insn.fields) > 1
+            for insn in insns)
+
+    x = thaw(actx, discr.nodes())
+    result = bound_op(u=x[0]**2, v=3*x[0] + x[1])
+
+    for res, ref in zip(result, [2*x[0], 0, 3, 1, 2*x[0] + 3]):
+        assert actx.np.linalg.norm(res - ref) < 1.0e-10
+
+# }}}
+
+
+# {{{ elementwise constant geometric factors
+
+def test_elementwise_constant_geometric_factors(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    from meshmode.mesh import BTAG_ALL
+    bound_op = bind(discr, flat_obj_array(
+        sym.nabla(dim) * sym.var("u"),
+        sym.normal(BTAG_ALL, dim)))
+
+    x = thaw(actx, discr.nodes())
+    result = bound_op(u=x[0]**2 + 3*x[1])
+
+    from grudge.execution import ElementwiseConstantDOFArray
+    assert any(
+            isinstance(value, ElementwiseConstantDOFArray)
+            for value in discr._discr_scoped_subexpr_name_to_value.values())
+
+    assert actx.np.linalg.norm(result[0] - 2*x[0]) < 1.0e-10
+    assert actx.np.linalg.norm(result[1] - 3) < 1.0e-10
+
+    # normals are returned at all nodes
+    bdry_discr = discr.discr_from_dd(BTAG_ALL)
+    for grp, grp_ary in zip(bdry_discr.groups, result[2]):
+        assert grp_ary.shape == (grp.nelements, grp.nunit_dofs)
+
+    bdry_x = thaw(actx, bdry_discr.nodes())
+    assert actx.np.linalg.norm(
+            result[2]*result[2] + result[3]*result[3] - 1) < 1.0e-12
+    assert actx.np.linalg.norm(
+            result[2]*bdry_x[0] + result[3]*bdry_x[1] - 0.5) < 1.0e-12
+
+    # values read at all nodes are expanded only once
+    compact_values = [value
+            for value in discr._discr_scoped_subexpr_name_to_value.values()
+            if isinstance(value, ElementwiseConstantDOFArray)]
+    expanded = [value._expanded for value in compact_values]
+    assert any(expanded_value is not None for expanded_value in expanded)
+
+    bound_op(u=x[0])
+    assert all(value._expanded is expanded_value
+            for value, expanded_value in zip(compact_values, expanded))
+
+# }}}
+
+
+# {{{ batched mass matrix application
+
+def _make_sym_mass_op(op_name):
+    if op_name == "mass":
+        return sym.MassOperator()
+    elif op_name == "inverse_mass":
+        return sym.InverseMassOperator()
+    elif op_name == "face_mass":
+        return lambda field: sym.FaceMassOperator()(
+                sym.project("vol", "all_faces")(field))
+    else:
+        raise ValueError("unknown operator: %s" % op_name)
+
+
+@pytest.mark.parametrize("op_name", ["mass", "inverse_mass", "face_mass"])
+def test_batched_mass(actx_factory, op_name):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx, eager=True)
+
+    x = thaw(actx, discr.nodes())
+    vec = make_obj_array([x[0], x[1], x[0]*x[1]])
+
+    if op_name == "mass":
+        bound_op = discr._bound_mass(
+                sym.DOFDesc("vol", sym.QTAG_NONE), len(vec))
+    elif op_name == "inverse_mass":
+        bound_op = discr._bound_inverse_mass(len(vec))
+    else:
+        vec = discr.project("vol", "all_faces", vec)
+        bound_op = discr._bound_face_mass(
+                sym.DOFDesc("all_faces", sym.QTAG_NONE), len(vec))
+
+    apply_op = getattr(discr, op_name)
+    result = apply_op(vec)
+    for el, res in zip(vec, result):
+        assert actx.np.linalg.norm(res - apply_op(el)) < 1.0e-12
+
+    from grudge.symbolic.compiler import DiffBatchAssign
+    assert any(
+            isinstance(insn, DiffBatchAssign) and len(insn.fields) == len(vec)
+            for insn in bound_op.eval_code.instructions)
+
+
+@pytest.mark.parametrize(("op_name", "other_op_name", "ref_op_class"), [
+    ("inverse_mass", "mass", sym.RefMassOperatorBase),
+    ("mass", "inverse_mass", sym.RefMassOperatorBase),
+    ("face_mass", "inverse_mass", sym.RefFaceMassOperator),
+    ])
+def test_batched_mass_dependencies(actx_factory, op_name, other_op_name,
+        ref_op_class):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx)
+
+    sym_u, sym_v, sym_w, sym_z = (sym.var(name) for name in "uvwz")
+    op = _make_sym_mass_op(op_name)
+    other_op = _make_sym_mass_op(other_op_name)
+
+    # A batch of op containing other_op(w) and a batch of other_op containing
+    # op(u) would depend on each other.
+    sym_op = make_obj_array([
+        op(sym_u), op(sym_z), op(sym_v + other_op(sym_w)),
+        other_op(sym_w), other_op(sym_v), other_op(sym_z + op(sym_u)),
+        ])
+
+    x = thaw(actx, discr.nodes())
+    inputs = {"u": x[0], "v": x[1], "w": x[0]*x[1], "z": x[0] + 1}
+
+    bound_op = bind(discr, sym_op)
+    result = bound_op(**inputs)
+    for sym_op_i, result_i in zip(sym_op, result):
+        ref_result_i = bind(discr, sym_op_i)(**inputs)
+        assert actx.np.linalg.norm(result_i - ref_result_i) < 1.0e-12
+
+    from grudge.symbolic.compiler import DiffBatchAssign
+    assert any(
+            isinstance(insn, DiffBatchAssign)
+            and issubclass(insn.op_class, ref_op_class)
+            and len(insn.fields) == 2
+            for insn in bound_op.eval_code.instructions)
+
+# }}}
+
+
+# {{{ device-side nodal reductions
+
+def test_device_nodal_reduction(actx_factory):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx, eager=True)
+
+    x = thaw(actx, discr.nodes())
+    vec = make_obj_array([x[0], x[1] + 2, x[0]*x[1] - 1])
+    vec_host = np.concatenate([actx.to_numpy(flatten(el)) for el in vec])
+
+    from grudge.execution import DeviceScalar
+    for op_name, np_func in [("sum", np.sum), ("min", np.min), ("max", np.max)]:
+        result = discr.device_nodal_reduction(op_name, vec)
+        assert isinstance(result, DeviceScalar)
+        assert abs(result.get() - np_func(vec_host)) < 1.0e-12
+
+    # also used by the symbolic nodal reductions
+    dd = sym.DD_VOLUME
+    nodal_max = bind(discr, sym.NodalMax(dd)(sym.var("x", dd)))(actx, x=x[0])
+    assert nodal_max == np.max(actx.to_numpy(flatten(x[0])))
+
+# }}}
+
+
+# {{{ fused reductions
+
+def test_fused_reductions(actx_factory):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx, eager=True)
+
+    x = thaw(actx, discr.nodes())
+    u = actx.np.sin(3*x[0]) * x[1]
+    v = make_obj_array([x[0], x[1] - 2])
+
+    dd = sym.DD_VOLUME
+    results = discr.fused_reductions([
+        ("norm", u),
+        ("norm", v),
+        ("max_abs", v),
+        ("integral", u),
+        ("sum", u),
+        ("min", v),
+        ("max", u),
+        ])
+    ref_results = [
+            discr.norm(u),
+            discr.norm(v),
+            discr.norm(v, np.inf),
+            discr.nodal_sum(dd, discr.mass(u)),
+            discr.nodal_sum(dd, u),
+            min(discr.nodal_min(dd, v[0]), discr.nodal_min(dd, v[1])),
+            discr.nodal_max(dd, u),
+            ]
+
+    for result, ref_result in zip(results, ref_results):
+        assert abs(result - ref_result) < 1.0e-12 * max(1, abs(ref_result))
+
+# }}}
+
+
+# {{{ compact elementwise reductions
+
+def test_compact_elementwise_reduction(actx_factory):
+    actx = actx_factory()
+
+    discr = _make_rect_discr(actx)
+
+    x = thaw(actx, discr.nodes())
+    u = actx.np.sin(3*x[0]) * x[1]
+    u_host = actx.to_numpy(u[0])
+
+    dd = sym.DD_VOLUME
+    sym_u = sym.var("u", dd)
+
+    elwise_sum = bind(discr, sym.ElementwiseSumOperator(dd)(sym_u))(actx, u=u)
+    assert np.allclose(actx.to_numpy(elwise_sum[0]),
+            np.broadcast_to(u_host.sum(axis=1, keepdims=True), u_host.shape))
+
+    # consumed by an elementwise kernel without expanding it
+    result = bind(discr, sym.ElementwiseMaxOperator(dd)(sym_u) * sym_u)(
+            actx, u=u)
+    assert np.allclose(actx.to_numpy(result[0]),
+            u_host.max(axis=1, keepdims=True) * u_host)
+
+    nodal_min = bind(discr,
+            sym.NodalMin(dd)(sym.ElementwiseMinOperator(dd)(sym_u)))(actx, u=u)
+    assert nodal_min == u_host.min()
+
+# }}}
+
+
+# {{{ scalar broadcasts
+
+def test_constant_broadcast(actx_factory):
+    actx = actx_factory()
+
+    dim = 2
+    discr = _make_rect_discr(actx)
+
+    x = thaw(actx, discr.nodes())
+    u = actx.np.sin(3*x[0]) * x[1]
+
+    dd = sym.DD_VOLUME
+    sym_c = sym.var("c", dd)
+    sym_u = sym.var("u", dd)
+    sym_w = sym.make_sym_array("w", 2, dd)
+
+    # passed to the elementwise kernel as scalars
+    result = bind(discr, sym_c * sym_u + sym_w[0] * sym_w[1])(
+            actx, c=2.0, u=u, w=make_obj_array([3.0, u]))
+    assert np.max(np.abs(actx.to_numpy(flatten(result - 5*u)))) < 1.0e-14
+
+    # expanded for the operator
+    area = bind(discr, sym.NodalSum(dd)(sym.MassOperator(dd)(sym_c)))(
+            actx, c=1.0)
+    assert abs(area - 1.0) < 1.0e-12
+
+    # expanded once per value, and not handed out to be modified
+    bound_mass = bind(discr, sym.MassOperator(dd)(sym_c))
+    for _ in range(2):
+        bound_mass(actx, c=1.0)
+    expanded = bound_mass._expanded_constants[actx]
+    assert len(expanded) == 1
+
+    bound_ones = bind(discr, sym.Ones(dd))
+    for _ in range(2):
+        ones = bound_ones(actx)
+        assert np.all(actx.to_numpy(flatten(ones)) == 1)
+        ones[0].fill(0)
+
+    # differentiated within a fused kernel
+    grad = bind(discr, sym.nabla(dim) * sym_c)(actx, c=1.0)
+    for grad_i in grad:
+        assert np.max(np.abs(actx.to_numpy(flatten(grad_i)))) < 1.0e-10
+
+# }}}
+
+
+# {{{ symbolic operator hashes
+
+def test_sym_operator_hash_is_canonical():
+    from grudge.execution import _get_sym_operator_hash
+
+    # shared and merely equal subexpressions pickle differently
+    shared = sym.sin(sym.var("u"))
+    op_shared = make_obj_array([shared + 2*shared, sym.var("v")])
+    op_equal = make_obj_array([
+        sym.sin(sym.var("u")) + 2*sym.sin(sym.var("u")), sym.var("v")])
+
+    assert _get_sym_operator_hash(op_shared) == _get_sym_operator_hash(op_equal)
+    assert (_get_sym_operator_hash(op_shared)
+            != _get_sym_operator_hash(op_shared[::-1]))
+    assert (_get_sym_operator_hash(op_shared[0])
+            != _get_sym_operator_hash(3*op_shared[0]))
+
+    # details the printed form leaves out
+    quad_dd = sym.DOFDesc(sym.DTAG_VOLUME_ALL, "product")
+    assert (_get_sym_operator_hash(sym.var("u"))
+            != _get_sym_operator_hash(sym.var("u", quad_dd)))
+    assert (_get_sym_operator_hash(sym.var("u") * np.float32(2))
+            != _get_sym_operator_hash(sym.var("u") * np.float64(2)))
+
+# }}}
+
+
 # You can test individual routines by typing
 # $ python test_grudge.py 'test_routine()'
 
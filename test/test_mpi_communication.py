@@ -96,6 +96,39 @@ def simple_mpi_communication_entrypoint():
 
     assert error < 1e-14
 
+    # waiting with progress reports gives the same result
+    bound_face_swap.wait_timeout = 0.5
+    hopefully_zero, profile_data = bound_face_swap(
+            myfunc=myfunc, profile_data={})
+    assert actx.np.linalg.norm(hopefully_zero, ord=np.inf) < 1e-14
+    assert 0 <= profile_data["busy_wait_time"] <= profile_data["total_time"]
+
+    # face swap on a quadrature grid: the swapped base-order data is projected
+    # to the quadrature grid on the receiving rank
+    from meshmode.discretization.poly_element import \
+            QuadratureSimplexGroupFactory
+    quad_discr = DGDiscretizationWithBoundaries(actx, local_mesh, order=5,
+            quad_tag_to_group_factory={
+                "product": QuadratureSimplexGroupFactory(order=10)},
+            mpi_communicator=comm)
+    quad_myfunc = bind(quad_discr, myfunc_symb)(actx)
+
+    all_faces_dd = sym.DOFDesc("all_faces", "product")
+    bdry_dd = sym.DOFDesc(sym.BTAG_ALL, "product")
+    tpair = sym.int_tpair(sym.var("myfunc"), qtag="product")
+
+    bound_quad_face_swap = bind(quad_discr,
+        sym.project(tpair.dd, all_faces_dd)(tpair.ext)
+        - (sym.project("vol", all_faces_dd)(sym.var("myfunc"))
+            - sym.project(bdry_dd, all_faces_dd)(
+                sym.project("vol", bdry_dd)(sym.var("myfunc")))))
+
+    hopefully_zero = bound_quad_face_swap(myfunc=quad_myfunc)
+    error = actx.np.linalg.norm(hopefully_zero, ord=np.inf)
+    logger.info("quadrature error: %.5e", error)
+
+    assert error < 1e-13
+
 
 def mpi_communication_entrypoint():
     cl_ctx = cl.create_some_context()
@@ -165,6 +198,7 @@ def mpi_communication_entrypoint():
             add_general_quantities, \
             add_run_info, \
             IntervalTimer, EventCounter
+    from grudge.log import CommunicationOverlapEfficiency
     log_filename = None
     # NOTE: LogManager hangs when using a file on a shared directory.
     # log_filename = "grudge_log.dat"
@@ -183,7 +217,8 @@ def mpi_communication_entrypoint():
         "future_eval_timer": IntervalTimer("future_eval_timer",
         "Time spent evaluating futures"),
         "busy_wait_timer": IntervalTimer("busy_wait_timer",
-        "Time wasted doing busy wait")}
+        "Time wasted doing busy wait"),
+        "overlap_efficiency": CommunicationOverlapEfficiency()}
     for quantity in log_quantities.values():
         logmgr.add_quantity(quantity)
 
@@ -238,11 +273,14 @@ def mpi_communication_entrypoint():
             \tInstruction Evaluation: %g\n
             \tFuture Evaluation: %g\n
             \tBusy Wait: %g\n
+            \tCommunication Overlap: %g\n
             \tTotal: %g seconds""",
             i_local_rank,
             data["insn_eval_time"] / data["total_time"] * 100,
             data["future_eval_time"] / data["total_time"] * 100,
             data["busy_wait_time"] / data["total_time"] * 100,
+            (1 - data["comm_exposed_wait_time"]
+                / max(data["comm_exchange_time"], 1e-300)) * 100,
             data["total_time"])
 
     print_profile_data(rhs.profile_data)
@@ -250,6 +288,57 @@ def mpi_communication_entrypoint():
     logger.info("Rank %d exiting", i_local_rank)
 
 
+def bind_on_management_rank_entrypoint():
+    cl_ctx = cl.create_some_context()
+    queue = cl.CommandQueue(cl_ctx)
+    actx = GrudgeArrayContext(queue)
+
+    from meshmode.distributed import MPIMeshDistributor, get_partition_by_pymetis
+
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+    i_local_rank = comm.Get_rank()
+    num_parts = comm.Get_size()
+
+    mesh_dist = MPIMeshDistributor(comm)
+
+    if mesh_dist.is_mananger_rank():
+        from meshmode.mesh.generation import generate_regular_rect_mesh
+        mesh = generate_regular_rect_mesh(a=(-1,)*2,
+                                          b=(1,)*2,
+                                          n=(3,)*2)
+
+        part_per_element = get_partition_by_pymetis(mesh, num_parts)
+
+        local_mesh = mesh_dist.send_mesh_parts(mesh, part_per_element, num_parts)
+    else:
+        local_mesh = mesh_dist.receive_mesh_part()
+
+    vol_discr = DGDiscretizationWithBoundaries(actx, local_mesh, order=3,
+            mpi_communicator=comm)
+
+    # the operator processed on the management rank gives the same result
+    # as one processed locally
+    sym_x = sym.nodes(local_mesh.dim)
+    sym_op = sym.sin(np.dot(sym_x, [2, 3])) * sym.var("c")
+
+    broadcast_result = bind(vol_discr, sym_op)(actx, c=2)
+    local_result = bind(vol_discr, sym_op, local_only=True)(actx, c=2)
+    error = actx.np.linalg.norm(broadcast_result - local_result, ord=np.inf)
+    logger.info("[%04d] broadcast error: %.5e", i_local_rank, error)
+    assert error < 1e-14
+
+    # a rank binding a different operator is an error on every rank
+    with pytest.raises(ValueError, match="different symbolic operator"):
+        bind(vol_discr, (i_local_rank + 1) * sym.var("u"))
+
+    # a failure on the management rank is raised on every rank
+    with pytest.raises(ValueError, match="non-existent axis"):
+        bind(vol_discr, sym.nabla(3)[2](sym.var("u")))
+
+    logger.info("Rank %d exiting", i_local_rank)
+
+
 # {{{ MPI test pytest entrypoint
 
 @pytest.mark.mpi
@@ -282,6 +371,21 @@ def test_simple_mpi(num_ranks):
         # https://mpi4py.readthedocs.io/en/stable/mpi4py.run.html
         sys.executable, "-m", "mpi4py.run", __file__])
 
+
+@pytest.mark.mpi
+@pytest.mark.parametrize("num_ranks", [2])
+def test_bind_on_management_rank(num_ranks):
+    pytest.importorskip("mpi4py")
+    pytest.importorskip("pymetis")
+
+    from subprocess import check_call
+    import sys
+    check_call([
+        "mpiexec", "-np", str(num_ranks),
+        "-x", "RUN_WITHIN_MPI=1",
+        "-x", "TEST_BIND_ON_MANAGEMENT_RANK=1",
+        sys.executable, "-m", "mpi4py.run", __file__])
+
 # }}}
 
 
@@ -291,6 +395,8 @@ if __name__ == "__main__":
             mpi_communication_entrypoint()
         elif "TEST_SIMPLE_MPI_COMMUNICATION" in os.environ:
             simple_mpi_communication_entrypoint()
+        elif "TEST_BIND_ON_MANAGEMENT_RANK" in os.environ:
+            bind_on_management_rank_entrypoint()
     else:
         import sys
         if len(sys.argv) > 1: